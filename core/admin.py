@@ -1,5 +1,8 @@
+from django import forms
 from django.contrib import admin
-from .models import Faculty, Student, Group, Question, TestCase, Submission, Announcement
+from django.db.models import Count
+from . import search
+from .models import Faculty, Student, Group, Question, TestCase, Submission, TestResult, Announcement
 
 
 @admin.register(Faculty)
@@ -21,9 +24,13 @@ class GroupAdmin(admin.ModelAdmin):
     list_filter = ['faculty', 'created_at']
     search_fields = ['name', 'faculty__user__username']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_student_count=Count('students'))
+
     def student_count(self, obj):
-        return obj.students.count()
+        return obj._student_count
     student_count.short_description = 'Number of Students'
+    student_count.admin_order_field = '_student_count'
 
 
 @admin.register(Question)
@@ -32,6 +39,12 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ['difficulty', 'faculty', 'created_at']
     search_fields = ['title', 'description']
 
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of LIKE '%term%' over every description
+        if search.available() and search.fts_query(search_term):
+            return queryset.filter(id__in=search.question_ids_matching(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
+
 
 @admin.register(TestCase)
 class TestCaseAdmin(admin.ModelAdmin):
@@ -39,11 +52,46 @@ class TestCaseAdmin(admin.ModelAdmin):
     list_filter = ['question']
 
 
+class TestResultInline(admin.TabularInline):
+    model = TestResult
+    extra = 0
+    fields = ['position', 'test_case', 'case_changed', 'status', 'time_ms', 'output', 'error', 'truncated']
+    readonly_fields = fields
+    can_delete = False
+
+
+class SubmissionForm(forms.ModelForm):
+    # Edits the source text; Submission.save() stores it in a CodeBlob
+    code = forms.CharField(widget=forms.Textarea)
+
+    class Meta:
+        model = Submission
+        exclude = ['code_blob']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['code'].initial = self.instance.code
+
+    def save(self, commit=True):
+        self.instance.code = self.cleaned_data['code']
+        return super().save(commit)
+
+
 @admin.register(Submission)
 class SubmissionAdmin(admin.ModelAdmin):
+    form = SubmissionForm
     list_display = ['student', 'question', 'language', 'score', 'submitted_at']
     list_filter = ['language', 'submitted_at', 'student', 'question']
     search_fields = ['student__user__username', 'question__title']
+    inlines = [TestResultInline]
+
+    def get_search_results(self, request, queryset, search_term):
+        # Student/question names as before, plus submissions whose code matches (full-text index)
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search.available() and search.fts_query(search_term):
+            results |= queryset.filter(code_blob_id__in=search.code_blob_ids_matching(search_term))
+        return results, may_have_duplicates
 
 
 @admin.register(Announcement)
@@ -0,0 +1,339 @@
+"""
+Async counterpart of local_ai_evaluator for views served through ASGI.
+
+Compiling and running use asyncio subprocesses and the Hugging Face call uses
+an async HTTP client, so a single worker can keep hundreds of evaluations in
+flight while they wait on child processes or the network. Prompting, scoring
+and report building are shared with the sync evaluator, which stays the
+fallback for WSGI deployments.
+"""
+import asyncio
+import concurrent.futures
+import shutil
+import subprocess
+import tempfile
+import time
+
+import httpx
+
+from . import code_analysis, launcher, runners
+from . import local_ai_evaluator as evaluator
+from .scheduler import scheduler, INTERACTIVE, SUBMIT
+
+
+def http_client():
+    """
+    A client for one inference call, closed by the caller when the call (or
+    the streamed feedback) is done. Clients aren't kept between calls, since
+    under WSGI every async view call runs on its own short-lived event loop.
+    """
+    return httpx.AsyncClient(timeout=30)
+
+
+# ---------- Run Code ----------
+async def _communicate(cmd, test_input=None, timeout=None):
+    """Async run_process: through the launcher when configured, else an asyncio subprocess."""
+    if launcher.LAUNCHER_SOCKET:
+        try:
+            return await launcher.run_async(cmd, stdin=test_input, timeout=timeout)
+        except launcher.LauncherUnavailable:
+            pass  # Launcher not running - fall back to a direct subprocess
+        except subprocess.TimeoutExpired:
+            raise asyncio.TimeoutError()
+
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if test_input is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            proc.communicate(test_input.encode() if test_input is not None else None),
+            timeout=timeout
+        )
+    except (asyncio.TimeoutError, asyncio.CancelledError):
+        proc.kill()
+        await proc.wait()
+        raise
+    return proc.returncode, launcher._universal_newlines(stdout.decode(errors="replace")), launcher._universal_newlines(stderr.decode(errors="replace"))
+
+
+async def prepare_program(code, lang, tempdir, priority=SUBMIT, owner=None):
+    """Async version of local_ai_evaluator.prepare_program."""
+    # The layout may wait for the toolchain probe; it and the write run off the event loop
+    layout = await asyncio.to_thread(evaluator.program_layout, code, lang, tempdir)
+    if layout["error"]:
+        return {"run_cmd": None, "output": "", "error": layout["error"]}
+
+    await asyncio.to_thread(_write_source, layout["filepath"], code)
+
+    # Compile if needed
+    compile_cmd = layout["compile_cmd"]
+    if compile_cmd:
+        try:
+            async with scheduler.async_slot(priority, owner):
+                returncode, _, stderr = await _communicate(compile_cmd, timeout=layout["compile_timeout"])
+            if returncode != 0:
+                return evaluator.compile_failure(lang, stderr.strip())
+        except FileNotFoundError:
+            return evaluator.compiler_missing(lang)
+        except asyncio.TimeoutError:
+            return evaluator.compile_timeout(lang)
+
+    return {"run_cmd": layout["run_cmd"], "timeout": layout["run_timeout"], "output": "", "error": ""}
+
+
+async def execute_program(run_cmd, test_input, priority=SUBMIT, owner=None, timeout=runners.Runner.run_timeout):
+    """Async version of local_ai_evaluator.execute_program."""
+    started = None
+    try:
+        async with scheduler.async_slot(priority, owner):
+            started = time.monotonic()
+            _, stdout, stderr = await _communicate(run_cmd, test_input, timeout=timeout)
+        output = stdout.strip()
+        error = stderr.strip()
+    except asyncio.TimeoutError:
+        output, error = "", evaluator.TIMEOUT_ERROR
+    except Exception as e:
+        output, error = "", str(e)
+
+    return {"output": output, "error": error, "time_ms": evaluator.elapsed_ms(started)}
+
+
+def _write_source(path, code):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(code)
+
+
+class _BuildDirectory:
+    """
+    Async version of local_ai_evaluator.build_directory: a temporary
+    directory, or None for a language that can't run here. The toolchain
+    lookup, creation and cleanup don't block the event loop.
+    """
+
+    def __init__(self, lang):
+        self.lang = lang
+        self.name = None
+
+    async def __aenter__(self):
+        runner, _ = await asyncio.to_thread(runners.runner_for, self.lang)
+        if runner:
+            self.name = await asyncio.to_thread(tempfile.mkdtemp)
+        return self.name
+
+    async def __aexit__(self, *exc_info):
+        if self.name:
+            await asyncio.to_thread(shutil.rmtree, self.name, True)
+
+
+async def run_code(code, lang, test_input, priority=INTERACTIVE, owner=None):
+    async with _BuildDirectory(lang) as tempdir:
+        program = await prepare_program(code, lang, tempdir, priority=priority, owner=owner)
+        if program["error"]:
+            return {"output": program["output"], "error": program["error"]}
+
+        return await execute_program(program["run_cmd"], test_input, priority=priority, owner=owner, timeout=program["timeout"])
+
+
+# ---------- AI Code Approach Analyzer ----------
+# Streams still finishing their feedback in the background (tasks are only weakly referenced by the loop)
+_feedback_tasks = set()
+
+
+async def _close(response, client):
+    try:
+        await response.aclose()
+    finally:
+        await client.aclose()
+
+
+async def _finish_stream(response, lines, text, client):
+    try:
+        async for line in lines:
+            text += evaluator.stream_token(line)
+    except Exception:
+        pass  # Keep whatever was generated before the stream broke
+    finally:
+        await _close(response, client)
+    return evaluator.analysis_from_text(text.strip())
+
+
+def _register_task(task):
+    """Expose a background task as a concurrent Future, for evaluator.on_feedback_ready"""
+    future = concurrent.futures.Future()
+
+    def done(task):
+        _feedback_tasks.discard(task)
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    _feedback_tasks.add(task)
+    task.add_done_callback(done)
+    return evaluator.register_feedback(future)
+
+
+async def stream_analysis(code, language, test_cases, after_score=evaluator.FINISH_IN_BACKGROUND):
+    """
+    Async version of local_ai_evaluator.stream_analysis. The background rest
+    of the feedback is a task on the current loop, so it only completes while
+    that loop keeps running (under WSGI the loop ends with the request).
+    """
+    client = http_client()
+    request = client.build_request(
+        "POST",
+        evaluator.HUGGINGFACE_API_URL,
+        headers=evaluator.huggingface_headers(),
+        json=evaluator.build_analysis_payload(code, language, test_cases, stream=True)
+    )
+    try:
+        response = await client.send(request, stream=True)
+    except BaseException:
+        await client.aclose()
+        raise
+    if response.status_code != 200:
+        await _close(response, client)
+        return None
+
+    lines = response.aiter_lines()
+    text = ""
+    try:
+        async for line in lines:
+            text += evaluator.stream_token(line)
+            if evaluator.SCORE_PATTERN.search(text):
+                break
+        else:
+            # Finished without a score
+            await _close(response, client)
+            return evaluator.analysis_from_text(text.strip()) if text.strip() else evaluator.parse_analysis_result([])
+    except BaseException:
+        await _close(response, client)
+        raise
+
+    analysis = evaluator.analysis_from_text(text.strip())
+    if after_score == evaluator.STOP_AFTER_SCORE:
+        await _close(response, client)
+    else:
+        analysis["feedback_id"] = _register_task(asyncio.ensure_future(_finish_stream(response, lines, text, client)))
+    return analysis
+
+
+async def analyze_code_approach(code, language, question_description, test_cases,
+                                after_score=evaluator.FINISH_IN_BACKGROUND):
+    """Async version of local_ai_evaluator.analyze_code_approach."""
+    local_analysis = evaluator.local_logic_analyzer(code, language, test_cases)
+    if not evaluator.HUGGINGFACE_API_KEY or local_analysis["confidence"] >= code_analysis.CONFIDENT:
+        return local_analysis
+
+    try:
+        if evaluator.HUGGINGFACE_STREAM:
+            return await stream_analysis(code, language, test_cases, after_score) or local_analysis
+
+        async with http_client() as client:
+            response = await client.post(
+                evaluator.HUGGINGFACE_API_URL,
+                headers=evaluator.huggingface_headers(),
+                json=evaluator.build_analysis_payload(code, language, test_cases)
+            )
+
+        if response.status_code == 200:
+            return evaluator.parse_analysis_result(response.json())
+        # Model loading (503) or any other error - use local fallback
+        return local_analysis
+
+    except Exception:
+        # Timeout or any other exception - use local fallback
+        return local_analysis
+
+
+# ---------- Evaluate a Submission ----------
+async def iter_evaluation(code, language, test_cases, priority=SUBMIT, owner=None, checker=None):
+    """Async generator yielding the same events as local_ai_evaluator.iter_evaluation."""
+    # STEP 0: Validate language match FIRST
+    is_valid, error_message = evaluator.validate_language_match(code, language)
+    if not is_valid:
+        yield {"event": "done", "report": evaluator.language_mismatch_report(test_cases, error_message)}
+        return
+
+    # STEP 1: Logic analysis starts UPFRONT and overlaps with the test runs
+    analysis_task = asyncio.ensure_future(analyze_code_approach(
+        code=code,
+        language=language,
+        question_description="",
+        test_cases=test_cases,
+        after_score=evaluator.STOP_AFTER_SCORE if priority == INTERACTIVE else evaluator.FINISH_IN_BACKGROUND
+    ))
+
+    try:
+        # STEP 2: Compile once, then run every test case against the same program
+        results = []
+        async with _BuildDirectory(language) as tempdir:
+            program = await prepare_program(code, language, tempdir, priority=priority, owner=owner)
+            yield {
+                "event": "compile",
+                "status": "error" if program["error"] else "ok",
+                "output": program["output"],
+                "error": program["error"]
+            }
+
+            for index, case in enumerate(test_cases):
+                run_result = None
+                if not program["error"]:
+                    run_result = await execute_program(
+                        program["run_cmd"], case["input"], priority=priority, owner=owner, timeout=program["timeout"]
+                    )
+                judgement = None
+                if checker and run_result:
+                    # Building and running the checker block, so they run off the event loop
+                    judgement = await asyncio.to_thread(checker.judge, case, run_result, priority, owner, tempdir)
+                results.append(evaluator.program_result(program, case, run_result, judgement))
+                yield {"event": "test", "index": index, "total": len(test_cases), "result": dict(results[-1])}
+
+        upfront_analysis = await analysis_task
+    finally:
+        analysis_task.cancel()
+
+    yield evaluator.analysis_event(upfront_analysis)
+    yield {"event": "done", "report": evaluator.final_report(results, upfront_analysis)}
+
+
+async def evaluate_submission(code, language, test_cases, priority=SUBMIT, owner=None, checker=None):
+    """Async version of local_ai_evaluator.evaluate_submission."""
+    async for event in iter_evaluation(code, language, test_cases, priority=priority, owner=owner, checker=checker):
+        if event["event"] == "done":
+            return event["report"]
+
+
+# ---------- Quick Check (fail-fast) ----------
+async def quick_check(code, language, test_cases, priority=INTERACTIVE, owner=None, checker=None):
+    """Async version of local_ai_evaluator.quick_check."""
+    total_tests = len(test_cases)
+
+    is_valid, error_message = evaluator.validate_language_match(code, language)
+    if not is_valid:
+        return evaluator.quick_check_report("language_mismatch", 0, total_tests, error=error_message)
+
+    async with _BuildDirectory(language) as tempdir:
+        program = await prepare_program(code, language, tempdir, priority=priority, owner=owner)
+        if program["error"]:
+            # Reported even when the question has no test cases
+            return evaluator.quick_check_report("compile_error", 0, total_tests, error=program["error"])
+
+        for index, case in enumerate(test_cases):
+            run_result = await execute_program(
+                program["run_cmd"], case["input"], priority=priority, owner=owner, timeout=program["timeout"]
+            )
+            judgement = None
+            if checker and run_result:
+                judgement = await asyncio.to_thread(checker.judge, case, run_result, priority, owner, tempdir)
+            result = evaluator.program_result(program, case, run_result, judgement)
+
+            if not result["is_correct"]:
+                return evaluator.quick_check_failure(index, total_tests, case, result)
+
+    return evaluator.quick_check_report("passed", total_tests, total_tests)
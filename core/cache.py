@@ -0,0 +1,90 @@
+"""
+Shared-cache helpers for read-heavy pages and JSON payloads.
+
+Cached values are grouped in namespaces such as "question:12" or
+"faculty:3:announcements". Each namespace has a version (the time of its last
+change, in nanoseconds) that is part of every key stored under it, so
+invalidating a namespace is a single write: bump the version and the old
+entries are never read again (they expire on their own).
+"""
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+CACHE_TIMEOUT = 60 * 60
+
+
+def namespace_version(namespace):
+    key = f"version:{namespace}"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*namespaces):
+    now = time.time_ns()
+    cache.set_many({f"version:{namespace}": now for namespace in namespaces}, timeout=None)
+
+
+def cached(namespace, build, timeout=CACHE_TIMEOUT, part=""):
+    """
+    Return (value, version): the cached value for `namespace`, calling build()
+    on a miss. `part` tells apart several values in one namespace (e.g. pages).
+    """
+    version = namespace_version(namespace)
+    key = f"{namespace}:{version}:{part}"
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value, timeout)
+    return value, version
+
+
+def cached_json_response(request, namespace, build, part=""):
+    """
+    JSON response for build()'s data, served from the cache with an ETag and
+    Last-Modified, or a 304 when the browser's copy is still current.
+    """
+    def build_entry():
+        body = json.dumps(build())
+        return {"body": body, "etag": '"%s"' % hashlib.md5(body.encode()).hexdigest()}
+
+    entry, version = cached(namespace, build_entry, part=part)
+    last_modified = version // 10 ** 9
+
+    response = HttpResponse(entry["body"], content_type="application/json")
+    response["ETag"] = entry["etag"]
+    response["Last-Modified"] = http_date(last_modified)
+    # Let the browser keep it, but revalidate on every use
+    response["Cache-Control"] = "private, no-cache"
+    return get_conditional_response(request, etag=entry["etag"], last_modified=last_modified, response=response)
+
+
+# ---------- Namespaces ----------
+def question_namespace(question_id):
+    return f"question:{question_id}"
+
+
+def faculty_questions_namespace(faculty_id):
+    return f"faculty:{faculty_id}:questions"
+
+
+def faculty_announcements_namespace(faculty_id):
+    return f"faculty:{faculty_id}:announcements"
+
+
+def faculty_roster_namespace(faculty_id):
+    """Groups and students of a faculty"""
+    return f"faculty:{faculty_id}:roster"
+
+
+def question_similarity_namespace(question_id):
+    """Near-duplicate clusters among a question's submissions"""
+    return f"question:{question_id}:similarity"
@@ -0,0 +1,160 @@
+"""
+Custom checkers (special judges) for questions with more than one correct
+output: any valid ordering, floats within a tolerance, ...
+
+A checker is a program in any runner language (see core/runners.py). After
+each test case it runs, like student programs, through the process
+launcher (core/launcher.py), with three files in the submission's build
+directory named in its arguments:
+
+    argv[1]  checker_input.txt     the test input
+    argv[2]  checker_expected.txt  the expected output
+    argv[3]  checker_output.txt    the student's output
+
+Exit status 0 accepts the output and 1 rejects it. A rejecting checker may
+print a score between 0 and 1 at the start of its first line of stdout for
+partial credit; the rest of that line is shown to the student. Any other
+exit status, or a crash or timeout, is a checker error and counts as a
+wrong answer.
+
+Each checker is compiled once per source, into CHECKER_CACHE_DIR under the
+hash of its language and code, and reused by every submission in every
+worker process. A checker that fails to compile is cached as failed too,
+unless compiling again might work (a compile timeout, or a toolchain that
+isn't installed): those failures are retried by the next submission.
+"""
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from collections import defaultdict
+
+from . import runners
+from .local_ai_evaluator import prepare_program, run_process
+from .scheduler import scheduler, SUBMIT
+
+CHECKER_CACHE_DIR = os.environ.get("CHECKER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "saravi-checkers"))
+CHECKER_TIMEOUT = 10  # seconds per test case
+BUILD_FILE = "build.json"
+CHECKER_FILES = ("checker_input.txt", "checker_expected.txt", "checker_output.txt")
+
+# Built checkers of this process, by key, and one lock per key so only one thread compiles each
+_builds = {}
+_build_locks = defaultdict(threading.Lock)
+
+
+class CheckerError(Exception):
+    """The checker couldn't be built or run; the message says why."""
+
+
+def for_question(question):
+    """The question's Checker, or None when outputs are compared exactly"""
+    if not question.checker_code.strip():
+        return None
+    return Checker(question.checker_language, question.checker_code)
+
+
+class Checker:
+    def __init__(self, language, code):
+        self.language = language
+        self.code = code
+        self.key = hashlib.sha256(f"{runners.normalize(language)}\0{code}".encode()).hexdigest()
+
+    def build(self, priority=SUBMIT, owner=None):
+        """{"run_cmd", "timeout"} of the compiled checker; raises CheckerError if it doesn't compile"""
+        with _build_locks[self.key]:
+            build = _builds.get(self.key)
+            if build is None:
+                build = self._load_or_compile(priority, owner)
+                if not build.get("transient"):
+                    _builds[self.key] = build
+        if build.get("error"):
+            raise CheckerError(build["error"])
+        return build
+
+    def _load_or_compile(self, priority, owner):
+        runner, error = runners.runner_for(self.language)
+        if runner is None:
+            return {"error": f"Checker can't run here: {error}", "transient": True}
+
+        directory = os.path.join(CHECKER_CACHE_DIR, self.key)
+        os.makedirs(directory, exist_ok=True)
+        build_file = os.path.join(directory, BUILD_FILE)
+        # Another worker process may be compiling the same checker
+        with open(os.path.join(directory, "lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if os.path.exists(build_file):
+                with open(build_file) as f:
+                    return json.load(f)
+
+            program = prepare_program(self.code, self.language, directory, priority=priority, owner=owner)
+            if program.get("transient"):
+                return {"error": f"Checker failed to build: {program['error']}", "transient": True}
+            if program["error"]:
+                build = {"error": f"Checker failed to build: {program['error']}"}
+            else:
+                build = {"run_cmd": program["run_cmd"], "timeout": program["timeout"]}
+            with open(build_file + ".tmp", "w") as f:
+                json.dump(build, f)
+            os.replace(build_file + ".tmp", build_file)
+            return build
+
+    def judge(self, case, run_result, priority=SUBMIT, owner=None, tempdir=None):
+        """
+        {"verdict", "score", "message"} for a test run, or None if the run
+        failed (timeouts and runtime errors aren't judged). The checker's
+        files go in `tempdir`, the submission's build directory.
+        """
+        if run_result.get("error"):
+            return None
+        try:
+            run_cmd = self.build(priority, owner)["run_cmd"]
+            with scheduler.slot(priority, owner):
+                returncode, stdout = run_checker(
+                    run_cmd, case["input"], case["expected"], run_result["output"], tempdir
+                )
+        except CheckerError as e:
+            return {"verdict": "checker_error", "score": 0.0, "message": str(e)}
+
+        score, message = parse_checker_output(stdout)
+        if returncode == 0:
+            return {"verdict": "passed", "score": 1.0, "message": message}
+        if returncode == 1:
+            score = score or 0.0
+            return {"verdict": "partial" if score > 0 else "wrong_answer", "score": score, "message": message}
+        return {"verdict": "checker_error", "score": 0.0, "message": f"Checker exited with status {returncode}"}
+
+
+def run_checker(run_cmd, test_input, expected, output, tempdir=None):
+    """(exit status, stdout) of the checker, given the three texts as files in `tempdir`"""
+    with contextlib.ExitStack() as stack:
+        if tempdir is None:
+            tempdir = stack.enter_context(tempfile.TemporaryDirectory())
+        paths = [os.path.join(tempdir, name) for name in CHECKER_FILES]
+        for path, text in zip(paths, (test_input, expected, output)):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        try:
+            returncode, stdout, _ = run_process(run_cmd + paths, test_input="", timeout=CHECKER_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            raise CheckerError("Checker timed out")
+        except OSError as e:
+            raise CheckerError(f"Checker could not be started: {e}")
+    return returncode, stdout
+
+
+def parse_checker_output(stdout):
+    """(score or None, message) from the first line of the checker's stdout"""
+    first_line = stdout.strip().split("\n", 1)[0].strip() if stdout.strip() else ""
+    head, _, rest = first_line.partition(" ")
+    try:
+        score = float(head)
+    except ValueError:
+        return None, first_line
+    if not 0 <= score <= 1:
+        return None, first_line
+    return score, rest.strip()
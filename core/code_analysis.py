@@ -0,0 +1,443 @@
+"""
+Structural analysis of submitted code, used for the local logic score.
+
+Python is parsed with `ast`; C, C++ and Java go through a small tokenizer
+that follows braces. Both produce the same metrics:
+
+    loops, loop_depth   number of loops and their deepest nesting
+    recursion           functions that call themselves
+    conditionals        if / switch / ternary count
+    data_structures     containers built or used (list, dict, vector, ...)
+    reads_input         reads stdin at all
+    hard_coded_matches  test cases whose expected output the code prints
+                        (or returns) as a literal on a path that doesn't
+                        depend on the input
+
+analyze() turns them into a 0-10 score with a confidence. Confidence is
+high only for verdicts the structure settles on its own (blank code, a
+program that ignores its input); for everything else, printed answers
+included, the remote model is still asked when it's configured. Literals in
+the arms of conditionals never count as printed answers: base cases like
+`if n == 0: return 0` look exactly like a lookup table of answers.
+"""
+import ast
+import re
+
+# Remote analysis is skipped at or above this confidence (see analyze_code_approach)
+CONFIDENT = 0.8
+
+
+# ---------- Lexing ----------
+PYTHON_TOKEN = re.compile(r'''
+    (?P<comment>\#[^\n]*)
+  | (?P<string>(?:[rRbBuUfF]{0,2})(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\'|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'))
+  | (?P<number>\d[\w.]*)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\S)
+''', re.X)
+
+C_FAMILY_TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*[\s\S]*?\*/|^[ \t]*\#[^\n]*)
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<number>\d[\w.]*)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<op>\S)
+''', re.X | re.M)
+
+
+def lex(code, language):
+    """(kind, text) tokens: comment, string, number, name or op (one character)"""
+    pattern = PYTHON_TOKEN if language == "python" else C_FAMILY_TOKEN
+    return [(match.lastgroup, match.group()) for match in pattern.finditer(code)]
+
+
+# ---------- Vocabulary ----------
+PYTHON_CONTAINERS = {
+    "list", "dict", "set", "frozenset", "deque", "defaultdict", "Counter", "OrderedDict",
+    "heapq", "heappush", "heapify", "bisect", "array",
+}
+PYTHON_INPUT = {"input", "stdin"}
+PYTHON_OUTPUT = {"print", "stdout"}
+
+C_FAMILY_CONTAINERS = {
+    "vector", "map", "set", "unordered_map", "unordered_set", "multiset", "stack", "queue", "deque",
+    "priority_queue", "list", "pair", "array", "struct",
+    "ArrayList", "LinkedList", "HashMap", "TreeMap", "HashSet", "TreeSet", "ArrayDeque", "Deque",
+    "PriorityQueue", "Stack", "Queue", "List", "Map", "Set",
+}
+C_FAMILY_INPUT = {"scanf", "cin", "getline", "fgets", "getchar", "gets", "Scanner", "BufferedReader", "read"}
+C_FAMILY_OUTPUT = {"printf", "puts", "putchar", "cout", "println", "print", "write"}
+C_FAMILY_NOT_FUNCTIONS = {"if", "for", "while", "switch", "catch", "return", "sizeof", "synchronized"}
+
+# Expected outputs this common prove nothing when they appear in the code
+TRIVIAL_OUTPUTS = {"yes", "no", "true", "false", "none", "null", "-1"}
+# Printed answers needed before a submission is flagged as hard-coded
+HARD_CODED_MIN_MATCHES = 2
+
+
+def new_metrics():
+    return {
+        "statements": 0,
+        "loops": 0,
+        "loop_depth": 0,
+        "conditionals": 0,
+        "functions": 0,
+        "recursion": [],
+        "data_structures": [],
+        "reads_input": False,
+        "writes_output": False,
+        "output_literals": [],  # printed or returned as a whole, outside conditionals and loops
+        "syntax_error": False,
+    }
+
+
+# ---------- Python ----------
+class _PythonMetrics(ast.NodeVisitor):
+    def __init__(self):
+        self.metrics = new_metrics()
+        self.depth = 0
+        self.guarded = 0  # enclosing conditionals and loops
+        self.functions = []  # enclosing function names
+        self.recursion = set()
+        self.containers = set()
+
+    def visit(self, node):
+        if isinstance(node, ast.stmt):
+            self.metrics["statements"] += 1
+        return super().visit(node)
+
+    def nested_loops(self, node, loops):
+        self.metrics["loops"] += loops
+        self.depth += loops
+        self.metrics["loop_depth"] = max(self.metrics["loop_depth"], self.depth)
+        self.visit_guarded(node)
+        self.depth -= loops
+
+    def visit_guarded(self, node):
+        self.guarded += 1
+        self.generic_visit(node)
+        self.guarded -= 1
+
+    def visit_For(self, node):
+        self.nested_loops(node, 1)
+
+    visit_AsyncFor = visit_While = visit_For
+
+    def visit_comprehension_node(self, node):
+        kind = {ast.ListComp: "list", ast.SetComp: "set", ast.DictComp: "dict"}.get(type(node))
+        if kind:
+            self.containers.add(kind)
+        self.nested_loops(node, len(node.generators))
+
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_comprehension_node
+
+    def visit_If(self, node):
+        self.metrics["conditionals"] += 1
+        self.visit_guarded(node)
+
+    visit_IfExp = visit_Match = visit_If
+    visit_BoolOp = visit_guarded  # `x and "a"`
+
+    def visit_FunctionDef(self, node):
+        self.metrics["functions"] += 1
+        self.functions.append(node.name)
+        # A function's body runs at its own loop depth, not at the caller's
+        depth, self.depth = self.depth, 0
+        self.generic_visit(node)
+        self.depth = depth
+        self.functions.pop()
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Call(self, node):
+        function = node.func
+        name = function.id if isinstance(function, ast.Name) else getattr(function, "attr", None)
+        if name in self.functions and (
+            isinstance(function, ast.Name) or
+            (isinstance(function.value, ast.Name) and function.value.id == "self")
+        ):
+            self.recursion.add(name)
+        if name in PYTHON_CONTAINERS:
+            self.containers.add(name)
+        if name in ("print", "write") and not self.guarded:
+            constants = [arg.value for arg in node.args if self.is_literal(arg)]
+            self.metrics["output_literals"] += [str(value) for value in constants]
+            if len(constants) == len(node.args) > 1:
+                self.metrics["output_literals"].append(" ".join(str(value) for value in constants))
+        self.generic_visit(node)
+
+    def visit_Return(self, node):
+        if node.value is not None and self.is_literal(node.value) and not self.guarded:
+            self.metrics["output_literals"].append(str(node.value.value))
+        self.generic_visit(node)
+
+    @staticmethod
+    def is_literal(node):
+        return (
+            isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float))
+            and not isinstance(node.value, bool)
+        )
+
+    def visit_Name(self, node):
+        self.check_name(node.id)
+
+    def visit_Attribute(self, node):
+        self.check_name(node.attr)
+        self.generic_visit(node)
+
+    def check_name(self, name):
+        if name in PYTHON_INPUT:
+            self.metrics["reads_input"] = True
+        elif name in PYTHON_OUTPUT:
+            self.metrics["writes_output"] = True
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            if alias.name.split(".")[0] in PYTHON_CONTAINERS | {"collections"}:
+                self.containers.add(alias.name)
+        self.generic_visit(node)
+
+    def visit_List(self, node):
+        self.containers.add("list")
+        self.generic_visit(node)
+
+    def visit_Dict(self, node):
+        self.containers.add("dict")
+        self.generic_visit(node)
+
+    def visit_Set(self, node):
+        self.containers.add("set")
+        self.generic_visit(node)
+
+
+def python_metrics(code):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        metrics = flat_metrics(code, "python", PYTHON_INPUT, PYTHON_OUTPUT, PYTHON_CONTAINERS)
+        metrics["syntax_error"] = True
+        return metrics
+
+    visitor = _PythonMetrics()
+    visitor.visit(tree)
+    metrics = visitor.metrics
+    metrics["recursion"] = sorted(visitor.recursion)
+    metrics["data_structures"] = sorted(visitor.containers)
+    return metrics
+
+
+def flat_metrics(code, language, inputs, outputs, containers):
+    """Keyword counts only, for code that doesn't parse"""
+    tokens = lex(code, language)
+    metrics = new_metrics()
+    names = [text for kind, text in tokens if kind == "name"]
+    metrics["loops"] = sum(1 for name in names if name in ("for", "while"))
+    metrics["loop_depth"] = min(metrics["loops"], 1)
+    metrics["conditionals"] = sum(1 for name in names if name in ("if", "elif", "switch"))
+    metrics["reads_input"] = any(name in inputs for name in names)
+    metrics["writes_output"] = any(name in outputs for name in names)
+    metrics["data_structures"] = sorted({name for name in names if name in containers})
+    metrics["statements"] = sum(1 for line in code.splitlines() if line.strip())
+    return metrics  # no output literals: without a parse, what's conditional is unknown
+
+
+# ---------- C, C++ and Java ----------
+def c_family_metrics(code, language):
+    tokens = [token for token in lex(code, language) if token[0] != "comment"]
+    metrics = new_metrics()
+    names = set()
+    recursion, containers = set(), set()
+
+    blocks = []          # [kind, loops, name] for each open brace
+    pending_loops = 0    # loop headers whose body hasn't started yet
+    do_pending = False
+    pending_conditional = False  # an if / else / switch whose body hasn't started yet
+    output_statement = ternary = False  # in the current statement
+    parens = []          # name before each open parenthesis
+    closed_paren = None  # name before the parenthesis that just closed
+    last_closed_block = None
+    previous = (None, None)
+
+    def open_loops():
+        return sum(block[1] for block in blocks) + pending_loops
+
+    def guarded():
+        return bool(
+            pending_loops or pending_conditional or ternary or
+            any(block[0] in ("loop", "do", "conditional") for block in blocks)
+        )
+
+    def whole_argument(index):
+        """The literal at `index` is a whole argument of the call or statement"""
+        before = tokens[index - 1][1] if index else None
+        after = tokens[index + 1][1] if index + 1 < len(tokens) else None
+        return before in ("(", ",", "<", "return") and after in (")", ",", ";", "<")
+
+    for index, (kind, text) in enumerate(tokens):
+        if kind == "name":
+            names.add(text)
+            if text in C_FAMILY_OUTPUT or text == "return":
+                output_statement = True
+            if text in ("for", "while") and not (text == "while" and last_closed_block == "do"):
+                metrics["loops"] += 1
+                pending_loops += 1
+                metrics["loop_depth"] = max(metrics["loop_depth"], open_loops())
+            elif text == "do":
+                metrics["loops"] += 1
+                pending_loops += 1
+                do_pending = True
+                metrics["loop_depth"] = max(metrics["loop_depth"], open_loops())
+            elif text in ("if", "switch"):
+                metrics["conditionals"] += 1
+                pending_conditional = True
+            elif text == "else":
+                pending_conditional = True
+            if text in C_FAMILY_CONTAINERS:
+                containers.add(text)
+        elif kind in ("string", "number"):
+            if output_statement and not guarded() and whole_argument(index):
+                metrics["output_literals"].append(string_value(text) if kind == "string" else text)
+        elif text == "(":
+            name = previous[1] if previous[0] == "name" else None
+            if name and any(block[0] == "function" and block[2] == name for block in blocks):
+                recursion.add(name)
+            parens.append(name)
+        elif text == ")":
+            closed_paren = parens.pop() if parens else None
+        elif text == "[" and previous[1] != "String":  # not main(String[] args)
+            containers.add("array")
+        elif text == "?":
+            metrics["conditionals"] += 1
+            ternary = True
+        elif text == ";" and not parens:
+            metrics["statements"] += 1
+            pending_loops = 0  # a loop with a single-statement body has ended
+            do_pending = pending_conditional = False
+            output_statement = ternary = False
+        elif text == "{":
+            output_statement = ternary = False
+            if pending_loops:
+                blocks.append(["do" if do_pending else "loop", pending_loops, None])
+                pending_loops, do_pending = 0, False
+            elif pending_conditional:
+                blocks.append(["conditional", 0, None])
+                pending_conditional = False
+            elif previous[1] == ")" and closed_paren and closed_paren not in C_FAMILY_NOT_FUNCTIONS:
+                metrics["functions"] += 1
+                blocks.append(["function", 0, closed_paren])
+            else:
+                blocks.append(["block", 0, None])
+        elif text == "}":
+            output_statement = ternary = False
+            last_closed_block = blocks.pop()[0] if blocks else None
+            previous = (kind, text)
+            continue
+        last_closed_block = None
+        previous = (kind, text)
+
+    metrics["reads_input"] = bool(names & C_FAMILY_INPUT) or ("System" in names and "in" in names)
+    metrics["writes_output"] = bool(names & C_FAMILY_OUTPUT)
+    metrics["recursion"] = sorted(recursion)
+    metrics["data_structures"] = sorted(containers)
+    return metrics
+
+
+def string_value(literal):
+    """Text of a string literal token, with the common escapes undone"""
+    body = re.sub(r'^[rRbBuUfF]{0,2}("""|\'\'\'|"|\')', "", literal)
+    body = re.sub(r'("""|\'\'\'|"|\')$', "", body)
+    return body.replace("\\n", "\n").replace("\\t", "\t").replace('\\"', '"').replace("\\'", "'")
+
+
+# ---------- Scoring ----------
+def hard_coded_matches(output_literals, test_cases):
+    """
+    Indexes of test cases (with input) whose expected output the code prints
+    as literals, when that output is distinctive (not "0", "Yes", "-1", ...).
+    """
+    values = {value.strip() for value in output_literals if value.strip()}
+    lines = {line.strip() for value in values for line in value.splitlines() if line.strip()}
+    matches = []
+    for index, case in enumerate(test_cases):
+        expected = (case.get("expected") or "").strip()
+        if not expected or not (case.get("input") or "").strip():
+            continue
+        if len(expected) <= 2 or expected.lower() in TRIVIAL_OUTPUTS:
+            continue
+        if expected in values or all(line.strip() in lines for line in expected.splitlines() if line.strip()):
+            matches.append(index)
+    return matches
+
+
+def analyze(code, language, test_cases):
+    """
+    Local logic analysis: {"logic_score", "feedback", "concerns", "confidence",
+    "metrics", "status"}, in the same shape as the remote analysis.
+    """
+    if not code or not code.strip() or not [t for t in lex(code, language) if t[0] != "comment"]:
+        return {
+            "logic_score": 0.0,
+            "feedback": "LOGIC_SCORE: 0/10 (Local Analysis). Empty or blank submission.",
+            "concerns": [],
+            "confidence": 1.0,
+            "metrics": new_metrics(),
+            "status": "local_heuristic"
+        }
+
+    metrics = python_metrics(code) if language == "python" else c_family_metrics(code, language)
+    matches = hard_coded_matches(metrics.pop("output_literals"), test_cases)
+    metrics["hard_coded_matches"] = len(matches)
+
+    score = 2.0  # attempted
+    notes = []
+    if metrics["reads_input"]:
+        score += 1
+        notes.append("reads input")
+    if metrics["writes_output"]:
+        score += 1
+    if metrics["loops"] or metrics["recursion"]:
+        score += 2
+    if metrics["loop_depth"]:
+        notes.append(f"loops nested {metrics['loop_depth']} deep" if metrics["loop_depth"] > 1 else "uses loops")
+    if metrics["recursion"]:
+        notes.append(f"recursion in {', '.join(metrics['recursion'])}")
+    if metrics["conditionals"]:
+        score += 1
+        notes.append(f"{metrics['conditionals']} conditional(s)")
+    if metrics["functions"] or metrics["data_structures"]:
+        score += 1
+    if metrics["data_structures"]:
+        notes.append(f"uses {', '.join(metrics['data_structures'])}")
+    score += 2 if metrics["statements"] >= 3 else 1
+
+    concerns = []
+    confidence = 0.6
+    takes_input = any((case.get("input") or "").strip() for case in test_cases)
+    distinct_outputs = len({(case.get("expected") or "").strip() for case in test_cases}) > 1
+    if metrics["syntax_error"]:
+        notes.append("has syntax errors")
+        confidence = 0.2  # the remote model is better at crediting the intended algorithm
+    elif len(matches) >= HARD_CODED_MIN_MATCHES:
+        score = min(score, 3.0)
+        concerns.append("hard_coded")
+        notes.append(f"HARD-CODED: the code prints the expected output of {len(matches)} test cases")
+        confidence = 0.7  # literals alone aren't proof: the remote model still gets a say
+    elif takes_input and distinct_outputs and not metrics["reads_input"]:
+        score = min(score, 4.0)
+        notes.append("never reads the test input")
+        if matches:
+            # Prints a test's answer without looking at the input
+            score = min(score, 3.0)
+            concerns.append("hard_coded")
+        confidence = 0.9 if not (metrics["loops"] or metrics["recursion"]) else 0.7
+
+    score = round(min(score, 10.0), 1)
+    summary = "; ".join(notes) if notes else "straight-line code"
+    return {
+        "logic_score": score,
+        "feedback": f"LOGIC_SCORE: {score}/10 (Local Analysis). Code {summary}.",
+        "concerns": concerns,
+        "confidence": confidence,
+        "metrics": metrics,
+        "status": "local_heuristic"
+    }
@@ -0,0 +1,46 @@
+"""
+Write helpers for SQLite under several workers.
+
+With SQLITE_MODE=production (see settings.DATABASES) every write
+transaction starts with BEGIN IMMEDIATE and waits up to the busy timeout
+for the write lock. A transaction that still can't get the lock fails
+with "database is locked"; retry_on_lock runs the whole transaction again
+after a short randomized backoff, so hot writes such as submission
+inserts survive bursts of contention instead of surfacing a 500.
+"""
+import functools
+import random
+import time
+
+from django.db import OperationalError, connection
+
+LOCK_RETRIES = 5
+LOCK_BACKOFF = 0.05  # seconds, doubled on every attempt
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return isinstance(error, OperationalError) and ("locked" in message or "busy" in message)
+
+
+def retry_on_lock(func):
+    """
+    Retry `func` when SQLite reports the database as locked. `func` must do
+    all of its writes in one transaction.atomic() block so a failed attempt
+    leaves nothing behind.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Inside an outer transaction the lock error has already poisoned it;
+        # only the outermost caller can retry
+        if connection.in_atomic_block:
+            return func(*args, **kwargs)
+
+        for attempt in range(LOCK_RETRIES):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as e:
+                if not is_lock_error(e) or attempt == LOCK_RETRIES - 1:
+                    raise
+                time.sleep(LOCK_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5))
+    return wrapper
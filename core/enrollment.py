@@ -0,0 +1,210 @@
+"""
+Bulk student enrollment from CSV.
+
+Expected header (only username and password are required):
+
+    username,password,email,first_name,last_name,group
+
+Rows are validated first (missing fields, duplicates, taken or malformed
+usernames, password validators, unknown groups). Every valid row is then
+hashed, since PBKDF2 takes hundreds of milliseconds per password: in this
+process for small files, on a process pool shared by all imports of this
+worker for larger ones. All User and Student rows are inserted with
+bulk_create in a single transaction. Invalid rows are skipped and reported
+by line number; so are usernames taken by another request while the file
+was being hashed, and the remaining rows are inserted again.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from .cache import invalidate, faculty_roster_namespace
+from .models import Group, Student
+
+REQUIRED_COLUMNS = ("username", "password")
+OPTIONAL_COLUMNS = ("email", "first_name", "last_name", "group")
+
+# Below this many passwords, starting worker processes costs more than it saves
+PARALLEL_HASH_THRESHOLD = 16
+HASH_WORKERS = int(os.environ.get("ENROLLMENT_HASH_WORKERS") or os.cpu_count() or 2)
+
+
+class EnrollmentError(Exception):
+    """The file as a whole can't be imported (bad encoding or missing columns)."""
+
+
+class EnrollmentConflict(EnrollmentError):
+    """The insert still conflicted with other users after dropping the taken usernames."""
+
+
+# ---------- Password Hashing ----------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_pool(workers=HASH_WORKERS):
+    """
+    This process's hashing pool, started on first use. Workers are spawned
+    (not forked from a threaded server) and inherit DJANGO_SETTINGS_MODULE;
+    make_password only reads the hasher settings, so they never import the
+    project or run django.setup().
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def hash_passwords(passwords, workers=HASH_WORKERS):
+    """make_password for each password, spread over the process pool for larger batches"""
+    if len(passwords) < PARALLEL_HASH_THRESHOLD or workers < 2:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(hash_pool(workers).map(make_password, passwords, chunksize=chunksize))
+
+
+# ---------- Parsing and Validation ----------
+def read_rows(csv_file):
+    """(line number, row dict) pairs from an uploaded file or a path's file object"""
+    content = csv_file.read()
+    if isinstance(content, bytes):
+        try:
+            content = content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise EnrollmentError("The file must be UTF-8 encoded CSV")
+
+    reader = csv.DictReader(io.StringIO(content))
+    columns = [(name or "").strip().lower() for name in reader.fieldnames or []]
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise EnrollmentError(f"Missing required column(s): {', '.join(missing)}")
+    reader.fieldnames = columns
+
+    # Line 1 is the header
+    return [
+        (line, {key: (value or "").strip() for key, value in row.items() if key})
+        for line, row in enumerate(reader, start=2)
+    ]
+
+
+def validate_rows(rows, groups):
+    """Split rows into (valid, errors). `groups` maps group name -> Group of this faculty."""
+    usernames = [row["username"] for _, row in rows if row.get("username")]
+    taken = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+
+    valid, errors, seen = [], [], set()
+    for line, row in rows:
+        problems = []
+        username = row.get("username", "")
+        password = row.get("password", "")
+
+        for column in REQUIRED_COLUMNS:
+            if not row.get(column):
+                problems.append(f"{column} is required")
+        if username in seen:
+            problems.append("duplicate username in file")
+        elif username in taken:
+            problems.append("username already exists")
+        if len(username) > 150:
+            problems.append("username is too long (max 150 characters)")
+        if username:
+            try:
+                User.username_validator(username)
+            except ValidationError as e:
+                problems.extend(e.messages)
+        if row.get("email"):
+            try:
+                validate_email(row["email"])
+            except ValidationError:
+                problems.append("invalid email")
+        if row.get("group") and row["group"] not in groups:
+            problems.append(f"unknown group '{row['group']}'")
+        if password:
+            user = User(
+                username=username,
+                email=row.get("email", ""),
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", "")
+            )
+            try:
+                validate_password(password, user=user)
+            except ValidationError as e:
+                problems.extend(e.messages)
+
+        seen.add(username)
+        if problems:
+            errors.append({"row": line, "username": username, "errors": problems})
+        else:
+            valid.append(row)
+    return valid, errors
+
+
+# ---------- Import ----------
+def create_students(valid, hashes, faculty, groups, default_group):
+    """Insert the User and Student rows in one transaction"""
+    users = [
+        User(
+            username=row["username"],
+            password=password_hash,
+            email=row.get("email", ""),
+            first_name=row.get("first_name", ""),
+            last_name=row.get("last_name", "")
+        )
+        for row, password_hash in zip(valid, hashes)
+    ]
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        Student.objects.bulk_create([
+            Student(user=user, faculty=faculty, group=groups.get(row.get("group")) or default_group)
+            for row, user in zip(valid, users)
+        ])
+
+
+def enroll_students(csv_file, faculty, default_group=None, dry_run=False):
+    """
+    Import students for `faculty` from a CSV file. Rows without a group
+    column value go to `default_group` (or no group). Returns
+    {"created": n, "errors": [{"row", "username", "errors"}], "dry_run": bool}.
+    """
+    rows = read_rows(csv_file)
+    groups = {group.name: group for group in Group.objects.filter(faculty=faculty)}
+    valid, errors = validate_rows(rows, groups)
+
+    if valid and not dry_run:
+        hashes = hash_passwords([row["password"] for row in valid])
+        try:
+            create_students(valid, hashes, faculty, groups, default_group)
+        except IntegrityError:
+            # Usernames registered since validate_rows looked: report those rows, insert the rest
+            taken = set(User.objects.filter(
+                username__in=[row["username"] for row in valid]
+            ).values_list("username", flat=True))
+            if not taken:
+                raise EnrollmentConflict("The students could not be saved, please try again")
+            lines = {row.get("username"): line for line, row in rows}
+            errors = sorted(errors + [
+                {"row": lines[username], "username": username, "errors": ["username already exists"]}
+                for username in taken
+            ], key=lambda error: error["row"])
+            kept = [(row, password_hash) for row, password_hash in zip(valid, hashes) if row["username"] not in taken]
+            valid = [row for row, _ in kept]
+            try:
+                create_students(valid, [password_hash for _, password_hash in kept], faculty, groups, default_group)
+            except IntegrityError:
+                raise EnrollmentConflict("The students could not be saved, please try again")
+        # bulk_create doesn't send post_save, so clear the cached roster here
+        invalidate(faculty_roster_namespace(faculty.id))
+
+    return {"created": len(valid), "errors": errors, "dry_run": dry_run}
@@ -0,0 +1,220 @@
+"""
+Lightweight process launcher, separate from the Django workers.
+
+Gunicorn workers hold the whole Django app in memory, so every fork/exec
+they do copies a large page table, and forking from a multithreaded worker
+is fragile. Instead, workers send run requests over a local Unix socket to
+this small, long-lived helper, which starts compilers and student programs
+from its own small address space with posix_spawn and sends the results back.
+
+Start it with:
+
+    python -m core.launcher --socket /tmp/saravi-launcher.sock
+
+and point the workers at it with EVALUATION_LAUNCHER_SOCKET. This module must
+not import Django (core/__init__.py is empty, so `python -m core.launcher`
+stays small).
+
+Protocol: one JSON line per connection each way.
+    request:  {"argv": [...], "stdin": "..." or null, "timeout": seconds or null}
+    response: {"returncode": int, "stdout": str, "stderr": str,
+               "timed_out": bool, "error": null or "file_not_found" / message}
+"""
+import argparse
+import asyncio
+import json
+import os
+import selectors
+import signal
+import socket
+import socketserver
+import subprocess
+import sys
+import time
+
+LAUNCHER_SOCKET = os.environ.get("EVALUATION_LAUNCHER_SOCKET")
+
+# Extra time the client waits beyond the run's own timeout
+_CLIENT_GRACE = 10
+
+
+class LauncherUnavailable(Exception):
+    """The launcher process could not be reached; callers fall back to subprocess."""
+
+
+# ---------- Server Side ----------
+def spawn(argv, stdin_data=None, timeout=None):
+    """
+    posix_spawn `argv`, feed it stdin, collect stdout/stderr. The child leads
+    a new session, so after `timeout` seconds it is killed together with any
+    processes it started.
+    """
+    stdin_r, stdin_w = os.pipe()
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    # os.pipe() fds are close-on-exec; dup2 onto 0/1/2 gives the child inheritable copies
+    file_actions = [
+        (os.POSIX_SPAWN_DUP2, stdin_r, 0),
+        (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+        (os.POSIX_SPAWN_DUP2, stderr_w, 2),
+    ]
+    try:
+        pid = os.posix_spawnp(argv[0], argv, os.environ, file_actions=file_actions, setsid=True)
+    except OSError:
+        for fd in (stdin_r, stdin_w, stdout_r, stdout_w, stderr_r, stderr_w):
+            os.close(fd)
+        raise
+    for fd in (stdin_r, stdout_w, stderr_w):
+        os.close(fd)
+
+    data = (stdin_data or "").encode()
+    chunks = {stdout_r: [], stderr_r: []}
+    selector = selectors.DefaultSelector()
+    if data:
+        os.set_blocking(stdin_w, False)
+        selector.register(stdin_w, selectors.EVENT_WRITE)
+    else:
+        os.close(stdin_w)
+    selector.register(stdout_r, selectors.EVENT_READ)
+    selector.register(stderr_r, selectors.EVENT_READ)
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    offset = 0
+    timed_out = False
+    while selector.get_map():
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            timed_out = True
+            break
+        for key, _ in selector.select(remaining):
+            fd = key.fd
+            if fd == stdin_w:
+                try:
+                    offset += os.write(fd, data[offset:offset + 65536])
+                except BlockingIOError:
+                    continue
+                except BrokenPipeError:
+                    offset = len(data)
+                if offset >= len(data):
+                    selector.unregister(fd)
+                    os.close(fd)
+            else:
+                chunk = os.read(fd, 65536)
+                if chunk:
+                    chunks[fd].append(chunk)
+                else:
+                    selector.unregister(fd)
+                    os.close(fd)
+
+    if timed_out:
+        # The child isn't reaped yet, so its process group id can't have been reused
+        os.killpg(pid, signal.SIGKILL)
+        for key in list(selector.get_map().values()):
+            selector.unregister(key.fd)
+            os.close(key.fd)
+    selector.close()
+
+    _, status = os.waitpid(pid, 0)
+    return {
+        "returncode": os.waitstatus_to_exitcode(status),
+        "stdout": b"".join(chunks[stdout_r]).decode(errors="replace"),
+        "stderr": b"".join(chunks[stderr_r]).decode(errors="replace"),
+        "timed_out": timed_out,
+        "error": None
+    }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            response = spawn(request["argv"], request.get("stdin"), request.get("timeout"))
+        except FileNotFoundError:
+            response = {"error": "file_not_found"}
+        except Exception as e:
+            response = {"error": str(e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class LauncherServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(socket_path):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    # Owner-only from the moment the socket is bound (a chmod afterwards would leave a window)
+    previous_umask = os.umask(0o177)
+    try:
+        server = LauncherServer(socket_path, _RequestHandler)
+    finally:
+        os.umask(previous_umask)
+    try:
+        with server:
+            server.serve_forever()
+    finally:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+# ---------- Client Side ----------
+def _decode_response(argv, timeout, raw):
+    if not raw:
+        raise LauncherUnavailable("Launcher closed the connection")
+    response = json.loads(raw)
+    if response.get("error") == "file_not_found":
+        raise FileNotFoundError(argv[0])
+    if response.get("error"):
+        raise LauncherUnavailable(response["error"])
+    if response["timed_out"]:
+        raise subprocess.TimeoutExpired(argv, timeout)
+    return response["returncode"], _universal_newlines(response["stdout"]), _universal_newlines(response["stderr"])
+
+
+def _universal_newlines(text):
+    # Match subprocess.run(..., text=True)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def run(argv, stdin=None, timeout=None, socket_path=None):
+    """
+    Run `argv` through the launcher. Returns (returncode, stdout, stderr);
+    raises FileNotFoundError / subprocess.TimeoutExpired like subprocess.run.
+    """
+    request = json.dumps({"argv": list(argv), "stdin": stdin, "timeout": timeout}).encode() + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(None if timeout is None else timeout + _CLIENT_GRACE)
+            sock.connect(socket_path or LAUNCHER_SOCKET)
+            sock.sendall(request)
+            raw = sock.makefile("rb").readline()
+    except OSError as e:
+        raise LauncherUnavailable(str(e)) from e
+    return _decode_response(argv, timeout, raw)
+
+
+async def run_async(argv, stdin=None, timeout=None, socket_path=None):
+    """Async version of run() for the async evaluator."""
+    request = json.dumps({"argv": list(argv), "stdin": stdin, "timeout": timeout}).encode() + b"\n"
+    try:
+        reader, writer = await asyncio.open_unix_connection(socket_path or LAUNCHER_SOCKET, limit=2 ** 26)
+    except OSError as e:
+        raise LauncherUnavailable(str(e)) from e
+    try:
+        writer.write(request)
+        await writer.drain()
+        raw = await asyncio.wait_for(
+            reader.readline(),
+            None if timeout is None else timeout + _CLIENT_GRACE
+        )
+    finally:
+        writer.close()
+    return _decode_response(argv, timeout, raw)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process launcher for code evaluation")
+    parser.add_argument("--socket", default=LAUNCHER_SOCKET or "/tmp/saravi-launcher.sock")
+    args = parser.parse_args()
+    serve(args.socket)
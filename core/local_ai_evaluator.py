@@ -1,10 +1,27 @@
-import subprocess, tempfile, os, json, requests, re
+import subprocess, tempfile, os, json, requests, re, time, threading, uuid
+from contextlib import nullcontext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from . import code_analysis, language_detection, launcher, runners
+from .scheduler import scheduler, INTERACTIVE, SUBMIT
 
 # ---------- Hugging Face API Configuration ----------
 HUGGINGFACE_API_KEY = os.environ.get("HUGGINGFACE_API_KEY")
 # Using Llama 3.1 (released July 2024) - improved performance over 3.0
 HUGGINGFACE_MODEL = "meta-llama/Llama-3.1-8B-Instruct"
-HUGGINGFACE_API_URL = f"https://api-inference.huggingface.co/models/{HUGGINGFACE_MODEL}"
+HUGGINGFACE_API_URL = os.environ.get(
+    "HUGGINGFACE_API_URL", f"https://api-inference.huggingface.co/models/{HUGGINGFACE_MODEL}"
+)
+# Stream the analysis and use the score as soon as it's generated (see stream_analysis)
+HUGGINGFACE_STREAM = os.environ.get("HUGGINGFACE_STREAM") == "1"
+
+# What a streamed analysis does with the rest of the feedback once the score is in
+STOP_AFTER_SCORE = "stop"  # Run button: close the stream, the score is all that's shown
+FINISH_IN_BACKGROUND = "background"  # submissions: report now, finish the feedback afterwards
+
+# Logic analysis (AI call or local heuristic) runs here while tests execute
+_analysis_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="logic-analysis")
 
 if HUGGINGFACE_API_KEY:
     print("✓ Hugging Face AI enabled for intelligent code analysis")
@@ -17,64 +34,7 @@ def detect_language_from_code(code):
     Detect the likely programming language from code patterns.
     Returns the detected language or None if uncertain.
     """
-    if not code or not code.strip():
-        return None
-    
-    code_clean = code.strip()
-    
-    # Java detection - very specific patterns
-    java_patterns = [
-        r'\bpublic\s+class\s+\w+',
-        r'\bpublic\s+static\s+void\s+main',
-        r'\bSystem\.out\.print',
-        r'\bprivate\s+\w+\s+\w+\s*\(',
-        r'\bimport\s+java\.',
-    ]
-    if any(re.search(pattern, code_clean) for pattern in java_patterns):
-        return 'java'
-    
-    # C++ detection - specific to C++
-    cpp_patterns = [
-        r'#include\s*<iostream>',
-        r'\bstd::cout\b',
-        r'\bstd::cin\b',
-        r'\bstd::string\b',
-        r'\busing\s+namespace\s+std',
-    ]
-    if any(re.search(pattern, code_clean) for pattern in cpp_patterns):
-        return 'cpp'
-    
-    # C detection (must check after C++ since C++ includes C headers)
-    c_patterns = [
-        r'#include\s*<stdio\.h>',
-        r'\bprintf\s*\(',
-        r'\bscanf\s*\(',
-        r'#include\s*<stdlib\.h>',
-        r'#include\s*<string\.h>',
-    ]
-    if any(re.search(pattern, code_clean) for pattern in c_patterns):
-        return 'c'
-    
-    # Python detection
-    python_patterns = [
-        r'\bdef\s+\w+\s*\(',
-        r'\bimport\s+\w+',
-        r'\bfrom\s+\w+\s+import',
-        r'\bprint\s*\(',
-        r'\bif\s+__name__\s*==\s*["\']__main__["\']',
-        r':\s*$',  # Colon at end of line (common in Python)
-    ]
-    python_score = sum(1 for pattern in python_patterns if re.search(pattern, code_clean, re.MULTILINE))
-    
-    # If multiple Python patterns match, likely Python
-    if python_score >= 2:
-        return 'python'
-    
-    # Check for single Python-specific pattern
-    if re.search(r'\bdef\s+\w+\s*\(', code_clean) or re.search(r'\bprint\s*\(', code_clean):
-        return 'python'
-    
-    return None
+    return language_detection.detect(code).language
 
 def validate_language_match(code, selected_language):
     """
@@ -86,9 +46,7 @@ def validate_language_match(code, selected_language):
         return True, None  # Empty code will fail anyway
     
     # Normalize selected language
-    selected_normalized = selected_language.lower().replace("+", "p").replace(" ", "")
-    if selected_normalized == "c++":
-        selected_normalized = "cpp"
+    selected_normalized = runners.normalize(selected_language) or selected_language.lower()
     
     # Detect the actual language from code
     detected = detect_language_from_code(code)
@@ -107,14 +65,8 @@ def validate_language_match(code, selected_language):
     
     # Check if they match
     if detected_normalized != selected_normalized:
-        language_names = {
-            'python': 'Python',
-            'java': 'Java',
-            'cpp': 'C++',
-            'c': 'C'
-        }
-        selected_name = language_names.get(selected_normalized, selected_language)
-        detected_name = language_names.get(detected_normalized, detected)
+        selected_name = runners.label(selected_language)
+        detected_name = runners.label(detected)
         
         error_msg = f"Language mismatch: You selected {selected_name} but submitted {detected_name} code. Please select the correct language or rewrite your code in {selected_name}."
         return False, error_msg
@@ -122,190 +74,171 @@ def validate_language_match(code, selected_language):
     return True, None
 
 # ---------- Run Code Function ----------
-def run_code(code, lang, test_input):
-    # Normalize language input (handle both "Python" and "python", "C++" and "cpp")
-    lang_normalized = lang.lower().replace("+", "p").replace(" ", "")
-    
-    # Validate that language is supported
-    supported_languages = ["python", "java", "cpp", "c", "c++"]
-    if lang_normalized not in supported_languages and lang_normalized.replace("+", "p") not in supported_languages:
+def normalize_language(lang):
+    """
+    Normalize a language name ("Python", "C++", "cpp", ...) to the name of
+    its runner (see core/runners.py). Returns None for unsupported languages.
+    """
+    return runners.normalize(lang)
+
+
+def run_process(cmd, test_input=None, timeout=None):
+    """
+    Run a command and return (returncode, stdout, stderr).
+    Goes through the launcher process when EVALUATION_LAUNCHER_SOCKET is set
+    (see core/launcher.py), otherwise forks from this process.
+    """
+    if launcher.LAUNCHER_SOCKET:
+        try:
+            return launcher.run(cmd, stdin=test_input, timeout=timeout)
+        except launcher.LauncherUnavailable:
+            pass  # Launcher not running - fall back to a direct subprocess
+    proc = subprocess.run(cmd, input=test_input, capture_output=True, text=True, timeout=timeout)
+    return proc.returncode, proc.stdout, proc.stderr
+
+
+def program_layout(code, lang, tempdir):
+    """
+    Decide where the source file goes in `tempdir` and which commands compile
+    and run it. Returns {"filepath", "compile_cmd", "run_cmd", "error"}.
+    """
+    runner, error = runners.runner_for(lang)
+    if runner is None:
+        return {"filepath": None, "compile_cmd": None, "run_cmd": None, "error": error}
+    return runner.layout(code, tempdir)
+
+
+def build_directory(lang):
+    """
+    Temporary directory to build the program in, or a context yielding None
+    (nothing created) when `lang` can't be run here; prepare_program then
+    reports why without touching the filesystem.
+    """
+    runner, _ = runners.runner_for(lang)
+    return tempfile.TemporaryDirectory() if runner else nullcontext()
+
+
+def compile_failure(lang, error_details):
+    """Program result for a non-zero compiler exit."""
+    # Show the actual compiler error to help students debug
+    # For "undefined reference to main" error, show helpful message
+    if "undefined reference to `main'" in error_details:
         return {
-            "output": "", 
-            "error": f"Unsupported language: {lang}. Supported languages are: Python, Java, C++, C"
+            "run_cmd": None,
+            "output": error_details,
+            "error": f"Compilation Error: Your {lang} code is missing a main() function.\n\nMake sure your code has:\nint main() {{\n    // your code here\n    return 0;\n}}\n\nCompiler output:\n{error_details}"
         }
-    
-    # Normalize c++ to cpp
-    if lang_normalized == "c++":
-        lang_normalized = "cpp"
-    
-    with tempfile.TemporaryDirectory() as tempdir:
-        ext_map = {"python": "py", "java": "java", "cpp": "cpp", "c": "c"}
-        ext = ext_map.get(lang_normalized, "txt")
-        filepath = os.path.join(tempdir, f"code.{ext}")
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(code)
-
-        compile_cmd = run_cmd = None
-        if lang_normalized == "python":
-            run_cmd = ["python", filepath]
-        elif lang_normalized == "c":
-            exe_path = os.path.join(tempdir, "a.exe")
-            compile_cmd = ["gcc", filepath, "-o", exe_path]
-            run_cmd = [exe_path]
-        elif lang_normalized == "cpp":
-            exe_path = os.path.join(tempdir, "a.exe")
-            compile_cmd = ["g++", filepath, "-o", exe_path]
-            run_cmd = [exe_path]
-        elif lang_normalized == "java":
-            # Extract the public class name from Java code
-            # If no public class found, use "Main" as default
-            import re
-            class_match = re.search(r'public\s+class\s+(\w+)', code)
-            if class_match:
-                class_name = class_match.group(1)
-            else:
-                # No public class, look for any class or use default
-                class_match = re.search(r'class\s+(\w+)', code)
-                class_name = class_match.group(1) if class_match else "Main"
-            
-            filepath = os.path.join(tempdir, f"{class_name}.java")
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(code)
-            compile_cmd = ["javac", filepath]
-            run_cmd = ["java", "-cp", tempdir, class_name]
-        
-        # Additional safety check
-        if run_cmd is None:
-            return {
-                "output": "", 
-                "error": f"Internal error: Unable to configure runner for language {lang}"
-            }
-
-        # Compile if needed
-        if compile_cmd:
-            try:
-                compile_result = subprocess.run(compile_cmd, capture_output=True, text=True)
-                if compile_result.returncode != 0:
-                    error_details = compile_result.stderr.strip()
-                    # Show the actual compiler error to help students debug
-                    # For "undefined reference to main" error, show helpful message
-                    if "undefined reference to `main'" in error_details:
-                        return {
-                            "output": error_details,
-                            "error": f"Compilation Error: Your {lang} code is missing a main() function.\n\nMake sure your code has:\nint main() {{\n    // your code here\n    return 0;\n}}\n\nCompiler output:\n{error_details}"
-                        }
-                    return {
-                        "output": error_details,
-                        "error": f"Compilation Error:\n{error_details}"
-                    }
-            except FileNotFoundError:
-                compiler_name = compile_cmd[0]
-                lang_name_map = {
-                    'javac': 'Java',
-                    'g++': 'C++',
-                    'gcc': 'C'
-                }
-                lang_name = lang_name_map.get(compiler_name, lang)
-                return {
-                    "output": "",
-                    "error": f"{lang_name} compiler not installed on this system. Please contact your administrator or use Python for now."
-                }
-
-        # Run the code
+    return {
+        "run_cmd": None,
+        "output": error_details,
+        "error": f"Compilation Error:\n{error_details}"
+    }
+
+
+# Failures below are "transient": compiling the same code again may succeed
+
+def compiler_missing(lang):
+    """Program result when the compiler binary went missing after the toolchain probe."""
+    return {
+        "run_cmd": None,
+        "output": "",
+        "error": runners.RUNNERS[normalize_language(lang)].missing_message(),
+        "transient": True
+    }
+
+
+def compile_timeout(lang):
+    return {
+        "run_cmd": None,
+        "output": "",
+        "error": f"Compilation Error: {runners.label(lang)} compiler timed out",
+        "transient": True
+    }
+
+
+def prepare_program(code, lang, tempdir, priority=SUBMIT, owner=None):
+    """
+    Write the source into `tempdir` and compile it if the language needs it.
+    Returns {"run_cmd": [...], "timeout": <seconds per run>, "output": "", "error": ""} on success, or
+    {"run_cmd": None, "output": <compiler output>, "error": <message>} on failure.
+    The compiled program can then be run any number of times with execute_program.
+    """
+    layout = program_layout(code, lang, tempdir)
+    if layout["error"]:
+        return {"run_cmd": None, "output": "", "error": layout["error"]}
+
+    with open(layout["filepath"], "w", encoding="utf-8") as f:
+        f.write(code)
+
+    # Compile if needed
+    compile_cmd = layout["compile_cmd"]
+    if compile_cmd:
         try:
-            proc = subprocess.run(run_cmd, input=test_input, capture_output=True, text=True, timeout=5)
-            output = proc.stdout.strip()
-            error = proc.stderr.strip()
+            with scheduler.slot(priority, owner):
+                returncode, _, stderr = run_process(compile_cmd, timeout=layout["compile_timeout"])
+            if returncode != 0:
+                return compile_failure(lang, stderr.strip())
+        except FileNotFoundError:
+            return compiler_missing(lang)
         except subprocess.TimeoutExpired:
-            output, error = "", "Timeout Error"
-        except Exception as e:
-            output, error = "", str(e)
+            return compile_timeout(lang)
+
+    return {"run_cmd": layout["run_cmd"], "timeout": layout["run_timeout"], "output": "", "error": ""}
+
+
+TIMEOUT_ERROR = "Timeout Error"
+
+
+def execute_program(run_cmd, test_input, priority=SUBMIT, owner=None, timeout=runners.Runner.run_timeout):
+    """Run an already prepared program against one input. `time_ms` is the wall time of the run."""
+    started = None
+    try:
+        with scheduler.slot(priority, owner):
+            started = time.monotonic()
+            _, stdout, stderr = run_process(run_cmd, test_input, timeout=timeout)
+        output = stdout.strip()
+        error = stderr.strip()
+    except subprocess.TimeoutExpired:
+        output, error = "", TIMEOUT_ERROR
+    except Exception as e:
+        output, error = "", str(e)
+
+    return {"output": output, "error": error, "time_ms": elapsed_ms(started)}
 
-        return {"output": output, "error": error}
+
+def elapsed_ms(started):
+    return None if started is None else round((time.monotonic() - started) * 1000)
+
+
+def run_code(code, lang, test_input, priority=SUBMIT, owner=None):
+    """
+    Compile (if needed) and run code against one input.
+    Compiling and running each wait for a slot in the evaluation scheduler,
+    so `priority` and `owner` decide where this run is placed in the queue.
+    """
+    with build_directory(lang) as tempdir:
+        program = prepare_program(code, lang, tempdir, priority=priority, owner=owner)
+        if program["error"]:
+            return {"output": program["output"], "error": program["error"]}
+
+        return execute_program(program["run_cmd"], test_input, priority=priority, owner=owner, timeout=program["timeout"])
 
 # ---------- Logic Checker ----------
 def evaluate_logic(student_output, expected_output):
     return student_output.strip() == expected_output.strip()
 
-# ---------- LOCAL Fallback Logic Analyzer (NO API REQUIRED) ----------
+# ---------- LOCAL Logic Analyzer (NO API REQUIRED) ----------
 def local_logic_analyzer(code, language, test_cases):
     """
-    Simple heuristic-based logic analyzer that works WITHOUT AI API.
-    Awards partial credit based on code structure and complexity.
-    
-    This ensures students get partial credit even when AI is unavailable!
+    Structural analysis of the code (see code_analysis.py), scored out of 10
+    without any API. The result has a "confidence"; at CONFIDENT or above the
+    remote analysis is skipped.
     """
-    if not code or not code.strip():
-        return {
-            "logic_score": 0.0,
-            "feedback": "Empty or blank submission.",
-            "status": "local_heuristic"
-        }
-    
-    code_lower = code.lower()
-    lines = [line for line in code.split('\n') if line.strip() and not line.strip().startswith('#')]
-    
-    score = 0.0
-    feedback_parts = []
-    
-    # Base score for attempting (2 points)
-    score += 2.0
-    feedback_parts.append("Code submitted")
-    
-    # Check for basic programming structures (2 points each, max 4)
-    structure_score = 0
-    if any(kw in code_lower for kw in ['for ', 'while ']):
-        structure_score += 2
-        feedback_parts.append("uses loops")
-    if any(kw in code_lower for kw in ['if ', 'elif ', 'else']):
-        structure_score += 2
-        feedback_parts.append("uses conditionals")
-    score += min(structure_score, 4)
-    
-    # Check for appropriate complexity (2 points)
-    if len(lines) >= 3:
-        score += 2
-        feedback_parts.append("adequate length")
-    elif len(lines) >= 1:
-        score += 1
-    
-    # Check for input/output operations (1 point)
-    if any(kw in code_lower for kw in ['input(', 'print(', 'cout', 'cin', 'scanner', 'system.out']):
-        score += 1
-        feedback_parts.append("handles I/O")
-    
-    # Check for data structures (1 point)
-    if any(kw in code_lower for kw in ['list', 'array', 'dict', 'set', 'vector', 'arraylist', '[]', '{}']):
-        score += 1
-        feedback_parts.append("uses data structures")
-    
-    # Cap at 10
-    score = min(score, 10.0)
-    
-    feedback = f"LOGIC_SCORE: {score}/10 (Local Heuristic). Code {', '.join(feedback_parts)}. Enable AI for detailed analysis."
-    
-    return {
-        "logic_score": round(score, 1),
-        "feedback": feedback,
-        "status": "local_heuristic"
-    }
+    return code_analysis.analyze(code, normalize_language(language) or language, test_cases)
 
 # ---------- AI Code Approach Analyzer (UPFRONT EVALUATION) ----------
-def analyze_code_approach(code, language, question_description, test_cases):
-    """
-    UPFRONT code analysis that evaluates algorithm and approach BEFORE running tests.
-    This awards partial credit even for code with syntax errors or bugs.
-    
-    Evaluates:
-    - Algorithm choice and correctness
-    - Problem understanding
-    - Logical approach
-    - Code structure and readability
-    """
-    if not HUGGINGFACE_API_KEY:
-        # Use local heuristic fallback when AI unavailable
-        return local_logic_analyzer(code, language, test_cases)
-    
+def build_analysis_payload(code, language, test_cases, stream=False):
+    """Build the Hugging Face request payload for the code approach analysis."""
     # Build test cases context
     test_context = "\nTEST CASES:\n"
     for i, tc in enumerate(test_cases[:3], 1):
@@ -350,171 +283,454 @@ Then provide 2-3 sentences explaining your score, focusing on what they got RIGH
 Example: "LOGIC_SCORE: 8/10. The student correctly implemented a two-pointer approach which is optimal for this problem. There's a syntax error (missing colon) but the algorithm logic is sound. Once the syntax is fixed, this will work perfectly."
 """
 
+    return {
+        "inputs": prompt,
+        "parameters": {
+            "max_new_tokens": 200,
+            "temperature": 0.3,
+            "top_p": 0.9,
+            "return_full_text": False
+        },
+        "stream": stream
+    }
+
+
+def huggingface_headers():
+    return {
+        "Authorization": f"Bearer {HUGGINGFACE_API_KEY}",
+        "Content-Type": "application/json"
+    }
+
+
+SCORE_PATTERN = re.compile(r'LOGIC[_\s]*SCORE[:\s]*([0-9]+(?:\.[0-9]+)?)\s*/\s*10', re.IGNORECASE)
+
+
+def analysis_from_text(feedback_text):
+    """Analysis dict for the model's feedback text (score, hard-coding concern)."""
+    logic_score = None
+    concerns = []
+
+    # Extract logic score
+    score_match = SCORE_PATTERN.search(feedback_text)
+    if score_match:
+        try:
+            score_value = float(score_match.group(1))
+            logic_score = max(0, min(10, round(score_value, 1)))
+        except (ValueError, IndexError):
+            logic_score = None
+
+    # Detect hard-coding
+    feedback_lower = feedback_text.lower()
+    if any(kw in feedback_lower for kw in ['hard-coded', 'hardcoded', 'hard coded']):
+        concerns.append("hard_coded")
+
+    return {
+        "feedback": feedback_text,
+        "logic_score": logic_score,
+        "concerns": concerns,
+        "status": "success"
+    }
+
+
+def parse_analysis_result(result):
+    """Turn a successful Hugging Face response body into an analysis dict."""
+    if isinstance(result, list) and len(result) > 0:
+        feedback_text = result[0].get("generated_text", "").strip()
+        if feedback_text:
+            return analysis_from_text(feedback_text)
+
+    return {
+        "feedback": "AI returned empty response",
+        "logic_score": None,
+        "concerns": [],
+        "status": "empty_response"
+    }
+
+
+# ---------- Streaming Analysis ----------
+class StreamError(Exception):
+    """The inference API reported an error in the middle of a stream."""
+
+
+def stream_token(line):
+    """
+    Text of one server-sent event line from a streaming generation
+    (`data: {"token": {"text": ...}, ...}`), or "" for anything else.
+    """
+    if not line or not line.startswith("data:"):
+        return ""
+    event = json.loads(line[len("data:"):])
+    if "error" in event:
+        raise StreamError(event["error"])
+    token = event.get("token") or {}
+    return "" if token.get("special") else token.get("text", "")
+
+
+# Feedback still being generated after its score was reported, by "feedback_id"
+_pending_feedback = OrderedDict()
+_pending_feedback_lock = threading.Lock()
+MAX_PENDING_FEEDBACK = 1000
+
+
+def register_feedback(future):
+    """Keep a Future of the finished analysis for on_feedback_ready; returns its id."""
+    feedback_id = uuid.uuid4().hex
+    with _pending_feedback_lock:
+        _pending_feedback[feedback_id] = future
+        while len(_pending_feedback) > MAX_PENDING_FEEDBACK:
+            _pending_feedback.popitem(last=False)  # never collected
+    return feedback_id
+
+
+def on_feedback_ready(feedback_id, callback):
+    """Call callback(analysis) once the feedback with this id has finished (right away if it has)."""
+    with _pending_feedback_lock:
+        future = _pending_feedback.pop(feedback_id, None)
+    if future is not None:
+        future.add_done_callback(lambda done: callback(done.result()))
+
+
+def _finish_stream(response, lines, text):
     try:
-        headers = {
-            "Authorization": f"Bearer {HUGGINGFACE_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        payload = {
-            "inputs": prompt,
-            "parameters": {
-                "max_new_tokens": 200,
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "return_full_text": False
-            }
-        }
-        
+        for line in lines:
+            text += stream_token(line)
+    except Exception:
+        pass  # Keep whatever was generated before the stream broke
+    finally:
+        response.close()
+    return analysis_from_text(text.strip())
+
+
+def stream_analysis(code, language, test_cases, after_score=FINISH_IN_BACKGROUND):
+    """
+    Streamed analysis: reads tokens as they're generated and returns as soon
+    as LOGIC_SCORE: X/10 appears. With STOP_AFTER_SCORE the generation is
+    cancelled there (closing the connection); with FINISH_IN_BACKGROUND the
+    rest is read on the analysis executor and the result carries a
+    "feedback_id" for on_feedback_ready. Returns None if the request failed.
+    """
+    response = requests.post(
+        HUGGINGFACE_API_URL,
+        headers=huggingface_headers(),
+        json=build_analysis_payload(code, language, test_cases, stream=True),
+        stream=True,
+        timeout=30
+    )
+    if response.status_code != 200:
+        response.close()
+        return None
+
+    lines = response.iter_lines(decode_unicode=True)
+    text = ""
+    try:
+        for line in lines:
+            text += stream_token(line)
+            if SCORE_PATTERN.search(text):
+                break
+        else:
+            # Finished without a score
+            return analysis_from_text(text.strip()) if text.strip() else parse_analysis_result([])
+    except Exception:
+        response.close()
+        raise
+
+    analysis = analysis_from_text(text.strip())
+    if after_score == STOP_AFTER_SCORE:
+        response.close()
+    else:
+        analysis["feedback_id"] = register_feedback(_analysis_executor.submit(_finish_stream, response, lines, text))
+    return analysis
+
+
+def analyze_code_approach(code, language, question_description, test_cases, after_score=FINISH_IN_BACKGROUND):
+    """
+    UPFRONT code analysis that evaluates algorithm and approach BEFORE running tests.
+    This awards partial credit even for code with syntax errors or bugs.
+    
+    Evaluates:
+    - Algorithm choice and correctness
+    - Problem understanding
+    - Logical approach
+    - Code structure and readability
+
+    With HUGGINGFACE_STREAM set, `after_score` decides what happens to the
+    feedback after the score (see stream_analysis).
+    """
+    # The local analysis is cheap, settles clear-cut cases on its own and is
+    # the fallback whenever the AI is unavailable
+    local_analysis = local_logic_analyzer(code, language, test_cases)
+    if not HUGGINGFACE_API_KEY or local_analysis["confidence"] >= code_analysis.CONFIDENT:
+        return local_analysis
+
+    try:
+        if HUGGINGFACE_STREAM:
+            return stream_analysis(code, language, test_cases, after_score) or local_analysis
+
         response = requests.post(
             HUGGINGFACE_API_URL,
-            headers=headers,
-            json=payload,
+            headers=huggingface_headers(),
+            json=build_analysis_payload(code, language, test_cases),
             timeout=30
         )
         
         if response.status_code == 200:
-            result = response.json()
-            if isinstance(result, list) and len(result) > 0:
-                feedback_text = result[0].get("generated_text", "").strip()
-                
-                logic_score = None
-                concerns = []
-                
-                if feedback_text:
-                    # Extract logic score
-                    score_match = re.search(r'LOGIC[_\s]*SCORE[:\s]*([0-9]+(?:\.[0-9]+)?)\s*/\s*10', feedback_text, re.IGNORECASE)
-                    if score_match:
-                        try:
-                            score_value = float(score_match.group(1))
-                            logic_score = max(0, min(10, round(score_value, 1)))
-                        except (ValueError, IndexError):
-                            logic_score = None
-                    
-                    # Detect hard-coding
-                    feedback_lower = feedback_text.lower()
-                    if any(kw in feedback_lower for kw in ['hard-coded', 'hardcoded', 'hard coded']):
-                        concerns.append("hard_coded")
-                    
-                    return {
-                        "feedback": feedback_text,
-                        "logic_score": logic_score,
-                        "concerns": concerns,
-                        "status": "success"
-                    }
-                    
-            return {
-                "feedback": "AI returned empty response",
-                "logic_score": None,
-                "concerns": [],
-                "status": "empty_response"
-            }
+            return parse_analysis_result(response.json())
         elif response.status_code == 503:
             # Model loading - use local fallback
-            return local_logic_analyzer(code, language, test_cases)
+            return local_analysis
         else:
             # Any other error - use local fallback
-            return local_logic_analyzer(code, language, test_cases)
+            return local_analysis
             
     except requests.exceptions.Timeout:
         # Timeout - use local fallback
-        return local_logic_analyzer(code, language, test_cases)
+        return local_analysis
     except Exception as e:
         # Any exception - use local fallback
-        return local_logic_analyzer(code, language, test_cases)
+        return local_analysis
 
 # ---------- Evaluate a Submission ----------
-def evaluate_submission(code, language, test_cases):
-    """
-    NEW APPROACH: Analyze code logic FIRST, then run tests
-    This ensures partial credit even for code with syntax errors
-    """
+def language_mismatch_report(test_cases, error_message):
+    """Report for code whose language doesn't match the selection: error with NO score."""
     results = []
-    total_tests = len(test_cases)
-    passed_tests = 0
-    
-    # STEP 0: Validate language match FIRST
-    is_valid, error_message = validate_language_match(code, language)
-    if not is_valid:
-        # Language mismatch - return error with NO score
-        for case in test_cases:
-            results.append({
-                "input": case["input"],
-                "expected": case["expected"],
-                "output": "",
-                "error": error_message,
-                "is_correct": False,
-                "ai_feedback": error_message if not results else "",
-                "logic_score": None,
-                "concerns": ["language_mismatch"],
-                "status": "language_mismatch"
-            })
-        
-        return {
-            "score": 0,
-            "test_case_score": 0,
-            "logic_score": None,
-            "hard_coded_detected": False,
-            "results": results
-        }
-    
-    # STEP 1: Analyze code approach UPFRONT (before running anything)
-    # This awards partial credit for correct algorithm even with syntax errors!
-    upfront_analysis = analyze_code_approach(
-        code=code,
-        language=language,
-        question_description="",
-        test_cases=test_cases
-    )
-    
-    overall_logic_score = upfront_analysis.get("logic_score")
-    overall_feedback = upfront_analysis.get("feedback", "")
-    has_hard_coded = "hard_coded" in upfront_analysis.get("concerns", [])
-    
-    # STEP 2: Run test cases
     for case in test_cases:
-        input_data = case["input"]
-        expected_output = case["expected"]
+        results.append({
+            "input": case["input"],
+            "expected": case["expected"],
+            "output": "",
+            "error": error_message,
+            "is_correct": False,
+            "ai_feedback": error_message if not results else "",
+            "logic_score": None,
+            "concerns": ["language_mismatch"],
+            "status": "language_mismatch",
+            "verdict": "language_mismatch",
+            "time_ms": None
+        })
 
-        run_result = run_code(code, language, input_data)
-        output = run_result["output"]
-        error = run_result.get("error", "")
+    return {
+        "score": 0,
+        "test_case_score": 0,
+        "logic_score": None,
+        "hard_coded_detected": False,
+        "results": results
+    }
 
-        # Check if test passed
-        is_correct = evaluate_logic(output, expected_output) if not error else False
-        if is_correct:
-            passed_tests += 1
 
-        results.append({
-            "input": input_data,
-            "expected": expected_output,
-            "output": output,
-            "error": error,
-            "is_correct": is_correct,
-            "ai_feedback": overall_feedback if results == [] else "",  # Show feedback on first test only
-            "logic_score": overall_logic_score if results == [] else None,
-            "concerns": upfront_analysis.get("concerns", []) if results == [] else [],
+def program_result(program, case, run_result=None, judgement=None):
+    """
+    Per-test result entry. `run_result` is None when the program failed to
+    compile; `judgement` is the question's checker verdict (see core/checkers.py),
+    None to compare the output exactly.
+    """
+    compiled = run_result is not None
+    if not compiled:
+        run_result = {"output": program["output"], "error": program["error"]}
+    output = run_result["output"]
+    error = run_result.get("error", "")
+    # Check if test passed
+    if judgement is not None:
+        is_correct = judgement["verdict"] == "passed"
+    else:
+        is_correct = evaluate_logic(output, case["expected"]) if not error else False
+
+    if not compiled:
+        verdict = "compile_error"
+    elif error == TIMEOUT_ERROR:
+        verdict = "timeout"
+    elif error:
+        verdict = "runtime_error"
+    elif judgement is not None:
+        verdict = judgement["verdict"]
+    else:
+        verdict = "passed" if is_correct else "wrong_answer"
+
+    result = {
+        "input": case["input"],
+        "expected": case["expected"],
+        "output": output,
+        "error": error,
+        "is_correct": is_correct,
+        "verdict": verdict,
+        "score": judgement["score"] if judgement is not None else float(is_correct),
+        "time_ms": run_result.get("time_ms")
+    }
+    if judgement is not None:
+        result["checker_message"] = judgement["message"]
+    return result
+
+
+def analysis_event(upfront_analysis):
+    return {
+        "event": "analysis",
+        "logic_score": upfront_analysis.get("logic_score"),
+        "feedback": upfront_analysis.get("feedback", ""),
+        "concerns": upfront_analysis.get("concerns", []),
+        "status": upfront_analysis.get("status", "unknown")
+    }
+
+
+def final_report(results, upfront_analysis):
+    """Attach the logic analysis to the test results and compute the combined score."""
+    total_tests = len(results)
+    passed_tests = sum(1 for result in results if result["is_correct"])
+
+    overall_logic_score = upfront_analysis.get("logic_score")
+    overall_feedback = upfront_analysis.get("feedback", "")
+    concerns = upfront_analysis.get("concerns", [])
+    has_hard_coded = "hard_coded" in concerns
+
+    for index, result in enumerate(results):
+        result.update({
+            "ai_feedback": overall_feedback if index == 0 else "",  # Show feedback on first test only
+            "logic_score": overall_logic_score if index == 0 else None,
+            "concerns": concerns if index == 0 else [],
             "status": upfront_analysis.get("status", "unknown")
         })
 
-    # Calculate test case score (0-100%)
-    test_case_score = round((passed_tests / total_tests) * 100, 2)
-    
+    # Calculate test case score (0-100%); a checker can give partial credit per test
+    earned = sum(result.get("score", float(result["is_correct"])) for result in results)
+    test_case_score = round((earned / total_tests) * 100, 2) if total_tests else 0
+
     # Calculate combined score for partial credit
     # 50% weight on test cases, 50% weight on logic correctness
     combined_score = test_case_score
     if overall_logic_score is not None:
         logic_percentage = overall_logic_score * 10
         combined_score = round((test_case_score * 0.5) + (logic_percentage * 0.5), 2)
-    
-    return {
+
+    report = {
         "score": combined_score,
         "test_case_score": test_case_score,
         "logic_score": overall_logic_score,
         "hard_coded_detected": has_hard_coded,
         "results": results
     }
+    if upfront_analysis.get("feedback_id"):
+        # The feedback is still streaming in (see on_feedback_ready)
+        report["feedback_id"] = upfront_analysis["feedback_id"]
+    return report
+
+
+def iter_evaluation(code, language, test_cases, priority=SUBMIT, owner=None, checker=None):
+    """
+    Evaluate a submission step by step, yielding progress events:
+
+      {"event": "compile", ...}           once the code is compiled (or fails to)
+      {"event": "test", ...}              as each test case finishes
+      {"event": "analysis", ...}          when the logic analysis is ready
+      {"event": "done", "report": {...}}  the same report evaluate_submission returns
+
+    `priority` and `owner` are passed to the evaluation scheduler for the
+    compile step and every test run (see core/scheduler.py). With a `checker`
+    (core/checkers.py) outputs are judged by it instead of compared exactly.
+    """
+    # STEP 0: Validate language match FIRST
+    is_valid, error_message = validate_language_match(code, language)
+    if not is_valid:
+        yield {"event": "done", "report": language_mismatch_report(test_cases, error_message)}
+        return
+
+    # STEP 1: Start the code approach analysis UPFRONT (before running anything)
+    # This awards partial credit for correct algorithm even with syntax errors!
+    # It runs in the background so the AI call overlaps with the test runs.
+    analysis_future = _analysis_executor.submit(
+        analyze_code_approach,
+        code=code,
+        language=language,
+        question_description="",
+        test_cases=test_cases,
+        after_score=STOP_AFTER_SCORE if priority == INTERACTIVE else FINISH_IN_BACKGROUND
+    )
+
+    # STEP 2: Compile once, then run every test case against the same program
+    results = []
+    with build_directory(language) as tempdir:
+        program = prepare_program(code, language, tempdir, priority=priority, owner=owner)
+        yield {
+            "event": "compile",
+            "status": "error" if program["error"] else "ok",
+            "output": program["output"],
+            "error": program["error"]
+        }
+
+        for index, case in enumerate(test_cases):
+            run_result = None
+            if not program["error"]:
+                run_result = execute_program(
+                    program["run_cmd"], case["input"], priority=priority, owner=owner, timeout=program["timeout"]
+                )
+            judgement = checker.judge(case, run_result, priority, owner, tempdir) if checker and run_result else None
+            results.append(program_result(program, case, run_result, judgement))
+            yield {"event": "test", "index": index, "total": len(test_cases), "result": dict(results[-1])}
+
+    upfront_analysis = analysis_future.result()
+    yield analysis_event(upfront_analysis)
+    yield {"event": "done", "report": final_report(results, upfront_analysis)}
+
+
+def evaluate_submission(code, language, test_cases, priority=SUBMIT, owner=None, checker=None):
+    """
+    NEW APPROACH: Analyze code logic FIRST, then run tests
+    This ensures partial credit even for code with syntax errors
+
+    Runs iter_evaluation to the end and returns the final report.
+    """
+    for event in iter_evaluation(code, language, test_cases, priority=priority, owner=owner, checker=checker):
+        if event["event"] == "done":
+            return event["report"]
+
+
+# ---------- Quick Check (fail-fast) ----------
+def quick_check_report(status, tests_run, total_tests, failed_case=None, error=""):
+    return {
+        "passed": status == "passed",
+        "tests_run": tests_run,
+        "total_tests": total_tests,
+        "failed_case": failed_case,
+        "error": error,
+        "status": status
+    }
+
+
+def quick_check_failure(index, total_tests, case, result):
+    """The quick check report for the first failed case (its result, without is_correct)"""
+    failed_case = {"id": case.get("id")}
+    failed_case.update(result)
+    del failed_case["is_correct"]
+    return quick_check_report("failed", index + 1, total_tests, failed_case, result["error"])
+
+
+def quick_check(code, language, test_cases, priority=INTERACTIVE, owner=None, checker=None):
+    """
+    Fast feedback loop for the Run button.
+    Runs test cases in the given order (callers pass the ones most likely to
+    fail first) and stops at the first failure. No AI analysis is done here;
+    full grading is still done by evaluate_submission.
+    """
+    total_tests = len(test_cases)
+
+    is_valid, error_message = validate_language_match(code, language)
+    if not is_valid:
+        return quick_check_report("language_mismatch", 0, total_tests, error=error_message)
+
+    with build_directory(language) as tempdir:
+        program = prepare_program(code, language, tempdir, priority=priority, owner=owner)
+        if program["error"]:
+            # Reported even when the question has no test cases
+            return quick_check_report("compile_error", 0, total_tests, error=program["error"])
+
+        for index, case in enumerate(test_cases):
+            run_result = execute_program(
+                program["run_cmd"], case["input"], priority=priority, owner=owner, timeout=program["timeout"]
+            )
+            judgement = checker.judge(case, run_result, priority, owner, tempdir) if checker and run_result else None
+            result = program_result(program, case, run_result, judgement)
+
+            if not result["is_correct"]:
+                return quick_check_failure(index, total_tests, case, result)
 
+    return quick_check_report("passed", total_tests, total_tests)
 
 # ---------- Example Execution ----------
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import json
+import os
+import re
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import language_detection
+
+CORPUS = os.path.join(os.path.dirname(language_detection.__file__), "testdata", "language_corpus.jsonl")
+
+
+# ---------- Baseline ----------
+# The detector before language_detection.py: separate re.search calls per
+# pattern, then another scan for the Java class name.
+def legacy_detect(code):
+    if not code or not code.strip():
+        return None, None
+    code_clean = code.strip()
+    language = None
+    java_patterns = [
+        r'\bpublic\s+class\s+\w+', r'\bpublic\s+static\s+void\s+main', r'\bSystem\.out\.print',
+        r'\bprivate\s+\w+\s+\w+\s*\(', r'\bimport\s+java\.',
+    ]
+    cpp_patterns = [
+        r'#include\s*<iostream>', r'\bstd::cout\b', r'\bstd::cin\b', r'\bstd::string\b',
+        r'\busing\s+namespace\s+std',
+    ]
+    c_patterns = [
+        r'#include\s*<stdio\.h>', r'\bprintf\s*\(', r'\bscanf\s*\(', r'#include\s*<stdlib\.h>',
+        r'#include\s*<string\.h>',
+    ]
+    python_patterns = [
+        r'\bdef\s+\w+\s*\(', r'\bimport\s+\w+', r'\bfrom\s+\w+\s+import', r'\bprint\s*\(',
+        r'\bif\s+__name__\s*==\s*["\']__main__["\']', r':\s*$',
+    ]
+    if any(re.search(pattern, code_clean) for pattern in java_patterns):
+        language = 'java'
+    elif any(re.search(pattern, code_clean) for pattern in cpp_patterns):
+        language = 'cpp'
+    elif any(re.search(pattern, code_clean) for pattern in c_patterns):
+        language = 'c'
+    elif sum(1 for pattern in python_patterns if re.search(pattern, code_clean, re.MULTILINE)) >= 2:
+        language = 'python'
+    elif re.search(r'\bdef\s+\w+\s*\(', code_clean) or re.search(r'\bprint\s*\(', code_clean):
+        language = 'python'
+
+    class_name = None
+    if language == 'java':
+        class_match = re.search(r'public\s+class\s+(\w+)', code) or re.search(r'class\s+(\w+)', code)
+        class_name = class_match.group(1) if class_match else None
+    return language, class_name
+
+
+def current_detect(code):
+    language_detection.detect.cache_clear()  # measure the scan, not the cache
+    detection = language_detection.detect(code)
+    # The class name is only looked up for Java code
+    return detection.language, detection.class_name if detection.language == 'java' else None
+
+
+def load_corpus():
+    with open(CORPUS) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def accuracy(detect, corpus):
+    correct = 0
+    for sample in corpus:
+        language, class_name = detect(sample["code"])
+        correct += language == sample["language"] and class_name == sample.get("class_name", class_name)
+    return correct / len(corpus)
+
+
+def time_ms(detect, code, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        detect(code)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        "Check language detection accuracy on the labeled corpus and time the single-pass "
+        "detector against the previous pattern-by-pattern one on large files"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default="1,10,100,1000", help="Comma-separated file sizes in KB")
+        parser.add_argument('--runs', type=int, default=20)
+
+    def handle(self, *args, **options):
+        corpus = load_corpus()
+        self.stdout.write(
+            f"Corpus of {len(corpus)} samples: single-pass {accuracy(current_detect, corpus):.0%} correct, "
+            f"previous {accuracy(legacy_detect, corpus):.0%}"
+        )
+
+        self.stdout.write(f"{'language':<10}{'size':>8}{'previous':>12}{'single-pass':>14}{'speedup':>10}")
+        for language in ("python", "c", "cpp", "java"):
+            sample = max((s["code"] for s in corpus if s["language"] == language), key=len)
+            for size in (int(kb) for kb in options['sizes'].split(",")):
+                # Pad the sample with filler lines, so its signals stay near the top as in real files
+                code = sample + "\n" + "\n".join(
+                    f"// helper {n}\n    x{n} = y{n} + z{n};" for n in range(size * 1024 // 40)
+                )
+                if language == "python":
+                    code = code.replace("//", "#").replace(";", "")
+                if legacy_detect(code) != current_detect(code):
+                    self.stdout.write(self.style.ERROR(f"{language} {size}KB: detectors disagree"))
+                legacy = time_ms(legacy_detect, code, options['runs'])
+                current = time_ms(current_detect, code, options['runs'])
+                self.stdout.write(
+                    f"{language:<10}{size:>6}KB{legacy:>10.3f}ms{current:>12.3f}ms{legacy / current:>9.1f}x"
+                )
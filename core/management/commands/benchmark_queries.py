@@ -0,0 +1,265 @@
+import json
+import os
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.test import RequestFactory
+from django.utils import timezone
+
+BATCH_SIZE = 5000
+SUBMISSION_INDEXES = (
+    "submission_student_time_idx",
+    "submission_question_time_idx",
+    "submission_student_q_idx",
+    "submission_faculty_time_idx",
+)
+# A scenario this much slower than the baseline is reported as a regression
+REGRESSION_FACTOR = 1.5
+
+
+# ---------- Synthetic Data ----------
+def generate(faculties, students, questions, submissions, distinct_code, days, stdout):
+    from django.contrib.auth.models import User
+    from core.models import CodeBlob, Faculty, Group, Question, Student, Submission
+
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with transaction.atomic():
+        User.objects.bulk_create(
+            [User(username=f"bench-faculty-{f}") for f in range(faculties)] +
+            [User(username=f"bench-student-{s}") for s in range(students)],
+            batch_size=BATCH_SIZE
+        )
+        users = dict(User.objects.values_list("username", "id"))
+        Faculty.objects.bulk_create([
+            Faculty(user_id=users[f"bench-faculty-{f}"], department="CS") for f in range(faculties)
+        ])
+        faculty_ids = list(Faculty.objects.order_by("id").values_list("id", flat=True))
+
+        Group.objects.bulk_create([
+            Group(name=f"Section {g}", faculty_id=faculty_id) for faculty_id in faculty_ids for g in range(5)
+        ])
+        groups = {}
+        for group_id, faculty_id in Group.objects.values_list("id", "faculty_id"):
+            groups.setdefault(faculty_id, []).append(group_id)
+
+        Student.objects.bulk_create([
+            Student(
+                user_id=users[f"bench-student-{s}"],
+                faculty_id=faculty_ids[s % faculties],
+                group_id=rng.choice(groups[faculty_ids[s % faculties]])
+            )
+            for s in range(students)
+        ], batch_size=BATCH_SIZE)
+        Question.objects.bulk_create([
+            Question(
+                faculty_id=faculty_ids[q % faculties], title=f"Question {q}",
+                description=f"Synthetic {rng.choice(('sorting', 'graphs', 'strings', 'arrays'))} problem"
+            )
+            for q in range(questions)
+        ])
+
+        students_by_faculty, questions_by_faculty = {}, {}
+        for student_id, faculty_id in Student.objects.values_list("id", "faculty_id"):
+            students_by_faculty.setdefault(faculty_id, []).append(student_id)
+        for question_id, faculty_id in Question.objects.values_list("id", "faculty_id"):
+            questions_by_faculty.setdefault(faculty_id, []).append(question_id)
+
+        # Distinct sources with a spread of identifiers, so code search has realistic posting lists
+        identifiers = [f"{word}_{k}" for word in ("total", "count", "best", "left", "memo") for k in range(100)]
+        blob_ids = [
+            CodeBlob.store(
+                f"def solve():\n    {rng.choice(identifiers)} = {n}\n"
+                f"    for i in range({n % 97}):\n        {rng.choice(identifiers)} += i\n    print({n})\n"
+            ).id
+            for n in range(distinct_code)
+        ]
+        now = timezone.now()
+        span = days * 24 * 3600
+
+        batch = []
+        for n in range(submissions):
+            faculty_id = faculty_ids[n % faculties]
+            score = rng.choice((0.0, 33.3, 66.7, 100.0))
+            batch.append(Submission(
+                faculty_id=faculty_id,
+                student_id=rng.choice(students_by_faculty[faculty_id]),
+                question_id=rng.choice(questions_by_faculty[faculty_id]),
+                code_blob_id=rng.choice(blob_ids),
+                language=rng.choice(("python", "c", "cpp", "java")),
+                score=score,
+                test_case_score=score,
+                logic_score=rng.uniform(40, 100),
+                passed_count=int(score // 33),
+                total_count=3
+            ))
+            if len(batch) == BATCH_SIZE:
+                Submission.objects.bulk_create(batch)
+                batch = []
+                if (n + 1) % 100000 == 0:
+                    stdout.write(f"  {n + 1} submissions ({time.perf_counter() - started:.0f}s)")
+        Submission.objects.bulk_create(batch)
+
+    # bulk_create stamps submitted_at with the current time (auto_now_add); spread them out in one pass
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "UPDATE core_submission SET submitted_at = datetime(%s, '-' || (abs(random()) %% %s) || ' seconds')",
+            [now.strftime("%Y-%m-%d %H:%M:%S"), span]
+        )
+        cursor.execute("ANALYZE")
+    stdout.write(f"Generated {submissions} submissions in {time.perf_counter() - started:.0f}s")
+
+
+# ---------- Scenarios ----------
+def scenarios():
+    """(name, callable) pairs running the Submission queries of each view"""
+    from core.models import Question, Student, Submission
+    from core.search import search_questions, search_submissions
+    from core.stats import BEST_FIRST, LATEST_FIRST, STUDENT_AGGREGATES
+    from core.views import (
+        filter_submissions, keyset_page, encode_cursor, submission_summaries, performance_csv_rows
+    )
+
+    factory = RequestFactory()
+    student = Student.objects.order_by("id").first()
+    faculty = student.faculty
+    question = Question.objects.filter(faculty=faculty).order_by("id").first()
+    group_id = student.group_id
+    today = timezone.localdate()
+
+    history = Submission.objects.filter(student=student).select_related("question").only(
+        "id", "language", "score", "passed_count", "total_count", "submitted_at", "question__title"
+    )
+    faculty_list = submission_summaries(faculty)
+    # A cursor halfway down the faculty's list
+    middle = faculty_list.order_by("-submitted_at", "-id")[faculty_list.count() // 2]
+    deep_cursor = encode_cursor(middle)
+
+    def page(queryset, cursor=None):
+        return lambda: keyset_page(queryset, cursor)
+
+    def filtered(**params):
+        return lambda: keyset_page(filter_submissions(factory.get("/", params), faculty_list), None)
+
+    attempts = Submission.objects.filter(student=student, question=question)
+    return [
+        ("student_history", page(history)),
+        ("faculty_list_first_page", page(faculty_list)),
+        ("faculty_list_deep_page", page(faculty_list, deep_cursor)),
+        ("faculty_list_by_question", filtered(question=str(question.id))),
+        ("faculty_list_by_group", filtered(group=str(group_id))),
+        ("faculty_list_last_week", filtered(date_from=str(today - timedelta(days=7)), date_to=str(today))),
+        ("performance_csv_export", lambda: list(performance_csv_rows(faculty, factory.get("/")).iterator(2000))),
+        ("search_questions", lambda: search_questions(faculty, "sorted arrays")),
+        ("search_code_rare", lambda: search_submissions(faculty, "memo_42")),
+        ("search_code_common", lambda: search_submissions(faculty, "total_7 print")),
+        ("stats_refresh", lambda: (
+            attempts.aggregate(**STUDENT_AGGREGATES),
+            attempts.order_by(*BEST_FIRST).values_list("id", flat=True).first(),
+            attempts.order_by(*LATEST_FIRST).values_list("id", flat=True).first(),
+        )),
+    ]
+
+
+def run_scenario(run, runs):
+    """Median milliseconds over `runs` runs, and the query plans of the statements it executed"""
+    connection = connections["default"]
+    timings = []
+    for _ in range(runs):
+        connection.queries_log.clear()
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    executed = [query["sql"] for query in connection.queries_log]
+    plans = []
+    with connection.cursor() as cursor:
+        for sql in executed:
+            if sql.lstrip().upper().startswith("SELECT"):
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plans.append([row[-1] for row in cursor.fetchall()])
+    return statistics.median(timings), plans
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset in a scratch SQLite database and record the query plan "
+        "and timing of each Submission query the views run"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--db', help="Scratch database path; generated if missing, reused otherwise")
+        parser.add_argument('--faculties', type=int, default=20)
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--questions', type=int, default=400)
+        parser.add_argument('--submissions', type=int, default=1_000_000)
+        parser.add_argument('--distinct-code', type=int, default=20000, help="Distinct source texts (CodeBlobs)")
+        parser.add_argument('--days', type=int, default=120, help="Spread submissions over this many days")
+        parser.add_argument('--runs', type=int, default=5, help="Timed runs per scenario (median is reported)")
+        parser.add_argument('--without-indexes', action='store_true',
+                            help="Drop the composite Submission indexes first, to measure without them")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+        parser.add_argument('--baseline', help="Compare against a JSON file written by --output")
+
+    def handle(self, *args, **options):
+        db_path = options['db'] or os.path.join(
+            os.path.dirname(settings.DATABASES['default']['NAME']), "benchmark.sqlite3"
+        )
+        if os.path.abspath(db_path) == os.path.abspath(settings.DATABASES['default']['NAME']):
+            raise CommandError("Refusing to generate benchmark data in the real database")
+
+        # Point this process at the scratch database
+        connections['default'].close()
+        settings.DATABASES['default']['NAME'] = db_path
+        connections['default'].settings_dict['NAME'] = db_path
+        connections['default'].force_debug_cursor = True
+
+        if not os.path.exists(db_path):
+            self.stdout.write(f"Generating dataset in {db_path}")
+            call_command('migrate', verbosity=0)
+            generate(options['faculties'], options['students'], options['questions'],
+                     options['submissions'], options['distinct_code'], options['days'], self.stdout)
+
+        if options['without_indexes']:
+            with connections['default'].cursor() as cursor:
+                for name in SUBMISSION_INDEXES:
+                    cursor.execute(f"DROP INDEX IF EXISTS {name}")
+                # Plain foreign key indexes only
+                for column in ("student_id", "question_id", "faculty_id"):
+                    cursor.execute(f"CREATE INDEX IF NOT EXISTS bench_submission_{column} ON core_submission ({column})")
+                cursor.execute("ANALYZE")
+            self.stdout.write(self.style.WARNING(
+                f"Composite indexes dropped from {db_path}; delete it to regenerate with them"
+            ))
+
+        baseline = {}
+        if options['baseline']:
+            with open(options['baseline']) as f:
+                baseline = json.load(f)
+
+        results = {}
+        for name, run in scenarios():
+            median_ms, plans = run_scenario(run, options['runs'])
+            results[name] = {"median_ms": round(median_ms, 2), "plans": plans}
+
+            line = f"{name:<28} {median_ms:>10.2f} ms"
+            previous = baseline.get(name)
+            if previous:
+                line += f"   (baseline {previous['median_ms']:.2f} ms)"
+                if median_ms > previous["median_ms"] * REGRESSION_FACTOR:
+                    line = self.style.ERROR(line + "  REGRESSION")
+            self.stdout.write(line)
+            for plan in plans:
+                for step in plan:
+                    self.stdout.write(f"    {step}")
+
+        if options['output']:
+            with open(options['output'], "w") as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+MODES = ("default", "production")
+
+
+# ---------- Worker Processes ----------
+def _init_worker(settings_module, mode, db_path):
+    # Spawned processes read SQLITE_MODE while importing settings, then point at the scratch database
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    os.environ["SQLITE_MODE"] = mode
+    import django
+    django.setup()
+    settings.DATABASES["default"]["NAME"] = db_path
+
+
+def _prepare(students):
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from core.models import Faculty, Question, Student, TestCase
+
+    call_command("migrate", verbosity=0)
+    faculty = Faculty.objects.create(user=User.objects.create(username="bench-faculty"), department="CS")
+    question = Question.objects.create(faculty=faculty, title="Bench", description="Add two numbers")
+    TestCase.objects.bulk_create([
+        TestCase(question=question, input_data=f"{i} {i}", expected_output=str(2 * i)) for i in range(3)
+    ])
+    for i in range(students):
+        Student.objects.create(user=User.objects.create(username=f"bench-student-{i}"), faculty=faculty)
+    return question.id
+
+
+def _write(worker, question_id, count, retry):
+    """Insert `count` graded submissions the way the submit view does; returns (ok, lock errors, seconds)"""
+    from django.db import OperationalError
+    from core.db import is_lock_error
+    from core.models import Question, Student
+    from core.views import store_submission
+
+    store = store_submission if retry else store_submission.__wrapped__
+    question = Question.objects.get(id=question_id)
+    students = list(Student.objects.order_by("id"))
+    test_cases = list(question.test_cases.order_by("id").values("id", "input_data", "expected_output"))
+    ok = locked = 0
+
+    started = time.perf_counter()
+    for i in range(count):
+        passed = (worker + i) % 3
+        report = {
+            "score": passed * 33.3,
+            "test_case_score": passed * 33.3,
+            "logic_score": 70,
+            "results": [
+                {"is_correct": n < passed, "verdict": "passed" if n < passed else "wrong_answer",
+                 "output": "x", "error": "", "time_ms": 3}
+                for n in range(len(test_cases))
+            ],
+        }
+        code = f"# worker {worker} attempt {i}\nprint(sum(map(int, input().split())))\n"
+        try:
+            store(students[(worker + i) % len(students)], question, code, "python", test_cases, report)
+            ok += 1
+        except OperationalError as e:
+            if not is_lock_error(e):
+                raise
+            locked += 1
+    return ok, locked, time.perf_counter() - started
+
+
+def _read(count):
+    """Report-style reads running alongside the writers; returns (queries, seconds)"""
+    from django.db.models import Avg, Count
+    from core.models import Submission, TestResult
+
+    started = time.perf_counter()
+    for _ in range(count):
+        list(Submission.objects.order_by("-submitted_at").values("id", "score")[:50])
+        list(Submission.objects.values("student_id").annotate(attempts=Count("id"), average=Avg("score")))
+        TestResult.objects.filter(status=TestResult.WRONG_ANSWER).count()
+    return count * 3, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent Submission write throughput on a scratch SQLite database "
+        "with the default settings and with SQLITE_MODE=production"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent writer processes")
+        parser.add_argument('--submissions', type=int, default=100, help="Submissions per writer")
+        parser.add_argument('--readers', type=int, default=2, help="Concurrent reader processes")
+        parser.add_argument('--mode', choices=MODES + ("both",), default="both")
+        parser.add_argument('--no-retry', action='store_true', help="Don't retry inserts that hit a lock error")
+        parser.add_argument('--dir', help="Where to create the scratch database (default: next to the real one)")
+
+    def handle(self, *args, **options):
+        settings_module = os.environ.get("DJANGO_SETTINGS_MODULE", "saravi_project.settings")
+        modes = MODES if options['mode'] == "both" else (options['mode'],)
+        workers, count, readers = options['workers'], options['submissions'], options['readers']
+        # Same filesystem as the real database, since fsync cost is much of what's being measured
+        scratch_dir = options['dir'] or os.path.dirname(settings.DATABASES['default']['NAME'])
+        context = multiprocessing.get_context("spawn")
+
+        for mode in modes:
+            tempdir = tempfile.mkdtemp(prefix="saravi-bench-", dir=scratch_dir)
+            db_path = os.path.join(tempdir, "bench.sqlite3")
+            try:
+                initargs = (settings_module, mode, db_path)
+                with ProcessPoolExecutor(1, mp_context=context, initializer=_init_worker, initargs=initargs) as pool:
+                    question_id = pool.submit(_prepare, workers * 4).result()
+
+                with ProcessPoolExecutor(
+                    workers + readers, mp_context=context, initializer=_init_worker, initargs=initargs
+                ) as pool:
+                    # Warm the pool so process start-up isn't timed
+                    list(pool.map(time.sleep, [0.2] * (workers + readers)))
+                    started = time.perf_counter()
+                    writes = [pool.submit(_write, w, question_id, count, not options['no_retry']) for w in range(workers)]
+                    reads = [pool.submit(_read, count) for _ in range(readers)]
+                    write_results = [future.result() for future in writes]
+                    read_results = [future.result() for future in reads]
+                    elapsed = time.perf_counter() - started
+            finally:
+                shutil.rmtree(tempdir, ignore_errors=True)
+
+            ok = sum(result[0] for result in write_results)
+            locked = sum(result[1] for result in write_results)
+            read_queries = sum(result[0] for result in read_results)
+            self.stdout.write(
+                f"{mode:>10}: {ok}/{workers * count} submissions stored in {elapsed:.2f}s "
+                f"({ok / elapsed:.0f}/s), {locked} lock error(s); "
+                f"{read_queries} reads ({read_queries / elapsed:.0f}/s)"
+            )
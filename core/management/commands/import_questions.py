@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.question_import import import_questions, BundleError
+from core.models import Faculty
+
+
+class Command(BaseCommand):
+    help = "Bulk-import questions and test cases for a faculty from a JSONL file or zip bundle"
+
+    def add_arguments(self, parser):
+        parser.add_argument('bundle_path', help="Path to the .jsonl or .zip bundle")
+        parser.add_argument('--faculty', required=True, help="Username of the faculty the questions belong to")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; create nothing")
+
+    def handle(self, *args, **options):
+        try:
+            faculty = Faculty.objects.get(user__username=options['faculty'])
+        except Faculty.DoesNotExist:
+            raise CommandError(f"No faculty with username '{options['faculty']}'")
+
+        try:
+            with open(options['bundle_path'], 'rb') as bundle:
+                report = import_questions(bundle, faculty, dry_run=options['dry_run'])
+        except (OSError, BundleError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"Line {error['line']} ({error['title'] or 'no title'}): {'; '.join(error['errors'])}")
+
+        verb = "Would import" if report['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} question(s) with {report['test_cases']} test case(s); "
+            f"{len(report['errors'])} skipped"
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.enrollment import enroll_students, EnrollmentError
+from core.models import Faculty, Group
+
+
+class Command(BaseCommand):
+    help = "Bulk-enroll students for a faculty from a CSV file (username,password[,email,first_name,last_name,group])"
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help="Path to the CSV file")
+        parser.add_argument('--faculty', required=True, help="Username of the faculty the students belong to")
+        parser.add_argument('--group', help="Group name for rows without a group column value")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; create nothing")
+
+    def handle(self, *args, **options):
+        try:
+            faculty = Faculty.objects.get(user__username=options['faculty'])
+        except Faculty.DoesNotExist:
+            raise CommandError(f"No faculty with username '{options['faculty']}'")
+
+        group = None
+        if options['group']:
+            group = Group.objects.filter(faculty=faculty, name=options['group']).first()
+            if group is None:
+                raise CommandError(f"Faculty '{options['faculty']}' has no group '{options['group']}'")
+
+        try:
+            with open(options['csv_path'], 'rb') as csv_file:
+                report = enroll_students(csv_file, faculty, default_group=group, dry_run=options['dry_run'])
+        except (OSError, EnrollmentError) as e:
+            raise CommandError(str(e))
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']} ({error['username'] or 'no username'}): {'; '.join(error['errors'])}")
+
+        verb = "Would create" if report['dry_run'] else "Created"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {report['created']} student(s); {len(report['errors'])} row(s) skipped"
+        ))
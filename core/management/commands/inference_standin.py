@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+FEEDBACK = (
+    "LOGIC_SCORE: 8/10. The student reads the input, builds the answer in one pass and "
+    "prints it. The loop bounds are correct and no outputs are hard coded, but the edge "
+    "case of an empty input is not handled and a helper function would read better."
+)
+
+
+# ---------- Stand-in Server ----------
+class StandinServer(ThreadingHTTPServer):
+    """
+    Streams FEEDBACK one word per event, in the inference API's server-sent
+    event format, `delay` seconds apart. Records how far each stream got, so
+    a caller can check that a cancelled generation really stopped.
+    """
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), feedback=FEEDBACK, delay=0.02):
+        super().__init__(address, StandinHandler)
+        self.feedback = feedback
+        self.delay = delay
+        self.streams = []  # {"sent": tokens written, "total": tokens, "disconnected": bool}
+        self.finished = threading.Condition()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/"
+
+    def wait_for_streams(self, count, timeout=5):
+        """The first `count` streams, once each has ended (finished or disconnected)"""
+        with self.finished:
+            self.finished.wait_for(
+                lambda: len(self.streams) >= count and all("disconnected" in s for s in self.streams[:count]),
+                timeout
+            )
+        return self.streams[:count]
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        tokens = [word + " " for word in self.server.feedback.split(" ")]
+        if not payload.get("stream"):
+            body = json.dumps([{"generated_text": self.server.feedback}]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        stream = {"sent": 0, "total": len(tokens)}
+        self.server.streams.append(stream)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        try:
+            for token in tokens:
+                event = {"token": {"text": token, "special": False}, "generated_text": None}
+                self.wfile.write(f"data:{json.dumps(event)}\n\n".encode())
+                self.wfile.flush()
+                stream["sent"] += 1
+                time.sleep(self.server.delay)
+            done = {"token": {"text": "", "special": True}, "generated_text": self.server.feedback}
+            self.wfile.write(f"data:{json.dumps(done)}\n\n".encode())
+            self.wfile.flush()
+            stream["disconnected"] = False
+        except (BrokenPipeError, ConnectionResetError):
+            stream["disconnected"] = True
+        finally:
+            with self.server.finished:
+                self.server.finished.notify_all()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for the inference API that streams a canned analysis token by "
+        "token (point HUGGINGFACE_API_URL at it and set HUGGINGFACE_STREAM=1)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--delay', type=float, default=0.05, help="Seconds between tokens")
+
+    def handle(self, *args, **options):
+        server = StandinServer(("127.0.0.1", options['port']), delay=options['delay'])
+        self.stdout.write(f"Streaming stand-in listening on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            for stream in server.streams:
+                state = "cancelled" if stream.get("disconnected") else "finished"
+                self.stdout.write(f"  stream {state} after {stream['sent']}/{stream['total']} tokens")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search indexes over questions and submitted code"
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("Search requires the SQLite database")
+        questions, blobs = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {questions} question(s) and {blobs} distinct code blob(s)"))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import similarity
+
+
+class Command(BaseCommand):
+    help = "Recompute the MinHash fingerprints and LSH buckets used to find near-duplicate submissions"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        fingerprints = similarity.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Fingerprinted {fingerprints} distinct source(s) in {time.perf_counter() - started:.1f}s"
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.stats import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-student, per-question and per-group statistics rollups from all submissions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows read and inserted per batch")
+
+    def handle(self, *args, **options):
+        counts = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt statistics: {counts['student_question']} student/question rows, "
+            f"{counts['question']} question rows, {counts['group_question']} group/question rows"
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_remove_group_old_field'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcase',
+            name='failure_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='testcase',
+            name='run_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
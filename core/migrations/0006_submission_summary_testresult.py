@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_testcase_failure_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='concerns',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='feedback',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='hard_coded_detected',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='logic_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='passed_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='test_case_score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='submission',
+            name='total_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TestResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('P', 'Passed'), ('W', 'Wrong answer'), ('R', 'Runtime error'), ('T', 'Timeout'), ('C', 'Compile error'), ('L', 'Language mismatch')], max_length=1)),
+                ('time_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('output', models.TextField(blank=True)),
+                ('error', models.TextField(blank=True)),
+                ('truncated', models.BooleanField(default=False)),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_results', to='core.submission')),
+                ('test_case', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='results', to='core.testcase')),
+            ],
+            options={
+                'ordering': ['position'],
+                'unique_together': {('submission', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,117 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:05
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+TEXT_LIMIT = 1000
+
+
+def result_status(result):
+    """Status code for a stored per-test result (reports saved before verdicts existed)"""
+    error = result.get("error") or ""
+    if result.get("status") == "language_mismatch":
+        return "L"
+    if result.get("is_correct"):
+        return "P"
+    if error.startswith("Compilation Error") or "not installed" in error:
+        return "C"
+    if error == "Timeout Error":
+        return "T"
+    return "R" if error else "W"
+
+
+def split_results(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    TestCase = apps.get_model('core', 'TestCase')
+    TestResult = apps.get_model('core', 'TestResult')
+
+    test_cases = {}  # question id -> test cases in submission order
+    batch = []
+    for submission in Submission.objects.exclude(result__isnull=True).iterator(chunk_size=BATCH_SIZE):
+        report = submission.result or {}
+        results = report.get("results") or []
+        first = results[0] if results else {}
+
+        submission.test_case_score = report.get("test_case_score") or 0
+        submission.logic_score = report.get("logic_score")
+        submission.hard_coded_detected = bool(report.get("hard_coded_detected"))
+        submission.passed_count = sum(1 for result in results if result.get("is_correct"))
+        submission.total_count = len(results)
+        submission.feedback = first.get("ai_feedback") or ""
+        submission.concerns = first.get("concerns") or []
+        submission.save(update_fields=[
+            "test_case_score", "logic_score", "hard_coded_detected",
+            "passed_count", "total_count", "feedback", "concerns"
+        ])
+
+        if submission.question_id not in test_cases:
+            test_cases[submission.question_id] = list(
+                TestCase.objects.filter(question_id=submission.question_id).order_by('id')
+            )
+        cases = test_cases[submission.question_id]
+
+        for position, result in enumerate(results):
+            # Link the test case at the same position if it still matches, else look it up by content
+            case = cases[position] if position < len(cases) else None
+            if case is None or (case.input_data, case.expected_output) != (result.get("input"), result.get("expected")):
+                case = next(
+                    (c for c in cases if (c.input_data, c.expected_output) == (result.get("input"), result.get("expected"))),
+                    None
+                )
+            output = result.get("output") or ""
+            error = result.get("error") or ""
+            batch.append(TestResult(
+                submission_id=submission.id,
+                test_case=case,
+                position=position,
+                status=result_status(result),
+                output=output[:TEXT_LIMIT],
+                error=error[:TEXT_LIMIT],
+                truncated=len(output) > TEXT_LIMIT or len(error) > TEXT_LIMIT
+            ))
+
+        if len(batch) >= BATCH_SIZE:
+            TestResult.objects.bulk_create(batch)
+            batch = []
+
+    TestResult.objects.bulk_create(batch)
+
+
+def rebuild_results(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    TestResult = apps.get_model('core', 'TestResult')
+
+    for submission in Submission.objects.prefetch_related('test_results__test_case').iterator(chunk_size=BATCH_SIZE):
+        results = []
+        for index, test in enumerate(submission.test_results.all()):
+            results.append({
+                "input": test.test_case.input_data if test.test_case else "",
+                "expected": test.test_case.expected_output if test.test_case else "",
+                "output": test.output,
+                "error": test.error,
+                "is_correct": test.status == "P",
+                "ai_feedback": submission.feedback if index == 0 else "",
+                "logic_score": submission.logic_score if index == 0 else None,
+                "concerns": submission.concerns if index == 0 else [],
+            })
+        submission.result = {
+            "score": submission.score,
+            "test_case_score": submission.test_case_score,
+            "logic_score": submission.logic_score,
+            "hard_coded_detected": submission.hard_coded_detected,
+            "results": results
+        }
+        submission.save(update_fields=["result"])
+
+    TestResult.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_submission_summary_testresult'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_results, rebuild_results),
+    ]
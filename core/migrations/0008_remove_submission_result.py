@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_migrate_submission_results'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='submission',
+            name='result',
+        ),
+    ]
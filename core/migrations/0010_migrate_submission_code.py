@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:07
+
+import hashlib
+import zlib
+
+from django.db import migrations
+
+BATCH_SIZE = 500
+
+
+def move_code_to_blobs(apps, schema_editor):
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+    Submission = apps.get_model('core', 'Submission')
+
+    blob_ids = dict(CodeBlob.objects.values_list('digest', 'id'))
+    batch = []
+    for submission in Submission.objects.only('id', 'code').iterator(chunk_size=BATCH_SIZE):
+        text = submission.code or ""
+        digest = hashlib.sha256(text.encode()).hexdigest()
+        if digest not in blob_ids:
+            blob_ids[digest] = CodeBlob.objects.create(
+                digest=digest, data=zlib.compress(text.encode(), 9), size=len(text)
+            ).id
+        submission.code_blob_id = blob_ids[digest]
+        batch.append(submission)
+
+        if len(batch) >= BATCH_SIZE:
+            Submission.objects.bulk_update(batch, ['code_blob'])
+            batch = []
+
+    Submission.objects.bulk_update(batch, ['code_blob'])
+
+
+def restore_code(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+
+    texts = {}  # blob id -> source text
+    batch = []
+    for submission in Submission.objects.select_related('code_blob').iterator(chunk_size=BATCH_SIZE):
+        blob = submission.code_blob
+        if blob.id not in texts:
+            texts[blob.id] = zlib.decompress(blob.data).decode()
+        submission.code = texts[blob.id]
+        batch.append(submission)
+
+        if len(batch) >= BATCH_SIZE:
+            Submission.objects.bulk_update(batch, ['code'])
+            batch = []
+
+    Submission.objects.bulk_update(batch, ['code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_code_blob'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_code_to_blobs, restore_code),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_migrate_submission_code'),
+    ]
+
+    operations = [
+        # Give the column a default first, so unapplying this migration can re-add it
+        migrations.AlterField(
+            model_name='submission',
+            name='code',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='submission',
+            name='code',
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='code_blob',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='submissions', to='core.codeblob'),
+        ),
+    ]
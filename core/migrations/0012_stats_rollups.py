@@ -0,0 +1,69 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_remove_submission_code'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('students_attempted', models.PositiveIntegerField(default=0)),
+                ('students_solved', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('logic_score_total', models.FloatField(default=0)),
+                ('logic_score_count', models.PositiveIntegerField(default=0)),
+                ('first_solved_at', models.DateTimeField(blank=True, null=True)),
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='core.question')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupQuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('students_attempted', models.PositiveIntegerField(default=0)),
+                ('students_solved', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('logic_score_total', models.FloatField(default=0)),
+                ('logic_score_count', models.PositiveIntegerField(default=0)),
+                ('first_solved_at', models.DateTimeField(blank=True, null=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_stats', to='core.group')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to='core.question')),
+            ],
+            options={
+                'unique_together': {('group', 'question')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentQuestionStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('logic_score_total', models.FloatField(default=0)),
+                ('logic_score_count', models.PositiveIntegerField(default=0)),
+                ('first_solved_at', models.DateTimeField(blank=True, null=True)),
+                ('last_submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_stats', to='core.question')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_stats', to='core.student')),
+            ],
+            options={
+                'unique_together': {('student', 'question')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentquestionstats',
+            name='best_submission',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.submission'),
+        ),
+        migrations.AddField(
+            model_name='studentquestionstats',
+            name='latest_submission',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.submission'),
+        ),
+    ]
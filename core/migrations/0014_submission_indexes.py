@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_question_faculty(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    Question = apps.get_model('core', 'Question')
+    Submission.objects.update(
+        faculty_id=models.Subquery(Question.objects.filter(id=models.OuterRef('question_id')).values('faculty_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_student_best_latest_submission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='faculty',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.faculty'),
+        ),
+        migrations.RunPython(copy_question_faculty, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='submission',
+            name='faculty',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.faculty'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='question',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.question'),
+        ),
+        migrations.AlterField(
+            model_name='submission',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.student'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'submitted_at', 'id'], name='submission_student_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['question', 'submitted_at', 'id'], name='submission_question_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['student', 'question', 'submitted_at'], name='submission_student_q_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['faculty', 'submitted_at', 'id'], name='submission_faculty_time_idx'),
+        ),
+    ]
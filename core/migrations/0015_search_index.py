@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:40
+
+import zlib
+
+from django.db import migrations
+
+from core.search import DROP_QUESTION_TRIGGERS, QUESTION_TRIGGERS
+
+BATCH_SIZE = 500
+
+# See core/search.py. Questions use an external-content index kept in sync by
+# triggers (defined there, as 0017 and rebuild_index create them too); code
+# is indexed once per CodeBlob in a contentless table.
+CREATE_TABLES = [
+    """CREATE VIRTUAL TABLE core_question_fts USING fts5(
+        title, description, content='core_question', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    """CREATE VIRTUAL TABLE core_codeblob_fts USING fts5(
+        code, content='', tokenize="unicode61 tokenchars '_'"
+    )""",
+    *QUESTION_TRIGGERS,
+]
+
+DROP_TABLES = [
+    *DROP_QUESTION_TRIGGERS,
+    "DROP TABLE IF EXISTS core_question_fts",
+    "DROP TABLE IF EXISTS core_codeblob_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # FTS5 is SQLite-only; search is unavailable on other databases
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+
+    with schema_editor.connection.cursor() as cursor:
+        for statement in CREATE_TABLES:
+            cursor.execute(statement)
+        cursor.execute("INSERT INTO core_question_fts (core_question_fts) VALUES ('rebuild')")
+        for blob in CodeBlob.objects.only('id', 'data').iterator(chunk_size=BATCH_SIZE):
+            cursor.execute(
+                "INSERT INTO core_codeblob_fts (rowid, code) VALUES (%s, %s)",
+                [blob.id, zlib.decompress(blob.data).decode()]
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in DROP_TABLES:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_submission_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
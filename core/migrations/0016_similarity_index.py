@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CodeFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=20)),
+                ('signature', models.BinaryField()),
+                ('code_blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='core.codeblob')),
+            ],
+            options={
+                'unique_together': {('code_blob', 'language')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SimilarityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField()),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='core.codefingerprint')),
+                ('question', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='core.question')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('question', 'bucket', 'fingerprint'), name='similarity_bucket_unique')],
+            },
+        ),
+    ]
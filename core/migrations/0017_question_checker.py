@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:03
+
+from django.db import migrations, models
+
+from core.search import DROP_QUESTION_TRIGGERS, QUESTION_TRIGGERS
+
+# Adding columns rebuilds core_question on SQLite, which drops the search
+# index triggers from 0015_search_index; they are created again afterwards.
+# (The rows keep their ids, so the index itself stays valid.)
+TRIGGERS = DROP_QUESTION_TRIGGERS + QUESTION_TRIGGERS
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in TRIGGERS:
+            cursor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_similarity_index'),
+    ]
+
+    operations = [
+        # Undoing this migration rebuilds the table too, so restore the triggers last when reversing
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='question',
+            name='checker_code',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='checker_language',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:30
+
+from django.db import migrations
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 500
+
+# 0012_stats_rollups and 0013_student_best_latest_submission created the
+# rollup tables empty, and they are only filled as submissions are saved.
+# This fills them from the existing submissions, the same way as
+# core.stats.rebuild_all (copied here, as migrations can't use the current
+# models). Running it again on filled tables recomputes the same rows.
+SOLVED = Q(total_count__gt=0, passed_count=F('total_count'))
+
+STUDENT_AGGREGATES = {
+    "attempts": Count('id'),
+    "score_total": Coalesce(Sum('score'), 0.0),
+    "best_score": Coalesce(Max('score'), 0.0),
+    "logic_score_total": Coalesce(Sum('logic_score'), 0.0),
+    "logic_score_count": Count('logic_score'),
+    "first_solved_at": Min('submitted_at', filter=SOLVED),
+    "last_submitted_at": Max('submitted_at'),
+}
+
+ROLLUP_AGGREGATES = {
+    "attempts": Sum('attempts'),
+    "students_attempted": Count('id'),
+    "students_solved": Count('id', filter=Q(first_solved_at__isnull=False)),
+    "score_total": Sum('score_total'),
+    "best_score": Max('best_score'),
+    "logic_score_total": Sum('logic_score_total'),
+    "logic_score_count": Sum('logic_score_count'),
+    "first_solved_at": Min('first_solved_at'),
+}
+
+
+def backfill_stats(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    StudentQuestionStats = apps.get_model('core', 'StudentQuestionStats')
+    QuestionStats = apps.get_model('core', 'QuestionStats')
+    GroupQuestionStats = apps.get_model('core', 'GroupQuestionStats')
+
+    GroupQuestionStats.objects.all().delete()
+    QuestionStats.objects.all().delete()
+    StudentQuestionStats.objects.all().delete()
+
+    student_rows = Submission.objects.values('student_id', 'question_id').annotate(**STUDENT_AGGREGATES).order_by()
+    StudentQuestionStats.objects.bulk_create(
+        (StudentQuestionStats(**row) for row in student_rows.iterator(chunk_size=BATCH_SIZE)),
+        batch_size=BATCH_SIZE
+    )
+
+    attempts = Submission.objects.filter(student_id=OuterRef('student_id'), question_id=OuterRef('question_id'))
+    StudentQuestionStats.objects.update(
+        best_submission_id=Subquery(attempts.order_by('-score', 'submitted_at', 'id').values('id')[:1]),
+        latest_submission_id=Subquery(attempts.order_by('-submitted_at', '-id').values('id')[:1])
+    )
+
+    question_rows = StudentQuestionStats.objects.values('question_id').annotate(**ROLLUP_AGGREGATES).order_by()
+    QuestionStats.objects.bulk_create(
+        (QuestionStats(**row) for row in question_rows.iterator(chunk_size=BATCH_SIZE)),
+        batch_size=BATCH_SIZE
+    )
+
+    group_rows = StudentQuestionStats.objects.filter(student__group__isnull=False).values(
+        'question_id', group_id=F('student__group_id')
+    ).annotate(**ROLLUP_AGGREGATES).order_by()
+    GroupQuestionStats.objects.bulk_create(
+        (GroupQuestionStats(**row) for row in group_rows.iterator(chunk_size=BATCH_SIZE)),
+        batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_question_checker'),
+    ]
+
+    operations = [
+        # Nothing to undo: the tables are dropped by reversing 0012/0013
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
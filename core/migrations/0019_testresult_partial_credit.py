@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 20:15
+
+from django.db import migrations, models
+
+
+def score_passed_tests(apps, schema_editor):
+    # Results stored before checkers were all-or-nothing
+    TestResult = apps.get_model('core', 'TestResult')
+    TestResult.objects.filter(status='P').update(score=1.0)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_backfill_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='score',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='testresult',
+            name='status',
+            field=models.CharField(choices=[('P', 'Passed'), ('W', 'Wrong answer'), ('R', 'Runtime error'), ('T', 'Timeout'), ('C', 'Compile error'), ('L', 'Language mismatch'), ('A', 'Partially correct'), ('E', 'Checker error')], max_length=1),
+        ),
+        migrations.RunPython(score_passed_tests, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 21:10
+
+import zlib
+
+from django.db import migrations
+
+from core.local_ai_evaluator import normalize_language
+from core.similarity import BANDS, band_buckets, pack, signature
+
+BATCH_SIZE = 500
+
+# 0016_similarity_index created the index empty, and submissions are only
+# indexed as they're saved. This fingerprints the existing submissions the
+# same way as core.similarity.rebuild_index (with the historical models).
+# Running it again recomputes the same rows.
+
+
+def backfill_similarity_index(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    CodeBlob = apps.get_model('core', 'CodeBlob')
+    CodeFingerprint = apps.get_model('core', 'CodeFingerprint')
+    SimilarityBucket = apps.get_model('core', 'SimilarityBucket')
+
+    SimilarityBucket.objects.all().delete()
+    CodeFingerprint.objects.all().delete()
+
+    pairs = Submission.objects.values_list('question_id', 'code_blob_id', 'language').distinct().order_by(
+        'code_blob_id'
+    )
+    # Ordered by blob, so only the current blob's fingerprints are kept
+    blob_id, text, fingerprints, buckets = None, None, {}, []
+    for question_id, code_blob_id, language in pairs.iterator(chunk_size=BATCH_SIZE):
+        if code_blob_id != blob_id:
+            blob_id, fingerprints = code_blob_id, {}
+            text = zlib.decompress(CodeBlob.objects.only('data').get(id=code_blob_id).data).decode()
+        language = normalize_language(language) or (language or '').lower()
+        if language not in fingerprints:
+            values = signature(text, language)
+            if values is None:
+                fingerprints[language] = (None, [])  # too short to fingerprint
+            else:
+                fingerprint = CodeFingerprint.objects.create(
+                    code_blob_id=code_blob_id, language=language, signature=pack(values)
+                )
+                fingerprints[language] = (fingerprint, band_buckets(values))
+        fingerprint, fingerprint_buckets = fingerprints[language]
+        if fingerprint is not None:
+            buckets.extend(
+                SimilarityBucket(question_id=question_id, bucket=bucket, fingerprint=fingerprint)
+                for bucket in fingerprint_buckets
+            )
+        if len(buckets) >= BATCH_SIZE * BANDS:
+            SimilarityBucket.objects.bulk_create(buckets, batch_size=BATCH_SIZE, ignore_conflicts=True)
+            buckets = []
+    SimilarityBucket.objects.bulk_create(buckets, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_testresult_partial_credit'),
+    ]
+
+    operations = [
+        # Nothing to undo: the tables are dropped by reversing 0016
+        migrations.RunPython(backfill_similarity_index, migrations.RunPython.noop),
+    ]
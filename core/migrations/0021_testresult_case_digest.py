@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_backfill_similarity_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testresult',
+            name='case_digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
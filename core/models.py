@@ -1,5 +1,9 @@
+import hashlib
+import zlib
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
 
 
 # ----------------------------
@@ -51,6 +55,9 @@ class Question(models.Model):
     example_input = models.TextField(blank=True)
     example_output = models.TextField(blank=True)
     constraints = models.TextField(blank=True)
+    # Optional checker program that judges outputs instead of an exact match (see core/checkers.py)
+    checker_code = models.TextField(blank=True)
+    checker_language = models.CharField(max_length=20, blank=True)
 
 
     def __str__(self):
@@ -61,26 +68,307 @@ class TestCase(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="test_cases")
     input_data = models.TextField()
     expected_output = models.TextField()
+    # Outcome history from graded submissions, used to run likely failures first
+    run_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"Test case for {self.question.title}"
 
+    @property
+    def failure_rate(self):
+        # Smoothed so that new test cases start at 0.5 instead of 0 or 1
+        return (self.failure_count + 1) / (self.run_count + 2)
+
+    @property
+    def digest(self):
+        return self.digest_for(self.input_data, self.expected_output)
+
+    @staticmethod
+    def digest_for(input_data, expected_output):
+        """sha256 of the input and expected output, to tell if a case was edited since a result was graded"""
+        return hashlib.sha256(f"{len(input_data)}:{input_data}{expected_output}".encode()).hexdigest()
+
 
 # ----------------------------
 # Submissions
 # ----------------------------
+class CodeBlob(models.Model):
+    """
+    Submitted source code, compressed and stored once per distinct content.
+    Resubmissions of the same code share one blob.
+    """
+    digest = models.CharField(max_length=64, unique=True)  # sha256 of the source text
+    data = models.BinaryField()  # zlib-compressed UTF-8 source
+    size = models.PositiveIntegerField()  # length of the source text in characters
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} ({self.size} chars)"
+
+    @cached_property
+    def text(self):
+        return zlib.decompress(self.data).decode()
+
+    @staticmethod
+    def digest_for(text):
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    @classmethod
+    def store(cls, text):
+        """Return the blob for `text`, creating it only if this content hasn't been stored yet"""
+        blob, _ = cls.objects.get_or_create(
+            digest=cls.digest_for(text),
+            defaults={"data": zlib.compress(text.encode(), 9), "size": len(text)}
+        )
+        return blob
+
+
 class Submission(models.Model):
-    student = models.ForeignKey(Student, on_delete=models.CASCADE)
-    question = models.ForeignKey(Question, on_delete=models.CASCADE)
-    code = models.TextField()
+    # Covered by the composite indexes below, which lead with these columns
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, db_index=False)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, db_index=False)
+    # Copy of question.faculty, so faculty-wide lists can be read newest first
+    # straight from an index instead of joining and sorting every submission.
+    # Set from the question on every full save(), and followed by the
+    # post_save on Question (signals.py). Queryset updates bypass both: code
+    # that moves questions with Question.objects.update(faculty=...) must
+    # update their submissions' faculty too.
+    faculty = models.ForeignKey(
+        Faculty, on_delete=models.CASCADE, related_name='+', db_index=False, editable=False
+    )
+    code_blob = models.ForeignKey(CodeBlob, on_delete=models.PROTECT, related_name='submissions')
     language = models.CharField(max_length=20)
-    result = models.JSONField(null=True, blank=True)  # store output, correctness, AI feedback
     score = models.FloatField(default=0)
     submitted_at = models.DateTimeField(auto_now_add=True)
+    # Report summary; the per-test outcomes are in TestResult
+    test_case_score = models.FloatField(default=0)
+    logic_score = models.FloatField(null=True, blank=True)
+    hard_coded_detected = models.BooleanField(default=False)
+    passed_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    feedback = models.TextField(blank=True)  # AI analysis, stored once per submission
+    concerns = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        # Lists are newest first with an id tiebreak (see keyset_page in views)
+        indexes = [
+            # Student history
+            models.Index(fields=['student', 'submitted_at', 'id'], name='submission_student_time_idx'),
+            # ?question= filter, per-question exports
+            models.Index(fields=['question', 'submitted_at', 'id'], name='submission_question_time_idx'),
+            # Stats refresh: one student's attempts at one question
+            models.Index(fields=['student', 'question', 'submitted_at'], name='submission_student_q_idx'),
+            # Faculty-wide lists, date ranges and the CSV export
+            models.Index(fields=['faculty', 'submitted_at', 'id'], name='submission_faculty_time_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.user.username} - {self.question.title}"
 
+    # `code` reads and writes the source text; it's decompressed on first
+    # access and written to a (deduplicated) CodeBlob on save.
+    @property
+    def code(self):
+        if "_code" not in self.__dict__:
+            self._code = self.code_blob.text if self.code_blob_id else None
+        return self._code
+
+    @code.setter
+    def code(self, text):
+        self._code = text
+        self._code_changed = True
+
+    def save(self, *args, **kwargs):
+        if self.question_id and kwargs.get("update_fields") is None:
+            self.faculty_id = self.question.faculty_id
+        if self.__dict__.pop("_code_changed", False):
+            self.code_blob = CodeBlob.store(self._code or "")
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "code_blob"}
+        super().save(*args, **kwargs)
+
+
+class TestResult(models.Model):
+    """Outcome of one test case in a graded submission"""
+    PASSED = 'P'
+    WRONG_ANSWER = 'W'
+    RUNTIME_ERROR = 'R'
+    TIMEOUT = 'T'
+    COMPILE_ERROR = 'C'
+    LANGUAGE_MISMATCH = 'L'
+    PARTIAL = 'A'  # rejected by the question's checker with partial credit
+    CHECKER_ERROR = 'E'  # the checker itself failed; the test gets no credit
+    STATUS_CHOICES = [
+        (PASSED, 'Passed'),
+        (WRONG_ANSWER, 'Wrong answer'),
+        (RUNTIME_ERROR, 'Runtime error'),
+        (TIMEOUT, 'Timeout'),
+        (COMPILE_ERROR, 'Compile error'),
+        (LANGUAGE_MISMATCH, 'Language mismatch'),
+        (PARTIAL, 'Partially correct'),
+        (CHECKER_ERROR, 'Checker error'),
+    ]
+    # Longer output/error text is cut to this many characters, ending with the marker
+    TEXT_LIMIT = 1000
+    TRUNCATION_MARKER = "… [truncated]"
+
+    submission = models.ForeignKey(Submission, on_delete=models.CASCADE, related_name='test_results')
+    # Input and expected output are read from the test case instead of being
+    # copied; case_digest is the case's digest when graded, so a case edited
+    # since then is reported as such rather than shown as what was run (blank
+    # for results graded before it was recorded, which can't be checked)
+    test_case = models.ForeignKey(TestCase, on_delete=models.SET_NULL, null=True, blank=True, related_name='results')
+    case_digest = models.CharField(max_length=64, blank=True)
+    position = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES)
+    time_ms = models.PositiveIntegerField(null=True, blank=True)
+    # Credit for the test from 0 to 1; between the two only for PARTIAL
+    score = models.FloatField(default=0)
+    output = models.TextField(blank=True)
+    error = models.TextField(blank=True)
+    truncated = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['position']
+        unique_together = ['submission', 'position']
+
+    def __str__(self):
+        return f"{self.submission} #{self.position + 1}: {self.get_status_display()}"
+
+    @property
+    def is_correct(self):
+        return self.status == self.PASSED
+
+    @property
+    def case_changed(self):
+        """The test case was edited or deleted after this result was graded"""
+        if self.test_case is None:
+            return True
+        return bool(self.case_digest) and self.case_digest != self.test_case.digest
+
+    @classmethod
+    def clip(cls, text):
+        """`text` cut to TEXT_LIMIT, ending with TRUNCATION_MARKER if it was longer"""
+        if len(text) <= cls.TEXT_LIMIT:
+            return text
+        return text[:cls.TEXT_LIMIT - len(cls.TRUNCATION_MARKER)] + cls.TRUNCATION_MARKER
+
+
+# ----------------------------
+# Similarity
+# ----------------------------
+class CodeFingerprint(models.Model):
+    """MinHash signature of a CodeBlob's normalized tokens in one language (see similarity.py)"""
+    code_blob = models.ForeignKey(CodeBlob, on_delete=models.CASCADE, related_name='fingerprints')
+    language = models.CharField(max_length=20)
+    signature = models.BinaryField()  # packed unsigned 64-bit MinHash values
+
+    class Meta:
+        unique_together = ['code_blob', 'language']
+
+    def __str__(self):
+        return f"{self.code_blob} ({self.language})"
+
+
+class SimilarityBucket(models.Model):
+    """LSH index entry: one row per band of each fingerprint submitted to a question"""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, db_index=False)
+    bucket = models.BigIntegerField()  # hash of the band number and its signature values
+    fingerprint = models.ForeignKey(CodeFingerprint, on_delete=models.CASCADE, related_name='buckets')
+
+    class Meta:
+        constraints = [
+            # Also the lookup index: a question's fingerprints sharing a bucket
+            models.UniqueConstraint(fields=['question', 'bucket', 'fingerprint'], name='similarity_bucket_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.question_id}:{self.bucket}"
+
+
+# ----------------------------
+# Statistics Rollups (kept up to date by core/stats.py)
+# ----------------------------
+class StudentQuestionStats(models.Model):
+    """One student's attempts at one question"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='question_stats')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='student_stats')
+    attempts = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    logic_score_total = models.FloatField(default=0)
+    logic_score_count = models.PositiveIntegerField(default=0)
+    first_solved_at = models.DateTimeField(null=True, blank=True)
+    last_submitted_at = models.DateTimeField(null=True, blank=True)
+    # Shown on the student dashboard instead of the full history
+    best_submission = models.ForeignKey(Submission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    latest_submission = models.ForeignKey(Submission, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    class Meta:
+        unique_together = ['student', 'question']
+
+    def __str__(self):
+        return f"{self.student} - {self.question}"
+
+    @property
+    def solved(self):
+        return self.first_solved_at is not None
+
+    @property
+    def average_score(self):
+        return round(self.score_total / self.attempts, 2) if self.attempts else None
+
+    @property
+    def average_logic_score(self):
+        return round(self.logic_score_total / self.logic_score_count, 2) if self.logic_score_count else None
+
+
+class RollupStats(models.Model):
+    """Totals over the StudentQuestionStats rows of a question (optionally for one group)"""
+    attempts = models.PositiveIntegerField(default=0)
+    students_attempted = models.PositiveIntegerField(default=0)
+    students_solved = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    logic_score_total = models.FloatField(default=0)
+    logic_score_count = models.PositiveIntegerField(default=0)
+    first_solved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def pass_rate(self):
+        """Percentage of students who tried the question and solved it"""
+        return round(self.students_solved / self.students_attempted * 100, 2) if self.students_attempted else None
+
+    @property
+    def average_score(self):
+        return round(self.score_total / self.attempts, 2) if self.attempts else None
+
+    @property
+    def average_logic_score(self):
+        return round(self.logic_score_total / self.logic_score_count, 2) if self.logic_score_count else None
+
+
+class QuestionStats(RollupStats):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, related_name='stats')
+
+    def __str__(self):
+        return f"Stats for {self.question}"
+
+
+class GroupQuestionStats(RollupStats):
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='question_stats')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='group_stats')
+
+    class Meta:
+        unique_together = ['group', 'question']
+
+    def __str__(self):
+        return f"Stats for {self.question} in {self.group}"
+
 
 # ----------------------------
 # Announcements
@@ -0,0 +1,279 @@
+"""
+Bulk question and test-case import.
+
+A bundle is either a JSONL file with one question per line, or a zip
+archive with a `questions.jsonl` manifest at its root plus any test data
+files it references:
+
+    {"title": "Two Sum", "description": "...", "difficulty": "Easy",
+     "marks": 10, "example_input": "...", "example_output": "...",
+     "constraints": "...",
+     "test_cases": [
+        {"input": "1 2\\n", "output": "3"},
+        {"input_file": "two-sum/big.in", "output_file": "two-sum/big.out"}
+     ],
+     "checker": {"language": "python", "file": "two-sum/check.py"}}
+
+Only title, description and at least one test case are required. The
+optional checker (see core/checkers.py) gives its source as "code", or as
+"file" in zip bundles.
+
+The manifest is read line by line and test data files are read from the
+archive only when their question is reached, so memory stays bounded by
+one insert batch rather than the bundle size. Invalid questions are
+skipped and reported by line number; valid ones are inserted with
+bulk_create in batches inside a single transaction.
+"""
+import json
+import zipfile
+from contextlib import nullcontext
+
+from django.db import transaction
+
+from . import checkers, runners
+from .cache import invalidate, faculty_questions_namespace
+from .models import Question, TestCase
+
+MANIFEST_NAME = "questions.jsonl"
+DIFFICULTIES = {value for value, _ in Question._meta.get_field("difficulty").choices}
+
+# Insert once this many questions, or this much test data, is pending. As many
+# questions as fit one INSERT under Django's 999-parameter SQLite limit, so a
+# batch is a single statement whatever columns Question gains.
+SQLITE_MAX_PARAMS = 999
+QUESTION_BATCH_SIZE = SQLITE_MAX_PARAMS // len(
+    [field for field in Question._meta.concrete_fields if not field.primary_key]
+)
+BATCH_BYTES = 16 * 1024 * 1024
+
+MAX_TEST_FILE_SIZE = 64 * 1024 * 1024
+MAX_BUNDLE_SIZE = 1024 * 1024 * 1024  # uncompressed test data per archive
+
+
+class BundleError(Exception):
+    """The bundle as a whole can't be imported (corrupt archive, no manifest, too large)."""
+
+
+# ---------- Reading ----------
+class _Archive:
+    """Test data files inside a zip bundle, with size limits checked before reading."""
+
+    def __init__(self, zf):
+        self.zf = zf
+        self.total = 0
+
+    def read_text(self, name):
+        try:
+            info = self.zf.getinfo(name)
+        except KeyError:
+            raise ValueError(f"file '{name}' not found in archive")
+        if info.file_size > MAX_TEST_FILE_SIZE:
+            raise ValueError(f"file '{name}' is larger than {MAX_TEST_FILE_SIZE // (1024 * 1024)} MB")
+        self.total += info.file_size
+        if self.total > MAX_BUNDLE_SIZE:
+            raise BundleError("Archive test data is too large")
+        try:
+            return self.zf.read(info).decode("utf-8-sig")
+        except UnicodeDecodeError:
+            raise ValueError(f"file '{name}' is not UTF-8 text")
+
+
+def _lines(stream):
+    """(line number, decoded line) pairs from a binary stream"""
+    for line_number, raw in enumerate(stream, start=1):
+        try:
+            yield line_number, raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+        except UnicodeDecodeError:
+            yield line_number, None
+
+
+def read_bundle(bundle):
+    """
+    Yield (line number, parsed record or None, archive or None) for each
+    non-blank manifest line. `bundle` is an uploaded file or an open binary file.
+    """
+    if zipfile.is_zipfile(bundle):
+        bundle.seek(0)
+        try:
+            zf = zipfile.ZipFile(bundle)
+        except zipfile.BadZipFile:
+            raise BundleError("The archive is corrupt")
+        if MANIFEST_NAME not in zf.namelist():
+            raise BundleError(f"The archive has no {MANIFEST_NAME} at its root")
+        archive = _Archive(zf)
+        stream = zf.open(MANIFEST_NAME)
+        context = stream
+    else:
+        bundle.seek(0)
+        archive = None
+        stream = bundle
+        context = nullcontext()  # the caller owns the file
+
+    with context:
+        for line_number, line in _lines(stream):
+            if line is None:
+                yield line_number, None, archive
+            elif line.strip():
+                try:
+                    yield line_number, json.loads(line), archive
+                except json.JSONDecodeError:
+                    yield line_number, None, archive
+
+
+# ---------- Validation ----------
+def _test_case_text(case, key, archive):
+    if f"{key}_file" in case:
+        if archive is None:
+            raise ValueError(f"{key}_file is only allowed in zip bundles")
+        return archive.read_text(case[f"{key}_file"])
+    value = case.get(key, "")
+    if not isinstance(value, str):
+        raise ValueError(f"{key} must be a string")
+    return value
+
+
+def _checker(record, archive):
+    """(language, code) of the record's checker, ("", "") if it has none"""
+    checker = record.get("checker")
+    if checker is None:
+        return "", ""
+    if not isinstance(checker, dict):
+        raise ValueError("checker must be an object")
+    language = runners.normalize(checker.get("language"))
+    if language is None:
+        raise ValueError(f"checker language must be one of {', '.join(runners.RUNNERS)}")
+    if "file" in checker:
+        if archive is None:
+            raise ValueError("checker file is only allowed in zip bundles")
+        code = archive.read_text(checker["file"])
+    else:
+        code = checker.get("code")
+        if not isinstance(code, str) or not code.strip():
+            raise ValueError("checker needs its code or file")
+    return language, code
+
+
+def validate_record(record, archive):
+    """(Question, [(input, expected output)], problems) for one manifest record"""
+    if not isinstance(record, dict):
+        return None, [], ["line is not a JSON object"]
+
+    problems = []
+    title = record.get("title")
+    description = record.get("description")
+    difficulty = record.get("difficulty") or "Easy"
+    marks = record.get("marks", 0)
+
+    if not isinstance(title, str) or not title.strip():
+        problems.append("title is required")
+    elif len(title.strip()) > 255:
+        problems.append("title is too long (max 255 characters)")
+    if not isinstance(description, str) or not description.strip():
+        problems.append("description is required")
+    if difficulty not in DIFFICULTIES:
+        problems.append(f"difficulty must be one of {', '.join(sorted(DIFFICULTIES))}")
+    if not isinstance(marks, int) or isinstance(marks, bool) or marks < 0:
+        problems.append("marks must be a non-negative integer")
+    for field in ("example_input", "example_output", "constraints"):
+        if not isinstance(record.get(field, ""), str):
+            problems.append(f"{field} must be a string")
+
+    cases = []
+    test_cases = record.get("test_cases")
+    if not isinstance(test_cases, list) or not test_cases:
+        problems.append("at least one test case is required")
+    else:
+        for index, case in enumerate(test_cases, start=1):
+            if not isinstance(case, dict):
+                problems.append(f"test case {index} must be an object")
+                continue
+            try:
+                cases.append((_test_case_text(case, "input", archive), _test_case_text(case, "output", archive)))
+            except ValueError as e:
+                problems.append(f"test case {index}: {e}")
+
+    checker_language = checker_code = ""
+    try:
+        checker_language, checker_code = _checker(record, archive)
+    except ValueError as e:
+        problems.append(str(e))
+
+    if problems:
+        return None, [], problems
+
+    question = Question(
+        title=title.strip(),
+        description=description,
+        difficulty=difficulty,
+        marks=marks,
+        example_input=record.get("example_input", ""),
+        example_output=record.get("example_output", ""),
+        constraints=record.get("constraints", ""),
+        checker_code=checker_code,
+        checker_language=checker_language
+    )
+    return question, cases, []
+
+
+# ---------- Import ----------
+def _insert(pending):
+    questions = [question for question, _ in pending]
+    Question.objects.bulk_create(questions)
+    TestCase.objects.bulk_create(
+        [
+            TestCase(question=question, input_data=input_data, expected_output=expected_output)
+            for question, cases in pending
+            for input_data, expected_output in cases
+        ],
+        batch_size=1000
+    )
+
+
+def import_questions(bundle, faculty, dry_run=False):
+    """
+    Import a question bundle for `faculty`. Returns
+    {"created": n, "test_cases": n, "errors": [{"line", "title", "errors"}],
+     "checkers": [(title, Checker)], "dry_run": bool}; the checkers are not built yet.
+    """
+    created = test_case_count = 0
+    errors = []
+    question_checkers = []
+    pending, pending_bytes = [], 0
+
+    with transaction.atomic():
+        for line_number, record, archive in read_bundle(bundle):
+            if record is None:
+                errors.append({"line": line_number, "title": None, "errors": ["line is not valid UTF-8 JSON"]})
+                continue
+
+            question, cases, problems = validate_record(record, archive)
+            if problems:
+                title = record.get("title") if isinstance(record, dict) else None
+                errors.append({"line": line_number, "title": title, "errors": problems})
+                continue
+
+            created += 1
+            test_case_count += len(cases)
+            if question.checker_code:
+                question_checkers.append((question.title, checkers.for_question(question)))
+            if dry_run:
+                continue
+
+            question.faculty = faculty
+            pending.append((question, cases))
+            pending_bytes += sum(len(i) + len(o) for i, o in cases)
+            if len(pending) >= QUESTION_BATCH_SIZE or pending_bytes >= BATCH_BYTES:
+                _insert(pending)
+                pending, pending_bytes = [], 0
+
+        if pending:
+            _insert(pending)
+
+    if created and not dry_run:
+        # bulk_create doesn't send post_save, so clear the cached question list here
+        invalidate(faculty_questions_namespace(faculty.id))
+
+    return {
+        "created": created, "test_cases": test_case_count, "errors": errors,
+        "checkers": question_checkers, "dry_run": dry_run
+    }
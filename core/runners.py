@@ -0,0 +1,221 @@
+"""
+Language runners: where a submission's source goes, how it is compiled and
+how it is run, one class per language.
+
+Runners register themselves with @register. Each lists the commands its
+toolchain needs; those are probed once per process (CoreConfig.ready starts
+the probe in the background) and a runner whose toolchain is missing is
+reported as unavailable up front, before anything is written to disk.
+Adding a language means adding a runner class here:
+
+    @register
+    class RubyRunner(Runner):
+        name, label, icon, extension = "ruby", "Ruby", "💎", "rb"
+        toolchain = ("ruby",)
+
+        def run_cmd(self, source, tempdir):
+            return ["ruby", source]
+"""
+import os
+import shutil
+import subprocess
+import threading
+
+from . import language_detection
+
+RUNNERS = {}  # normalized name -> runner, in registration order
+ALIASES = {}  # accepted spelling -> normalized name
+
+
+def register(runner_class):
+    runner = runner_class()
+    RUNNERS[runner.name] = runner
+    for alias in (runner.name,) + runner.aliases:
+        ALIASES[alias] = runner.name
+    return runner_class
+
+
+class Runner:
+    name = None  # normalized language name, as stored on submissions
+    label = None  # as shown to students
+    icon = ""
+    aliases = ()  # other spellings accepted by normalize()
+    extension = None
+    toolchain = ()  # commands that must be installed; the first one's version is reported
+    version_args = ("--version",)
+    compiled = False
+    compile_timeout = None  # seconds, None for no limit
+    run_timeout = 5  # seconds per test case
+
+    def source_path(self, code, tempdir):
+        return os.path.join(tempdir, f"code.{self.extension}")
+
+    def compile_cmd(self, source, tempdir):
+        return None
+
+    def run_cmd(self, source, tempdir):
+        raise NotImplementedError
+
+    def layout(self, code, tempdir):
+        """{"filepath", "compile_cmd", "run_cmd", "compile_timeout", "run_timeout", "error"} for `code` built in `tempdir`"""
+        source = self.source_path(code, tempdir)
+        return {
+            "filepath": source,
+            "compile_cmd": self.compile_cmd(source, tempdir),
+            "run_cmd": self.run_cmd(source, tempdir),
+            "compile_timeout": self.compile_timeout,
+            "run_timeout": self.run_timeout,
+            "error": ""
+        }
+
+    def missing_message(self):
+        kind = "compiler" if self.compiled else "runtime"
+        return (
+            f"{self.label} {kind} not installed on this system. "
+            "Please contact your administrator or use Python for now."
+        )
+
+
+# ---------- Runners ----------
+@register
+class PythonRunner(Runner):
+    name, label, icon, extension = "python", "Python", "🐍", "py"
+    aliases = ("py", "python3")
+    toolchain = ("python",)
+
+    def run_cmd(self, source, tempdir):
+        return ["python", source]
+
+
+class NativeRunner(Runner):
+    """Compiled to a.exe next to the source"""
+    compiled = True
+    compiler = None
+
+    def compile_cmd(self, source, tempdir):
+        return [self.compiler, source, "-o", os.path.join(tempdir, "a.exe")]
+
+    def run_cmd(self, source, tempdir):
+        return [os.path.join(tempdir, "a.exe")]
+
+
+@register
+class CppRunner(NativeRunner):
+    name, label, icon, extension = "cpp", "C++", "💻", "cpp"
+    compiler = "g++"
+    toolchain = ("g++",)
+
+
+@register
+class JavaRunner(Runner):
+    name, label, icon, extension = "java", "Java", "☕", "java"
+    toolchain = ("javac", "java")
+    version_args = ("-version",)
+    compiled = True
+
+    def source_path(self, code, tempdir):
+        # The public class name (else the first class), found while detecting
+        # the language; "Main" if there's no class at all
+        class_name = language_detection.detect(code).class_name or "Main"
+        return os.path.join(tempdir, f"{class_name}.java")
+
+    def compile_cmd(self, source, tempdir):
+        return ["javac", source]
+
+    def run_cmd(self, source, tempdir):
+        return ["java", "-cp", tempdir, os.path.splitext(os.path.basename(source))[0]]
+
+
+@register
+class CRunner(NativeRunner):
+    name, label, icon, extension = "c", "C", "⚙️", "c"
+    compiler = "gcc"
+    toolchain = ("gcc",)
+
+
+@register
+class JavaScriptRunner(Runner):
+    name, label, icon, extension = "javascript", "JavaScript", "🟨", "js"
+    aliases = ("js", "node", "nodejs")
+    toolchain = ("node",)
+
+    def run_cmd(self, source, tempdir):
+        return ["node", source]
+
+
+@register
+class GoRunner(Runner):
+    name, label, icon, extension = "go", "Go", "🐹", "go"
+    aliases = ("golang",)
+    toolchain = ("go",)
+    version_args = ("version",)
+    compiled = True
+    compile_timeout = 60  # the first build also fills the module cache
+
+    def compile_cmd(self, source, tempdir):
+        return ["go", "build", "-o", os.path.join(tempdir, "a.exe"), source]
+
+    def run_cmd(self, source, tempdir):
+        return [os.path.join(tempdir, "a.exe")]
+
+
+# ---------- Lookup ----------
+def normalize(lang):
+    """Normalized name for "Python", "C++", "js", ... or None for a language without a runner"""
+    lang_normalized = (lang or "").lower().replace("+", "p").replace(" ", "")
+    return ALIASES.get(lang_normalized)
+
+
+def label(lang):
+    runner = RUNNERS.get(normalize(lang))
+    return runner.label if runner else lang
+
+
+# ---------- Toolchain Probing ----------
+_probe_lock = threading.Lock()
+_versions = None
+
+
+def probe(runner):
+    """Version line of the runner's toolchain, or None if any of its commands is missing"""
+    if not all(shutil.which(command) for command in runner.toolchain):
+        return None
+    try:
+        proc = subprocess.run(
+            [runner.toolchain[0], *runner.version_args], capture_output=True, text=True, timeout=10
+        )
+        lines = (proc.stdout or proc.stderr).strip().splitlines()
+    except (OSError, subprocess.SubprocessError):
+        lines = []
+    return lines[0] if lines else "unknown version"
+
+
+def toolchain_versions():
+    """{language: toolchain version, or None if missing}, probed once per process"""
+    global _versions
+    with _probe_lock:
+        if _versions is None:
+            _versions = {name: probe(runner) for name, runner in RUNNERS.items()}
+    return _versions
+
+
+def start_probe():
+    """Probe the toolchains in the background, so the first submission doesn't wait for it"""
+    threading.Thread(target=toolchain_versions, name="toolchain-probe", daemon=True).start()
+
+
+def available():
+    """Runners whose toolchain is installed, in registration order"""
+    versions = toolchain_versions()
+    return [runner for name, runner in RUNNERS.items() if versions[name] is not None]
+
+
+def runner_for(lang):
+    """(runner, "") for a language that can be run here, else (None, error message)"""
+    runner = RUNNERS.get(normalize(lang))
+    if runner is None:
+        supported = ", ".join(runner.label for runner in available())
+        return None, f"Unsupported language: {lang}. Supported languages are: {supported}"
+    if toolchain_versions()[runner.name] is None:
+        return None, runner.missing_message()
+    return runner, ""
@@ -0,0 +1,230 @@
+"""
+Priority-aware, fair-share scheduler for evaluation work.
+
+Compiling and running student code is CPU bound, so only a fixed number of
+evaluation slots may be busy at once. When every slot is taken, callers queue
+up in one of three priority classes and are served strictly by class:
+
+    interactive ("Run" button)  >  submit (graded submissions)  >  batch
+
+Batch is for work nobody is waiting on interactively, such as building a
+question's checker when a faculty member uploads it.
+
+Inside a class, waiters are grouped per owner (usually the student's user id)
+and served round-robin, so one student with 50 queued runs only gets one turn
+per round while everybody else keeps getting theirs.
+"""
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+
+# ---------- Priority Classes ----------
+INTERACTIVE = "interactive"
+SUBMIT = "submit"
+BATCH = "batch"
+
+PRIORITY_CLASSES = (INTERACTIVE, SUBMIT, BATCH)
+
+
+def default_workers():
+    """
+    The machine's CPUs split between the web worker processes, since each
+    process has its own scheduler. WEB_CONCURRENCY is the worker count
+    gunicorn reads when -w isn't given.
+    """
+    processes = int(os.environ.get("WEB_CONCURRENCY") or 1)
+    return max(1, (os.cpu_count() or 2) // processes)
+
+
+# Number of evaluations allowed to run at the same time in this worker process;
+# set EVALUATION_WORKERS when the processes aren't started with WEB_CONCURRENCY
+EVALUATION_WORKERS = int(os.environ.get("EVALUATION_WORKERS") or default_workers())
+
+
+class _Waiter:
+    """A queued request for a slot. Async waiters are woken through their event loop."""
+    __slots__ = ("priority", "owner", "enqueued_at", "granted", "event", "loop", "future")
+
+    def __init__(self, priority, owner, loop=None):
+        self.priority = priority
+        self.owner = owner
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.loop = loop
+        if loop is None:
+            self.event = threading.Event()
+            self.future = None
+        else:
+            self.event = None
+            self.future = loop.create_future()
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _ClassStats:
+    __slots__ = ("running", "completed", "total_wait", "max_wait", "last_wait")
+
+    def __init__(self):
+        self.running = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.last_wait = 0.0
+
+
+class EvaluationScheduler:
+    """
+    Hands out a limited number of evaluation slots.
+
+    Use it as a context manager around the CPU-heavy part of the work:
+
+        with scheduler.slot(INTERACTIVE, owner=user_id):
+            ...compile and run...
+
+    or, from async code, `async with scheduler.async_slot(...)`.
+    """
+
+    def __init__(self, workers=EVALUATION_WORKERS):
+        self.workers = max(1, workers)
+        self._lock = threading.Lock()
+        self._running = 0
+        # priority class -> OrderedDict(owner -> deque of waiters)
+        self._queues = {cls: OrderedDict() for cls in PRIORITY_CLASSES}
+        self._stats = {cls: _ClassStats() for cls in PRIORITY_CLASSES}
+
+    def acquire(self, priority=SUBMIT, owner=None):
+        waiter = self._enqueue(_Waiter(priority, owner))
+        waiter.event.wait()
+        return waiter
+
+    async def async_acquire(self, priority=SUBMIT, owner=None):
+        waiter = self._enqueue(_Waiter(priority, owner, loop=asyncio.get_running_loop()))
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            # Leave the queue; if the slot was granted in the meantime, hand it back
+            if not self._withdraw(waiter):
+                self.release(waiter)
+            raise
+        return waiter
+
+    def release(self, waiter):
+        with self._lock:
+            self._running -= 1
+            stats = self._stats[waiter.priority]
+            stats.running -= 1
+            stats.completed += 1
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, priority=SUBMIT, owner=None):
+        waiter = self.acquire(priority, owner)
+        try:
+            yield
+        finally:
+            self.release(waiter)
+
+    @asynccontextmanager
+    async def async_slot(self, priority=SUBMIT, owner=None):
+        waiter = await self.async_acquire(priority, owner)
+        try:
+            yield
+        finally:
+            self.release(waiter)
+
+    def stats(self):
+        """Queue depth, running count and wait times (in ms) for each priority class."""
+        with self._lock:
+            now = time.monotonic()
+            report = {"workers": self.workers, "running": self._running, "classes": {}}
+            for cls in PRIORITY_CLASSES:
+                queue = self._queues[cls]
+                stats = self._stats[cls]
+                waiting = [w for waiters in queue.values() for w in waiters]
+                oldest = max((now - w.enqueued_at for w in waiting), default=0.0)
+                report["classes"][cls] = {
+                    "queued": len(waiting),
+                    "queued_owners": len(queue),
+                    "running": stats.running,
+                    "completed": stats.completed,
+                    "avg_wait_ms": round(stats.total_wait / stats.completed * 1000, 2) if stats.completed else 0.0,
+                    "max_wait_ms": round(stats.max_wait * 1000, 2),
+                    "last_wait_ms": round(stats.last_wait * 1000, 2),
+                    "oldest_waiting_ms": round(oldest * 1000, 2),
+                }
+            return report
+
+    # ----- internals -----
+    def _enqueue(self, waiter):
+        if waiter.priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {waiter.priority}")
+
+        with self._lock:
+            queue = self._queues[waiter.priority]
+            queue.setdefault(waiter.owner, deque()).append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _withdraw(self, waiter):
+        """Remove a waiter that gave up. Returns False if it was already granted a slot."""
+        with self._lock:
+            if waiter.granted:
+                return False
+            queue = self._queues[waiter.priority]
+            waiters = queue.get(waiter.owner)
+            if waiters is not None:
+                waiters.remove(waiter)
+                if not waiters:
+                    del queue[waiter.owner]
+            return True
+
+    # (call the methods below with self._lock held)
+    def _dispatch(self):
+        while self._running < self.workers:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            wait = time.monotonic() - waiter.enqueued_at
+            stats = self._stats[waiter.priority]
+            stats.running += 1
+            stats.total_wait += wait
+            stats.max_wait = max(stats.max_wait, wait)
+            stats.last_wait = wait
+            self._running += 1
+            waiter.grant()
+
+    def _next_waiter(self):
+        for cls in PRIORITY_CLASSES:
+            queue = self._queues[cls]
+            if not queue:
+                continue
+            # Round-robin across owners: take the head owner's oldest waiter,
+            # then send that owner to the back of the line.
+            owner, waiters = next(iter(queue.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                queue.move_to_end(owner)
+            else:
+                del queue[owner]
+            return waiter
+        return None
+
+
+# Shared scheduler for this worker process
+scheduler = EvaluationScheduler()
+
+
+def queue_stats():
+    return scheduler.stats()
@@ -0,0 +1,210 @@
+"""
+Full-text search over questions and submitted code (SQLite FTS5).
+
+Two FTS5 tables are created by migration 0015:
+
+    core_question_fts  title + description, an external-content index over
+                       core_question kept in sync by SQL triggers
+    core_codeblob_fts  source text, one row per CodeBlob (rowid = blob id)
+
+Code is indexed per distinct blob rather than per submission, so a
+million submissions with heavy resubmission only index the distinct
+sources. The code index is contentless (the text is stored compressed in
+CodeBlob), so blob rows are added and removed from Python when a CodeBlob
+is saved or deleted (see signals.py), and snippets are cut from the
+decompressed text of the page being returned.
+
+Identifiers keep their underscores (`max_sum` is one token); question text
+is stemmed, so "sorting" finds "sorted".
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+QUESTION_TABLE = "core_question_fts"
+CODE_TABLE = "core_codeblob_fts"
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE = 50  # deeper pages than this aren't useful for ranked results
+
+# Words, optionally ending in * for a prefix search
+_TERM = re.compile(r"\w+\*?")
+
+
+def available():
+    return connection.vendor == "sqlite"
+
+
+def fts_query(text):
+    """
+    Turn free text into an FTS5 query: every word must appear, each is
+    quoted so FTS operators in the input are treated as plain words.
+    Returns None if there's nothing to search for.
+    """
+    terms = []
+    for term in _TERM.findall(text or ""):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
+
+
+def search_terms(text):
+    return [term.rstrip("*").lower() for term in _TERM.findall(text or "") if term.rstrip("*")]
+
+
+# ---------- Index Maintenance ----------
+# The question index triggers, created by migrations 0015 and 0017 and by
+# rebuild_index(): SQLite drops a table's triggers when a migration
+# rebuilds the table. Migrations import these, so keep them plain SQL.
+QUESTION_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS core_question_fts_insert AFTER INSERT ON core_question BEGIN
+        INSERT INTO {QUESTION_TABLE} (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_question_fts_delete AFTER DELETE ON core_question BEGIN
+        INSERT INTO {QUESTION_TABLE} ({QUESTION_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS core_question_fts_update AFTER UPDATE OF title, description ON core_question BEGIN
+        INSERT INTO {QUESTION_TABLE} ({QUESTION_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {QUESTION_TABLE} (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+DROP_QUESTION_TRIGGERS = [
+    f"DROP TRIGGER IF EXISTS core_question_fts_{event}" for event in ("insert", "delete", "update")
+]
+
+
+def index_code_blob(blob):
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {CODE_TABLE} (rowid, code) VALUES (%s, %s)", [blob.id, blob.text])
+
+
+def unindex_code_blob(blob):
+    # Contentless tables need the original text to remove a row
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {CODE_TABLE} ({CODE_TABLE}, rowid, code) VALUES ('delete', %s, %s)",
+            [blob.id, blob.text]
+        )
+
+
+def rebuild_index(batch_size=500):
+    """Recreate both indexes (and the question triggers) from the tables. Returns (questions, code blobs) indexed."""
+    from .models import CodeBlob, Question
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for trigger in QUESTION_TRIGGERS:
+            cursor.execute(trigger)
+        cursor.execute(f"INSERT INTO {QUESTION_TABLE} ({QUESTION_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {CODE_TABLE} ({CODE_TABLE}) VALUES ('delete-all')")
+        blobs = 0
+        for blob in CodeBlob.objects.only("id", "data").iterator(chunk_size=batch_size):
+            cursor.execute(f"INSERT INTO {CODE_TABLE} (rowid, code) VALUES (%s, %s)", [blob.id, blob.text])
+            blobs += 1
+    return Question.objects.count(), blobs
+
+
+# ---------- Queries ----------
+def search_questions(faculty, text, page=1):
+    """The faculty's questions matching `text`, best match first. Returns (rows, has_next)."""
+    query = fts_query(text)
+    if query is None:
+        return [], False
+
+    offset = (page - 1) * SEARCH_PAGE_SIZE
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT q.id, q.title, q.difficulty,
+                   snippet({QUESTION_TABLE}, 1, '', '', '…', 16), bm25({QUESTION_TABLE}, 5.0, 1.0)
+            FROM {QUESTION_TABLE}
+            JOIN core_question q ON q.id = {QUESTION_TABLE}.rowid
+            WHERE {QUESTION_TABLE} MATCH %s AND q.faculty_id = %s
+            ORDER BY bm25({QUESTION_TABLE}, 5.0, 1.0), q.id
+            LIMIT %s OFFSET %s
+            """,
+            [query, faculty.id, SEARCH_PAGE_SIZE + 1, offset]
+        )
+        rows = cursor.fetchall()
+
+    results = [
+        {"id": id, "title": title, "difficulty": difficulty, "snippet": snippet, "rank": round(-rank, 3)}
+        for id, title, difficulty, snippet, rank in rows[:SEARCH_PAGE_SIZE]
+    ]
+    return results, len(rows) > SEARCH_PAGE_SIZE
+
+
+def search_submissions(faculty, text, page=1):
+    """
+    The faculty's submissions whose code matches `text`: best-matching code
+    first, newest submission first among equal matches. Returns (rows, has_next).
+    """
+    from .models import Submission
+
+    query = fts_query(text)
+    if query is None:
+        return [], False
+
+    offset = (page - 1) * SEARCH_PAGE_SIZE
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT s.id, {CODE_TABLE}.rank
+            FROM {CODE_TABLE}
+            JOIN core_submission s ON s.code_blob_id = {CODE_TABLE}.rowid
+            WHERE {CODE_TABLE} MATCH %s AND s.faculty_id = %s
+            ORDER BY {CODE_TABLE}.rank, s.submitted_at DESC, s.id DESC
+            LIMIT %s OFFSET %s
+            """,
+            [query, faculty.id, SEARCH_PAGE_SIZE + 1, offset]
+        )
+        ranked = cursor.fetchall()
+
+    has_next = len(ranked) > SEARCH_PAGE_SIZE
+    ranked = ranked[:SEARCH_PAGE_SIZE]
+    submissions = Submission.objects.select_related("student__user", "question", "code_blob").only(
+        "id", "language", "score", "submitted_at", "code_blob__data",
+        "student__user__username", "question__title"
+    ).in_bulk([id for id, _ in ranked])
+
+    terms = search_terms(text)
+    results = []
+    for id, rank in ranked:
+        submission = submissions[id]
+        line_number, line = matching_line(submission.code_blob.text, terms)
+        results.append({
+            "id": submission.id,
+            "student": submission.student.user.username,
+            "question": submission.question.title,
+            "language": submission.language,
+            "score": submission.score,
+            "submitted_at": submission.submitted_at.isoformat(),
+            "line_number": line_number,
+            "line": line,
+            "rank": round(-rank, 3),
+        })
+    return results, has_next
+
+
+def question_ids_matching(text):
+    """Subquery of question ids matching `text`, for QuerySet filters (e.g. id__in=)"""
+    return RawSQL(f"SELECT rowid FROM {QUESTION_TABLE} WHERE {QUESTION_TABLE} MATCH %s", [fts_query(text)])
+
+
+def code_blob_ids_matching(text):
+    """Subquery of CodeBlob ids whose code matches `text`"""
+    return RawSQL(f"SELECT rowid FROM {CODE_TABLE} WHERE {CODE_TABLE} MATCH %s", [fts_query(text)])
+
+
+def matching_line(code, terms):
+    """(1-based line number, stripped line) of the first line containing a search term"""
+    for number, line in enumerate(code.splitlines(), start=1):
+        lowered = line.lower()
+        if any(term in lowered for term in terms):
+            return number, line.strip()[:200]
+    return None, ""
@@ -0,0 +1,132 @@
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
+from django.dispatch import receiver
+
+from . import search, similarity
+from .models import Submission, Question, TestCase, Announcement, Group, Student, CodeBlob, StudentQuestionStats
+from .stats import refresh_student_question, recompute_group_rollups, recompute_question_rollups, regroup_students
+from .cache import (
+    invalidate, question_namespace, faculty_questions_namespace, faculty_announcements_namespace,
+    faculty_roster_namespace, question_similarity_namespace
+)
+
+
+# ---------- Statistics Rollups ----------
+@receiver(post_save, sender=Submission)
+def update_stats_on_save(sender, instance, raw=False, **kwargs):
+    """New and rejudged submissions update the rollups right away"""
+    if not raw:
+        refresh_student_question(instance.student_id, instance.question_id)
+
+
+@receiver(post_delete, sender=Submission)
+def update_stats_on_delete(sender, instance, origin=None, **kwargs):
+    # Deleting a question cascades to its rollup rows, and deleting a student
+    # is handled below; only direct submission deletes need the rollups adjusted.
+    if isinstance(origin, Submission) or (isinstance(origin, QuerySet) and origin.model is Submission):
+        refresh_student_question(instance.student_id, instance.question_id)
+
+
+@receiver(pre_save, sender=Student)
+def remember_student_group(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_group_id = Student.objects.filter(pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Student)
+def move_student_stats(sender, instance, created=False, raw=False, **kwargs):
+    """A student who changed group moves from the old group's rollups to the new one's"""
+    previous = getattr(instance, '_previous_group_id', None)
+    if not created and not raw and previous != instance.group_id:
+        regroup_students([instance.pk], [previous, instance.group_id])
+    instance._previous_group_id = instance.group_id
+
+
+@receiver(pre_delete, sender=Student)
+def remember_student_questions(sender, instance, **kwargs):
+    # Read before the cascade removes the student's rows
+    instance._attempted_question_ids = list(
+        StudentQuestionStats.objects.filter(student=instance).values_list('question_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Student)
+def remove_student_stats(sender, instance, **kwargs):
+    """The rollups a deleted student was counted in no longer count them"""
+    question_ids = getattr(instance, '_attempted_question_ids', [])
+    if question_ids:
+        recompute_question_rollups(question_ids)
+        recompute_group_rollups([instance.group_id], question_ids)
+
+
+# ---------- Denormalized Fields ----------
+@receiver(post_save, sender=Question)
+def sync_submission_faculty(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Submission.faculty copies question.faculty; follow a question moved to
+    another faculty. Not sent for queryset updates, which must update the
+    submissions themselves.
+    """
+    if not created and not raw:
+        Submission.objects.filter(question=instance).exclude(faculty_id=instance.faculty_id).update(
+            faculty_id=instance.faculty_id
+        )
+
+
+# ---------- Search Index ----------
+# Questions are indexed by SQL triggers; code blobs from here (see search.py)
+@receiver(post_save, sender=CodeBlob)
+def index_code_blob(sender, instance, created=False, **kwargs):
+    if created and search.available():
+        search.index_code_blob(instance)
+
+
+@receiver(post_delete, sender=CodeBlob)
+def unindex_code_blob(sender, instance, **kwargs):
+    if search.available():
+        search.unindex_code_blob(instance)
+
+
+# ---------- Similarity Index ----------
+@receiver(post_save, sender=Submission)
+def index_submission_similarity(sender, instance, created=False, raw=False, **kwargs):
+    # After commit, so fingerprinting doesn't hold the database write lock
+    if created and not raw:
+        def index():
+            similarity.index_submission(instance)
+            invalidate(question_similarity_namespace(instance.question_id))
+        transaction.on_commit(index)
+
+
+@receiver(post_delete, sender=Submission)
+def invalidate_similarity(sender, instance, **kwargs):
+    invalidate(question_similarity_namespace(instance.question_id))
+
+
+# ---------- Cache Invalidation ----------
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question(sender, instance, **kwargs):
+    invalidate(question_namespace(instance.id), faculty_questions_namespace(instance.faculty_id))
+
+
+@receiver([post_save, post_delete], sender=TestCase)
+def invalidate_test_case(sender, instance, **kwargs):
+    # The question payload includes the first test case as its example
+    invalidate(question_namespace(instance.question_id))
+
+
+@receiver([post_save, post_delete], sender=Announcement)
+def invalidate_announcements(sender, instance, **kwargs):
+    invalidate(faculty_announcements_namespace(instance.faculty_id))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_group_roster(sender, instance, **kwargs):
+    invalidate(faculty_roster_namespace(instance.faculty_id))
+
+
+@receiver([post_save, post_delete], sender=Student)
+def invalidate_student_roster(sender, instance, **kwargs):
+    if instance.faculty_id:
+        invalidate(faculty_roster_namespace(instance.faculty_id))
@@ -0,0 +1,325 @@
+"""
+Near-duplicate detection for submitted code (MinHash + LSH).
+
+Each distinct source (CodeBlob) in a language gets one CodeFingerprint:
+
+    1. tokenize, dropping comments and normalizing per language: identifiers
+       that aren't keywords or well-known library names become V, numbers
+       N, string literals S (so renaming variables or changing constants
+       doesn't hide a copy)
+    2. shingle the token stream into overlapping runs of SHINGLE_SIZE tokens
+    3. MinHash the shingle set into NUM_PERM values; the fraction of equal
+       values between two signatures estimates their Jaccard similarity
+
+The signature is cut into BANDS bands of ROWS values, and each band is
+hashed into a SimilarityBucket row for the question it was submitted to.
+Fingerprints that share any bucket are candidate pairs, found through the
+(question, bucket) index instead of comparing every pair; candidates whose
+estimated similarity is at least SIMILARITY_THRESHOLD are clustered.
+
+Submissions are indexed after they're committed (see signals.py), and
+migration 0020 indexes the ones saved before the index existed; run
+`python manage.py rebuild_similarity_index` after changing the constants
+below.
+"""
+import hashlib
+import itertools
+import keyword
+import operator
+import random
+import zlib
+from array import array
+
+from django.db import transaction
+from django.db.models import Count
+
+from .code_analysis import lex
+from .cache import cached, invalidate, question_similarity_namespace
+from .local_ai_evaluator import normalize_language
+from .models import CodeFingerprint, SimilarityBucket, Submission
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+BANDS, ROWS = 32, 4  # pairs above ~0.5 similarity almost always share a band
+SIMILARITY_THRESHOLD = 0.7
+# Shorter programs look alike no matter who wrote them; only exact copies are reported
+MIN_TOKENS = 20
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # fixed, so stored signatures stay comparable
+PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+# ---------- Tokenizing ----------
+_C_KEYWORDS = {
+    "auto", "break", "case", "char", "const", "continue", "default", "do", "double", "else", "enum",
+    "extern", "float", "for", "goto", "if", "int", "long", "register", "return", "short", "signed",
+    "sizeof", "static", "struct", "switch", "typedef", "union", "unsigned", "void", "volatile", "while",
+    "bool", "true", "false", "NULL",
+    "printf", "scanf", "puts", "gets", "getchar", "putchar", "malloc", "calloc", "free", "strlen",
+    "strcpy", "strcmp", "memset", "main",
+}
+_CPP_KEYWORDS = _C_KEYWORDS | {
+    "class", "namespace", "using", "std", "template", "typename", "public", "private", "protected",
+    "new", "delete", "this", "nullptr", "auto", "const_cast", "static_cast", "virtual", "operator",
+    "cin", "cout", "endl", "string", "vector", "map", "set", "pair", "unordered_map", "sort",
+    "push_back", "size", "begin", "end", "max", "min", "swap", "getline",
+}
+_JAVA_KEYWORDS = {
+    "abstract", "boolean", "break", "byte", "case", "catch", "char", "class", "continue", "default",
+    "do", "double", "else", "extends", "final", "finally", "float", "for", "if", "implements",
+    "import", "instanceof", "int", "interface", "long", "new", "null", "package", "private",
+    "protected", "public", "return", "short", "static", "super", "switch", "this", "throw", "throws",
+    "try", "void", "while", "true", "false", "var",
+    "String", "System", "out", "in", "println", "print", "printf", "Scanner", "nextInt", "nextLine",
+    "next", "Math", "Integer", "ArrayList", "HashMap", "List", "Map", "Arrays", "length", "main",
+    "args", "size", "get", "add", "put",
+}
+_PYTHON_KEYWORDS = set(keyword.kwlist) | {
+    "print", "input", "range", "len", "int", "str", "float", "list", "dict", "set", "tuple", "map",
+    "sorted", "sum", "min", "max", "abs", "enumerate", "zip", "open", "sys", "stdin", "readline",
+    "split", "strip", "append", "join", "self", "__name__", "__main__",
+}
+
+LANGUAGE_KEYWORDS = {
+    "python": _PYTHON_KEYWORDS,
+    "c": _C_KEYWORDS,
+    "cpp": _CPP_KEYWORDS,
+    "java": _JAVA_KEYWORDS,
+}
+
+
+def tokenize(code, language):
+    """Normalized token list: keywords and operators as written, other identifiers V, numbers N, strings S"""
+    keywords = LANGUAGE_KEYWORDS.get(language, _C_KEYWORDS)
+    tokens = []
+    for kind, text in lex(code, language):
+        if kind == "name":
+            tokens.append(text if text in keywords else "V")
+        elif kind == "number":
+            tokens.append("N")
+        elif kind == "string":
+            tokens.append("S")
+        elif kind == "op":
+            tokens.append(text)
+    return tokens
+
+
+# ---------- Signatures ----------
+def shingles(tokens):
+    """32-bit hashes of every run of SHINGLE_SIZE consecutive tokens"""
+    if len(tokens) < SHINGLE_SIZE:
+        return {zlib.crc32(" ".join(tokens).encode())} if tokens else set()
+    return {
+        zlib.crc32(" ".join(tokens[i:i + SHINGLE_SIZE]).encode())
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash(hashes):
+    """NUM_PERM minimum values of (a*x + b) mod p over the shingle hashes"""
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def signature(code, language):
+    """MinHash signature of `code`, or None if it's too short to compare"""
+    tokens = tokenize(code, language)
+    if len(tokens) < MIN_TOKENS:
+        return None
+    return minhash(shingles(tokens))
+
+
+def pack(values):
+    return array("Q", values).tobytes()
+
+
+def unpack(data):
+    values = array("Q")
+    values.frombytes(bytes(data))
+    return values
+
+
+def band_buckets(values):
+    """One signed 64-bit bucket key per band (the band number is part of the key)"""
+    buckets = []
+    for band in range(BANDS):
+        rows = array("Q", [band]) + array("Q", values[band * ROWS:(band + 1) * ROWS])
+        digest = hashlib.blake2b(rows.tobytes(), digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def estimated_similarity(first, second):
+    return sum(map(operator.eq, first, second)) / NUM_PERM
+
+
+# ---------- Indexing ----------
+def fingerprint_for(code_blob_id, language, code):
+    """
+    The (blob, language) fingerprint, computing it the first time the blob is
+    seen in that language. Returns None for code too short to fingerprint.
+    """
+    language = normalize_language(language) or (language or "").lower()
+    fingerprint = CodeFingerprint.objects.filter(code_blob_id=code_blob_id, language=language).first()
+    if fingerprint is not None:
+        return fingerprint
+
+    values = signature(code() if callable(code) else code, language)
+    if values is None:
+        return None
+    fingerprint, _ = CodeFingerprint.objects.get_or_create(
+        code_blob_id=code_blob_id, language=language, defaults={"signature": pack(values)}
+    )
+    return fingerprint
+
+
+def index_submission(submission):
+    """Add the submission's code to its question's LSH buckets"""
+    fingerprint = fingerprint_for(submission.code_blob_id, submission.language, lambda: submission.code)
+    if fingerprint is not None:
+        SimilarityBucket.objects.bulk_create([
+            SimilarityBucket(question_id=submission.question_id, bucket=bucket, fingerprint=fingerprint)
+            for bucket in band_buckets(unpack(fingerprint.signature))
+        ], ignore_conflicts=True)
+
+
+def rebuild_index(batch_size=500):
+    """Recompute every fingerprint and bucket from the submissions. Returns the number of fingerprints."""
+    from .models import CodeBlob
+
+    with transaction.atomic():
+        SimilarityBucket.objects.all().delete()
+        CodeFingerprint.objects.all().delete()
+
+        pairs = Submission.objects.values_list("question_id", "code_blob_id", "language").distinct().order_by(
+            "code_blob_id"
+        )
+        fingerprints, buckets = {}, []
+        for question_id, code_blob_id, language in pairs.iterator(chunk_size=batch_size):
+            key = (code_blob_id, normalize_language(language) or language.lower())
+            if key not in fingerprints:
+                blob = CodeBlob.objects.only("data").get(id=code_blob_id)
+                fingerprints[key] = fingerprint_for(code_blob_id, language, blob.text)
+            fingerprint = fingerprints[key]
+            if fingerprint is not None:
+                buckets.extend(
+                    SimilarityBucket(question_id=question_id, bucket=bucket, fingerprint=fingerprint)
+                    for bucket in band_buckets(unpack(fingerprint.signature))
+                )
+            if len(buckets) >= batch_size * BANDS:
+                SimilarityBucket.objects.bulk_create(buckets, batch_size=batch_size, ignore_conflicts=True)
+                buckets = []
+        SimilarityBucket.objects.bulk_create(buckets, batch_size=batch_size, ignore_conflicts=True)
+
+    invalidate(*[
+        question_similarity_namespace(question_id)
+        for question_id in Submission.objects.values_list("question_id", flat=True).distinct()
+    ])
+    return sum(1 for fingerprint in fingerprints.values() if fingerprint is not None)
+
+
+# ---------- Clusters ----------
+def _candidate_pairs(question_id):
+    """
+    Pairs of fingerprint ids sharing a bucket for this question: every pair
+    of each bucket's members, each pair once however many bands it shares.
+    """
+    shared = SimilarityBucket.objects.filter(question_id=question_id).values("bucket").annotate(
+        n=Count("id")
+    ).filter(n__gt=1).values("bucket")
+    members = {}
+    for bucket, fingerprint_id in SimilarityBucket.objects.filter(
+        question_id=question_id, bucket__in=shared
+    ).values_list("bucket", "fingerprint_id"):
+        members.setdefault(bucket, []).append(fingerprint_id)
+
+    pairs = set()
+    for ids in members.values():
+        pairs.update(itertools.combinations(sorted(ids), 2))
+    return pairs
+
+
+def find_clusters(question_id):
+    """
+    Groups of near-duplicate submissions to a question written by at least two
+    different students, most similar first. Each member is the student's
+    latest submission in the group.
+    """
+    # Fingerprint pairs that really are similar, not just band collisions
+    pairs = _candidate_pairs(question_id)
+    involved = {fingerprint_id for pair in pairs for fingerprint_id in pair}
+    signatures = {
+        id: unpack(data)
+        for id, data in CodeFingerprint.objects.filter(id__in=involved).values_list("id", "signature")
+    }
+
+    parent = {}
+
+    def root(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    best = {}
+    for a, b in pairs:
+        similarity = estimated_similarity(signatures[a], signatures[b])
+        if similarity >= SIMILARITY_THRESHOLD:
+            ra, rb = root(a), root(b)
+            parent[ra] = rb
+            best[("f", a)] = max(best.get(("f", a), 0), similarity)
+            best[("f", b)] = max(best.get(("f", b), 0), similarity)
+
+    # Exact copies: one blob submitted by several students
+    copied_blobs = set(
+        Submission.objects.filter(question_id=question_id).values("code_blob_id").annotate(
+            students=Count("student_id", distinct=True)
+        ).filter(students__gt=1).values_list("code_blob_id", flat=True)
+    )
+    fingerprint_blobs = dict(CodeFingerprint.objects.filter(id__in=parent).values_list("id", "code_blob_id"))
+    blob_groups = {}
+    for fingerprint_id, blob_id in fingerprint_blobs.items():
+        blob_groups.setdefault(blob_id, ("f", fingerprint_id))
+    for blob_id in copied_blobs:
+        blob_groups.setdefault(blob_id, ("b", blob_id))
+    if not blob_groups:
+        return []
+
+    submissions = Submission.objects.filter(
+        question_id=question_id, code_blob_id__in=blob_groups
+    ).select_related("student__user").only(
+        "id", "code_blob_id", "language", "score", "submitted_at", "student__user__username"
+    ).order_by("submitted_at", "id")
+
+    clusters = {}
+    for submission in submissions:
+        key = blob_groups[submission.code_blob_id]
+        group = root(key[1]) if key[0] == "f" else key
+        cluster = clusters.setdefault(group, {"members": {}, "similarity": 0.0})
+        # Later submissions replace earlier ones, leaving each student's latest
+        cluster["members"][submission.student_id] = {
+            "id": submission.id,
+            "student": submission.student.user.username,
+            "language": submission.language,
+            "score": submission.score,
+            "submitted_at": submission.submitted_at,
+        }
+        exact = submission.code_blob_id in copied_blobs
+        cluster["similarity"] = max(cluster["similarity"], 1.0 if exact else best.get(key, 0.0))
+
+    results = [
+        {
+            "similarity": round(cluster["similarity"] * 100),
+            "submissions": sorted(cluster["members"].values(), key=lambda member: member["submitted_at"]),
+        }
+        for cluster in clusters.values() if len(cluster["members"]) > 1
+    ]
+    results.sort(key=lambda cluster: (-cluster["similarity"], -len(cluster["submissions"])))
+    return results
+
+
+def question_clusters(question_id):
+    """find_clusters, cached until the next submission to the question"""
+    clusters, _ = cached(question_similarity_namespace(question_id), lambda: find_clusters(question_id))
+    return clusters
@@ -37,23 +37,33 @@ function getCookie(name) {
 
 const csrftoken = getCookie('csrftoken');
 
-async function loadGroups() {
-  try {
-    const response = await fetch('/faculty/groups/', {
+// Fetch every page of a cursor-paginated list endpoint and return the combined items
+async function fetchAllPages(url, key) {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await fetch(cursor ? `${url}?cursor=${cursor}` : url, {
       method: 'GET',
       headers: {
         'Content-Type': 'application/json',
         'X-CSRFToken': csrftoken
       }
     });
-
-    if (response.ok) {
-      const data = await response.json();
-      allGroups = data.groups;
-      displayGroups(data.groups);
-    } else {
-      console.error('Failed to load groups');
+    if (!response.ok) {
+      throw new Error(`Failed to load ${key}`);
     }
+    const data = await response.json();
+    items.push(...data[key]);
+    cursor = data.next_cursor;
+  } while (cursor);
+  return items;
+}
+
+async function loadGroups() {
+  try {
+    allGroups = await fetchAllPages('/faculty/groups/', 'groups');
+    displayGroups(allGroups);
+    fillImportGroupSelect(allGroups);
   } catch (error) {
     console.error('Error loading groups:', error);
   }
@@ -129,21 +139,8 @@ async function loadAllData() {
 
 async function loadStudents() {
   try {
-    const response = await fetch('/faculty/students/', {
-      method: 'GET',
-      headers: {
-        'Content-Type': 'application/json',
-        'X-CSRFToken': csrftoken
-      }
-    });
-
-    if (response.ok) {
-      const data = await response.json();
-      allStudents = data.students;
-      displayStudents(data.students);
-    } else {
-      console.error('Failed to load students');
-    }
+    allStudents = await fetchAllPages('/faculty/students/', 'students');
+    displayStudents(allStudents);
   } catch (error) {
     console.error('Error loading students:', error);
   }
@@ -158,9 +155,19 @@ function displayStudents(students) {
   }
 
   studentList.innerHTML = `
+    <div class="group-create-card">
+      <select id="bulkGroupSelect">
+        <option value="">-- Remove from group --</option>
+        ${allGroups.map(group => `<option value="${group.id}">${group.name}</option>`).join('')}
+      </select>
+      <button id="bulkAssignBtn" onclick="assignSelectedStudents()">Move Selected</button>
+    </div>
     <table style="width: 100%; border-collapse: collapse;">
       <thead>
         <tr style="background: rgba(255, 255, 255, 0.05); text-align: left;">
+          <th style="padding: 0.7rem; border-bottom: 2px solid rgba(255, 255, 255, 0.1);">
+            <input type="checkbox" id="selectAllStudents" onchange="toggleAllStudents(this.checked)" />
+          </th>
           <th style="padding: 0.7rem; border-bottom: 2px solid rgba(255, 255, 255, 0.1);">Student Name</th>
           <th style="padding: 0.7rem; border-bottom: 2px solid rgba(255, 255, 255, 0.1);">Current Group</th>
           <th style="padding: 0.7rem; border-bottom: 2px solid rgba(255, 255, 255, 0.1);">Assign to Group</th>
@@ -169,6 +176,9 @@ function displayStudents(students) {
       <tbody>
         ${students.map(student => `
           <tr style="border-bottom: 1px solid rgba(255, 255, 255, 0.05);">
+            <td style="padding: 0.7rem;">
+              <input type="checkbox" class="student-select" value="${student.id}" />
+            </td>
             <td style="padding: 0.7rem;">${student.username}</td>
             <td style="padding: 0.7rem;">${student.group_name || '<em style="color: #999;">No group</em>'}</td>
             <td style="padding: 0.7rem;">
@@ -193,17 +203,18 @@ function displayStudents(students) {
   `;
 }
 
-async function assignStudentToGroup(studentId, groupId) {
+// Move any number of students in one request (a single UPDATE on the server)
+async function assignStudentsToGroup(studentIds, groupId) {
   try {
-    const response = await fetch('/faculty/students/assign/', {
+    const response = await fetch('/faculty/students/assign/batch/', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
         'X-CSRFToken': csrftoken
       },
-      body: JSON.stringify({ 
-        student_id: studentId, 
-        group_id: groupId || null 
+      body: JSON.stringify({
+        student_ids: studentIds,
+        group_id: groupId ? Number(groupId) : null
       })
     });
 
@@ -211,17 +222,97 @@ async function assignStudentToGroup(studentId, groupId) {
 
     if (response.ok) {
       await loadAllData();
-      alert(data.message || 'Student assigned successfully!');
+      alert(data.message || 'Students assigned successfully!');
     } else {
-      alert(data.error || 'Failed to assign student');
+      alert(data.error || 'Failed to assign students');
       await loadStudents();
     }
   } catch (error) {
-    console.error('Error assigning student:', error);
-    alert('An error occurred while assigning the student');
+    console.error('Error assigning students:', error);
+    alert('An error occurred while assigning the students');
+  }
+}
+
+function assignStudentToGroup(studentId, groupId) {
+  return assignStudentsToGroup([studentId], groupId);
+}
+
+function toggleAllStudents(checked) {
+  document.querySelectorAll('.student-select').forEach(box => { box.checked = checked; });
+}
+
+function assignSelectedStudents() {
+  const studentIds = [...document.querySelectorAll('.student-select:checked')].map(box => Number(box.value));
+  if (studentIds.length === 0) {
+    alert('Please select at least one student');
+    return;
   }
+  return assignStudentsToGroup(studentIds, document.getElementById('bulkGroupSelect').value);
 }
 
 window.assignStudentToGroup = assignStudentToGroup;
+window.toggleAllStudents = toggleAllStudents;
+window.assignSelectedStudents = assignSelectedStudents;
+
+// Bulk Enrollment Logic
+const importCsvInput = document.getElementById('importCsvInput');
+const importGroupSelect = document.getElementById('importGroupSelect');
+const importStudentsBtn = document.getElementById('importStudentsBtn');
+const importResult = document.getElementById('importResult');
+
+function escapeText(text) {
+  const div = document.createElement('div');
+  div.textContent = text;
+  return div.innerHTML;
+}
+
+function fillImportGroupSelect(groups) {
+  if (!importGroupSelect) return;
+  const selected = importGroupSelect.value;
+  importGroupSelect.innerHTML = '<option value="">No default group</option>' +
+    groups.map(group => `<option value="${group.id}">${escapeText(group.name)}</option>`).join('');
+  importGroupSelect.value = selected;
+}
+
+async function importStudents() {
+  const file = importCsvInput.files[0];
+  if (!file) {
+    alert('Please choose a CSV file');
+    return;
+  }
+
+  const formData = new FormData();
+  formData.append('csv', file);
+  formData.append('group_id', importGroupSelect.value);
+
+  importStudentsBtn.disabled = true;
+  importResult.textContent = 'Importing...';
+  try {
+    const response = await fetch('/faculty/students/import/', {
+      method: 'POST',
+      headers: { 'X-CSRFToken': csrftoken },
+      body: formData
+    });
+    const data = await response.json();
+
+    if (!response.ok) {
+      importResult.textContent = data.error || 'Import failed';
+      return;
+    }
+
+    importResult.innerHTML = `<p>Created ${data.created} student(s); ${data.errors.length} row(s) skipped.</p>` +
+      (data.errors.length ? `<ul>${data.errors.map(error =>
+        `<li>Row ${error.row}: ${escapeText(error.errors.join('; '))}</li>`).join('')}</ul>` : '');
+    importCsvInput.value = '';
+    await loadAllData();
+  } catch (error) {
+    console.error('Error importing students:', error);
+    importResult.textContent = 'An error occurred while importing students';
+  } finally {
+    importStudentsBtn.disabled = false;
+  }
+}
+
+importStudentsBtn?.addEventListener('click', importStudents);
 
 loadAllData();
@@ -9,6 +9,7 @@ document.addEventListener('DOMContentLoaded', () => {
   const langSelect = document.getElementById('langSelect');
   const codeEditor = document.getElementById('codeEditor');
   const runBtn = document.getElementById('runBtn');
+  const quickCheckBtn = document.getElementById('quickCheckBtn');
   const submitBtn = document.getElementById('submitBtn');
   const saveBtn = document.getElementById('saveBtn');
   const scoreEl = document.getElementById('score');
@@ -154,7 +155,7 @@ document.addEventListener('DOMContentLoaded', () => {
     try {
       showToast('Submitting for evaluation...', 1500);
       
-      const response = await fetch(`/student/submit/${currentQuestionId}/`, {
+      const response = await fetch(`/student/submit/${currentQuestionId}/stream/`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -166,15 +167,18 @@ document.addEventListener('DOMContentLoaded', () => {
         })
       });
       
-      const data = await response.json();
-      
-      if (data.error) {
-        showToast('Submission failed: ' + data.error, 3000);
+      if (!response.ok || !response.body) {
+        const data = await response.json();
+        showToast('Submission failed: ' + (data.error || response.status), 3000);
         return;
       }
       
-      // Extract the actual result (nested under 'result' key)
-      const result = data.result;
+      // Results arrive as server-sent events and are rendered as they come in
+      const result = await readEvaluationStream(response);
+      if (!result) {
+        showToast('Submission failed: evaluation ended unexpectedly', 3000);
+        return;
+      }
       
       // Check for language mismatch - show error only, no score/feedback
       if (result.results && result.results.length > 0 && result.results[0].status === 'language_mismatch') {
@@ -244,6 +248,55 @@ document.addEventListener('DOMContentLoaded', () => {
       showToast('Failed to submit code. Please try again.', 3000);
     }
   });
+
+  // Read the submit stream, showing compile status, each test result and the
+  // logic score as they arrive. Resolves with the final report ("done" event).
+  async function readEvaluationStream(response) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let passed = 0;
+    let progressText = '';
+    let report = null;
+
+    scoreEl.textContent = '…';
+    testsEl.textContent = '…';
+    logicEl.textContent = '…';
+    aiFeedback.textContent = 'Compiling...';
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const chunk = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        const dataLine = chunk.split('\n').find(line => line.startsWith('data: '));
+        if (!dataLine) continue;
+        const event = JSON.parse(dataLine.slice(6));
+
+        if (event.event === 'compile') {
+          progressText = event.status === 'ok' ? 'Compiled ✓\n\n' : `Compilation failed ✗\n${event.error}\n\n`;
+        } else if (event.event === 'test') {
+          const test = event.result;
+          if (test.is_correct) passed++;
+          testsEl.textContent = `${passed}/${event.index + 1} of ${event.total}`;
+          progressText += `Test ${event.index + 1}/${event.total}: ${test.is_correct ? '✓ Passed' : '✗ Failed'}\n`;
+        } else if (event.event === 'analysis') {
+          const logicScore = event.logic_score;
+          logicEl.textContent = (logicScore !== null && logicScore !== undefined) ? `${logicScore}/10 (Logic)` : 'AI Unavailable';
+          progressText += '\nLogic analysis complete.\n';
+        } else if (event.event === 'done') {
+          report = event.report;
+        }
+        aiFeedback.textContent = progressText.trim();
+      }
+    }
+    return report;
+  }
+
   saveBtn.addEventListener('click', () => {
     localStorage.setItem('cq_draft', codeEditor.value);
     showToast('Draft saved locally');
@@ -414,7 +467,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
   try {
     showToast('Running code...', 1500);
-    const response = await fetch("/student/run_code/", {
+    const response = await fetch("/student/run_code/async/", {
       method: "POST",
       body: formData,
       headers: { "X-CSRFToken": getCookie("csrftoken") }
@@ -493,6 +546,70 @@ document.addEventListener('DOMContentLoaded', () => {
   }
   });
 
+  // Quick Check: run the question's test cases (likely failures first), stop at first failure
+  quickCheckBtn.addEventListener('click', async () => {
+    if (!currentQuestionId) {
+      showToast('Please select a question first', 2000);
+      return;
+    }
+
+    const formData = new FormData();
+    formData.append('code', codeEditor.value);
+    formData.append('language', langSelect.value);
+
+    try {
+      showToast('Quick check running...', 1500);
+      const response = await fetch(`/student/quick-check/${currentQuestionId}/`, {
+        method: 'POST',
+        body: formData,
+        headers: { 'X-CSRFToken': getCookie('csrftoken') }
+      });
+      const result = await response.json();
+
+      if (result.status === 'language_mismatch') {
+        scoreEl.textContent = 'N/A';
+        testsEl.textContent = 'N/A';
+        logicEl.textContent = 'N/A';
+        aiFeedback.textContent = `⚠️ LANGUAGE MISMATCH\n\n${result.error}`;
+        showToast('Language mismatch detected!', 3000);
+        return;
+      }
+
+      scoreEl.textContent = '—';
+      logicEl.textContent = '—';
+
+      if (result.status === 'compile_error') {
+        testsEl.textContent = `0/${result.total_tests}`;
+        aiFeedback.textContent = `QUICK CHECK: ✗ Your code did not compile\n\n${result.error}`;
+        showToast('Compilation failed', 2000);
+        return;
+      }
+
+      if (result.passed) {
+        testsEl.textContent = `${result.total_tests}/${result.total_tests}`;
+        aiFeedback.textContent = `QUICK CHECK: ✓ All ${result.total_tests} test cases passed.\n\nSubmit to get your graded score and AI feedback.`;
+        showToast('Quick check passed!', 2000);
+        return;
+      }
+
+      const failed = result.failed_case;
+      testsEl.textContent = `Failed test ${failed.number}`;
+      let feedbackText = `QUICK CHECK: ✗ Test ${failed.number} failed (stopped after ${result.tests_run}/${result.total_tests} tests)\n\n`;
+      if (failed.error) {
+        feedbackText += `Error: ${failed.error}\n`;
+      } else {
+        feedbackText += `Input: ${failed.input}\n`;
+        feedbackText += `Expected: ${failed.expected}\n`;
+        feedbackText += `Got: ${failed.output || '(no output)'}\n`;
+      }
+      aiFeedback.textContent = feedbackText.trim();
+      showToast(`Test ${failed.number} failed`, 2000);
+    } catch (error) {
+      console.error('Quick check error:', error);
+      showToast('Failed to run quick check. Please try again.', 3000);
+    }
+  });
+
   // Helper function to check if feedback is an AI error message
   function isAIErrorMessage(feedback) {
     if (!feedback) return true;
@@ -532,6 +649,55 @@ document.addEventListener('DOMContentLoaded', () => {
       return cookieValue;
   }
 
+  // Full submission history, loaded a page at a time on request
+  const historyBtn = document.getElementById('historyBtn');
+  const historyTable = document.getElementById('historyTable');
+  const historyBody = document.getElementById('historyBody');
+  const historyMoreBtn = document.getElementById('historyMoreBtn');
+  let historyCursor = null;
+
+  async function loadHistoryPage() {
+    const url = historyCursor
+      ? `/student/submissions/?cursor=${encodeURIComponent(historyCursor)}`
+      : '/student/submissions/';
+    historyMoreBtn.disabled = true;
+    try {
+      const response = await fetch(url);
+      const data = await response.json();
+      if (!response.ok) throw new Error(data.error || 'Failed to load history');
+
+      data.submissions.forEach(sub => {
+        const row = document.createElement('tr');
+        [
+          sub.question,
+          sub.language,
+          `${Math.round(sub.score)}%`,
+          `${sub.passed}/${sub.total}`,
+          new Date(sub.submitted_at).toLocaleString()
+        ].forEach(value => {
+          const cell = document.createElement('td');
+          cell.textContent = value;
+          row.appendChild(cell);
+        });
+        historyBody.appendChild(row);
+      });
+
+      historyCursor = data.next_cursor;
+      historyMoreBtn.classList.toggle('hidden', !historyCursor);
+    } catch (err) {
+      console.error('History error:', err);
+    } finally {
+      historyMoreBtn.disabled = false;
+    }
+  }
+
+  historyBtn?.addEventListener('click', () => {
+    historyBtn.classList.add('hidden');
+    historyTable.classList.remove('hidden');
+    loadHistoryPage();
+  });
+  historyMoreBtn?.addEventListener('click', loadHistoryPage);
+
   // Done
   console.log('Student dashboard loaded');
 });
@@ -0,0 +1,49 @@
+// Per-test submission details for the faculty lists, fetched the first time
+// "View Details" is expanded instead of being rendered into the page.
+const submissionDetailsCache = {};
+
+async function fetchSubmissionDetails(submissionId) {
+  if (!submissionDetailsCache[submissionId]) {
+    const response = await fetch(`/faculty/submissions/${submissionId}/details/`);
+    const data = await response.json();
+    if (!response.ok) {
+      throw new Error(data.error || 'Failed to load submission details');
+    }
+    submissionDetailsCache[submissionId] = data;
+  }
+  return submissionDetailsCache[submissionId];
+}
+
+async function loadSubmissionDetails(submissionId) {
+  return (await fetchSubmissionDetails(submissionId)).results;
+}
+
+async function loadSubmissionCode(submissionId) {
+  return (await fetchSubmissionDetails(submissionId)).code;
+}
+
+// Show or hide a submission's source (similarity report)
+async function toggleSubmissionCode(submissionId) {
+  const block = document.getElementById('code-' + submissionId);
+  if (block.style.display !== 'none') {
+    block.style.display = 'none';
+    return;
+  }
+  block.style.display = 'block';
+  try {
+    block.textContent = await loadSubmissionCode(submissionId);
+  } catch (error) {
+    block.textContent = error.message;
+  }
+}
+
+function escapeHtml(text) {
+  const div = document.createElement('div');
+  div.textContent = text === null || text === undefined ? '' : String(text);
+  return div.innerHTML;
+}
+
+// AI service errors are hidden from faculty; only meaningful feedback is shown
+function isMeaningfulFeedback(feedback) {
+  return feedback && !['AI service error', 'model loading', 'Enable AI'].some(pattern => feedback.includes(pattern));
+}
@@ -0,0 +1,232 @@
+"""
+Statistics rollups for faculty analytics.
+
+Three tables are kept up to date whenever a submission is saved (new or
+rejudged) or deleted:
+
+    StudentQuestionStats  one row per (student, question)
+    QuestionStats         one row per question
+    GroupQuestionStats    one row per (group, question)
+
+A save recomputes the student's row (including which attempts are their best
+and latest) from that student's own attempts at the question, then applies
+the difference to the question and group rows, so the dashboards read a
+handful of small rows no matter how long the submission history is.
+
+Group rows count each student in their current group: when students move
+between groups (see signals.py and the batch assign view) the rows of the
+groups they left and joined are recomputed for the questions they
+attempted, and deleting a student recomputes the rows they were counted
+in. `python manage.py rebuild_stats` recomputes everything from scratch.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Submission, Student, StudentQuestionStats, QuestionStats, GroupQuestionStats
+
+# A question counts as solved by a submission that passed every test case
+SOLVED = Q(total_count__gt=0, passed_count=F('total_count'))
+
+STUDENT_AGGREGATES = {
+    "attempts": Count('id'),
+    "score_total": Coalesce(Sum('score'), 0.0),
+    "best_score": Coalesce(Max('score'), 0.0),
+    "logic_score_total": Coalesce(Sum('logic_score'), 0.0),
+    "logic_score_count": Count('logic_score'),
+    "first_solved_at": Min('submitted_at', filter=SOLVED),
+    "last_submitted_at": Max('submitted_at'),
+}
+
+ROLLUP_AGGREGATES = {
+    "attempts": Sum('attempts'),
+    "students_attempted": Count('id'),
+    "students_solved": Count('id', filter=Q(first_solved_at__isnull=False)),
+    "score_total": Sum('score_total'),
+    "best_score": Max('best_score'),
+    "logic_score_total": Sum('logic_score_total'),
+    "logic_score_count": Sum('logic_score_count'),
+    "first_solved_at": Min('first_solved_at'),
+}
+
+# Which attempt is "best" (earliest of the top scores) and "latest"
+BEST_FIRST = ('-score', 'submitted_at', 'id')
+LATEST_FIRST = ('-submitted_at', '-id')
+
+ADDITIVE_FIELDS = ('attempts', 'score_total', 'logic_score_total', 'logic_score_count')
+
+EMPTY_STUDENT_STATS = {
+    "attempts": 0,
+    "score_total": 0.0,
+    "best_score": 0.0,
+    "logic_score_total": 0.0,
+    "logic_score_count": 0,
+    "first_solved_at": None,
+    "last_submitted_at": None,
+}
+
+
+# ---------- Incremental Updates ----------
+def refresh_student_question(student_id, question_id):
+    """Recompute one student's row for a question and apply the change to its rollups"""
+    with transaction.atomic():
+        new = Submission.objects.filter(
+            student_id=student_id, question_id=question_id
+        ).aggregate(**STUDENT_AGGREGATES)
+
+        row = StudentQuestionStats.objects.select_for_update().filter(
+            student_id=student_id, question_id=question_id
+        ).first()
+        old = {field: getattr(row, field) for field in EMPTY_STUDENT_STATS} if row else EMPTY_STUDENT_STATS
+
+        if new["attempts"]:
+            attempts = Submission.objects.filter(student_id=student_id, question_id=question_id)
+            StudentQuestionStats.objects.update_or_create(
+                student_id=student_id, question_id=question_id,
+                defaults={
+                    **new,
+                    "best_submission_id": attempts.order_by(*BEST_FIRST).values_list('id', flat=True).first(),
+                    "latest_submission_id": attempts.order_by(*LATEST_FIRST).values_list('id', flat=True).first(),
+                }
+            )
+        elif row:
+            row.delete()
+
+        apply_change(QuestionStats, {"question_id": question_id}, {}, old, new)
+
+        group_id = Student.objects.filter(id=student_id).values_list('group_id', flat=True).first()
+        if group_id:
+            apply_change(
+                GroupQuestionStats, {"group_id": group_id, "question_id": question_id},
+                {"student__group_id": group_id}, old, new
+            )
+
+
+def apply_change(model, key, scope, old, new):
+    """
+    Move a rollup row from counting the student's `old` stats to counting `new`.
+    Sums and counts are adjusted in place; the best score and first solve time
+    are only recomputed (from the StudentQuestionStats rows in `scope`) when
+    the change could have lowered or delayed them.
+    """
+    rollup, _ = model.objects.select_for_update().get_or_create(**key)
+
+    for field in ADDITIVE_FIELDS:
+        setattr(rollup, field, getattr(rollup, field) + new[field] - old[field])
+    rollup.students_attempted += bool(new["attempts"]) - bool(old["attempts"])
+    rollup.students_solved += (new["first_solved_at"] is not None) - (old["first_solved_at"] is not None)
+
+    rows = StudentQuestionStats.objects.filter(question_id=key["question_id"], **scope)
+    if new["best_score"] >= old["best_score"]:
+        rollup.best_score = max(rollup.best_score, new["best_score"])
+    else:
+        rollup.best_score = rows.aggregate(best=Max('best_score'))["best"] or 0
+
+    old_first, new_first = old["first_solved_at"], new["first_solved_at"]
+    if new_first != old_first:
+        if new_first is not None and (old_first is None or new_first < old_first):
+            rollup.first_solved_at = min(filter(None, [rollup.first_solved_at, new_first]))
+        else:
+            rollup.first_solved_at = rows.aggregate(first=Min('first_solved_at'))["first"]
+
+    if rollup.students_attempted:
+        rollup.save()
+    else:
+        rollup.delete()
+
+
+# ---------- Group Moves and Deleted Students ----------
+def recompute_question_rollups(question_ids):
+    """Recompute the QuestionStats rows of `question_ids` (a list or a values() queryset)"""
+    with transaction.atomic():
+        QuestionStats.objects.filter(question_id__in=question_ids).delete()
+        rows = StudentQuestionStats.objects.filter(question_id__in=question_ids).values(
+            'question_id'
+        ).annotate(**ROLLUP_AGGREGATES).order_by()
+        QuestionStats.objects.bulk_create(QuestionStats(**row) for row in rows)
+
+
+def recompute_group_rollups(group_ids, question_ids):
+    """Recompute the GroupQuestionStats rows of `group_ids` for `question_ids`"""
+    group_ids = [group_id for group_id in group_ids if group_id]
+    if not group_ids:
+        return
+    with transaction.atomic():
+        GroupQuestionStats.objects.filter(group_id__in=group_ids, question_id__in=question_ids).delete()
+        rows = StudentQuestionStats.objects.filter(
+            question_id__in=question_ids, student__group_id__in=group_ids
+        ).values('question_id', group_id=F('student__group_id')).annotate(**ROLLUP_AGGREGATES).order_by()
+        GroupQuestionStats.objects.bulk_create(GroupQuestionStats(**row) for row in rows)
+
+
+def regroup_students(student_ids, group_ids):
+    """Students moved between the groups in `group_ids` (the ones they left and the one they joined)"""
+    attempted = StudentQuestionStats.objects.filter(student_id__in=student_ids).values('question_id')
+    recompute_group_rollups(set(group_ids), attempted)
+
+
+# ---------- Full Rebuild ----------
+def rebuild_all(batch_size=1000):
+    """Recompute every rollup table from the submissions. Returns the number of rows per table."""
+    with transaction.atomic():
+        GroupQuestionStats.objects.all().delete()
+        QuestionStats.objects.all().delete()
+        StudentQuestionStats.objects.all().delete()
+
+        student_rows = Submission.objects.values('student_id', 'question_id').annotate(**STUDENT_AGGREGATES).order_by()
+        StudentQuestionStats.objects.bulk_create(
+            (StudentQuestionStats(**row) for row in student_rows.iterator(chunk_size=batch_size)),
+            batch_size=batch_size
+        )
+
+        attempts = Submission.objects.filter(student_id=OuterRef('student_id'), question_id=OuterRef('question_id'))
+        StudentQuestionStats.objects.update(
+            best_submission_id=Subquery(attempts.order_by(*BEST_FIRST).values('id')[:1]),
+            latest_submission_id=Subquery(attempts.order_by(*LATEST_FIRST).values('id')[:1])
+        )
+
+        question_rows = StudentQuestionStats.objects.values('question_id').annotate(**ROLLUP_AGGREGATES).order_by()
+        QuestionStats.objects.bulk_create(
+            (QuestionStats(**row) for row in question_rows.iterator(chunk_size=batch_size)),
+            batch_size=batch_size
+        )
+
+        group_rows = StudentQuestionStats.objects.filter(student__group__isnull=False).values(
+            'question_id', group_id=F('student__group_id')
+        ).annotate(**ROLLUP_AGGREGATES).order_by()
+        GroupQuestionStats.objects.bulk_create(
+            (GroupQuestionStats(**row) for row in group_rows.iterator(chunk_size=batch_size)),
+            batch_size=batch_size
+        )
+
+    return {
+        "student_question": StudentQuestionStats.objects.count(),
+        "question": QuestionStats.objects.count(),
+        "group_question": GroupQuestionStats.objects.count(),
+    }
+
+
+# ---------- Serialization ----------
+def rollup_json(rollup):
+    return {
+        "attempts": rollup.attempts,
+        "students_attempted": rollup.students_attempted,
+        "students_solved": rollup.students_solved,
+        "pass_rate": rollup.pass_rate,
+        "average_score": rollup.average_score,
+        "best_score": rollup.best_score,
+        "average_logic_score": rollup.average_logic_score,
+        "first_solved_at": rollup.first_solved_at.isoformat() if rollup.first_solved_at else None,
+    }
+
+
+def student_stats_json(row):
+    return {
+        "attempts": row.attempts,
+        "solved": row.solved,
+        "average_score": row.average_score,
+        "best_score": row.best_score,
+        "average_logic_score": row.average_logic_score,
+        "first_solved_at": row.first_solved_at.isoformat() if row.first_solved_at else None,
+        "last_submitted_at": row.last_submitted_at.isoformat() if row.last_submitted_at else None,
+    }
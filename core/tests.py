@@ -0,0 +1,1430 @@
+import asyncio
+import csv
+import importlib
+import io
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock, skipUnless
+
+import httpx
+from django.apps import apps as django_apps
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import async_evaluator, checkers, code_analysis, language_detection, local_ai_evaluator, runners, scheduler
+from .management.commands.inference_standin import FEEDBACK, StandinServer
+from .models import CodeBlob, CodeFingerprint, Faculty, Group, GroupQuestionStats, Question, QuestionStats, SimilarityBucket, Student, StudentQuestionStats, Submission, TestResult
+from .stats import rebuild_all
+from .question_import import import_questions
+from .similarity import find_clusters, tokenize
+from .cache import cached, invalidate
+from . import db, enrollment, launcher, views
+from .views import decode_cursor, encode_cursor, keyset_page, store_submission, test_result_row
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class RosterQueryCountTests(TestCase):
+    """The group and student endpoints use a fixed number of queries, whatever the roster size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("faculty", password="pass")
+        cls.faculty = Faculty.objects.create(user=user, department="CS")
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client.login(username="faculty", password="pass")
+
+    def add_roster(self, groups, students_per_group):
+        for g in range(groups):
+            group = Group.objects.create(name=f"group-{Group.objects.count()}", faculty=self.faculty)
+            for s in range(students_per_group):
+                user = User.objects.create(username=f"student-{User.objects.count()}")
+                Student.objects.create(user=user, faculty=self.faculty, group=group)
+
+    def assert_fixed_queries(self, url, key):
+        # session, user, faculty, then the endpoint's own queries
+        expected = {"groups": 5, "students": 4}[key]
+
+        self.add_roster(groups=2, students_per_group=2)
+        with self.assertNumQueries(expected):
+            small = self.client.get(url).json()
+
+        self.add_roster(groups=10, students_per_group=5)
+        with self.assertNumQueries(expected):
+            large = self.client.get(url).json()
+
+        self.assertEqual(len(small[key]), 2 if key == "groups" else 4)
+        self.assertEqual(len(large[key]), 12 if key == "groups" else 54)
+
+    def test_groups_query_count_is_fixed(self):
+        self.assert_fixed_queries("/faculty/groups/", "groups")
+
+    def test_students_query_count_is_fixed(self):
+        self.assert_fixed_queries("/faculty/students/", "students")
+
+    def test_group_student_counts(self):
+        self.add_roster(groups=3, students_per_group=4)
+        groups = self.client.get("/faculty/groups/").json()["groups"]
+        self.assertEqual([group["student_count"] for group in groups], [4, 4, 4])
+        self.assertTrue(all(len(group["students"]) == 4 for group in groups))
+
+    def test_students_cursor_pagination(self):
+        self.add_roster(groups=1, students_per_group=5)
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = self.client.get("/faculty/students/", params).json()
+            seen += [student["id"] for student in page["students"]]
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        self.assertEqual(seen, sorted(Student.objects.values_list("id", flat=True)))
+
+    def test_etag_revalidation_and_invalidation(self):
+        self.add_roster(groups=1, students_per_group=1)
+        response = self.client.get("/faculty/groups/")
+        etag = response["ETag"]
+
+        self.assertEqual(self.client.get("/faculty/groups/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.add_roster(groups=1, students_per_group=1)
+        refreshed = self.client.get("/faculty/groups/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(len(refreshed.json()["groups"]), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class BatchAssignTests(TestCase):
+    """Moving students between groups in one request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("faculty", password="pass")
+        cls.faculty = Faculty.objects.create(user=user, department="CS")
+        other = Faculty.objects.create(user=User.objects.create(username="other"), department="CS")
+        cls.group = Group.objects.create(name="A", faculty=cls.faculty)
+        cls.other_group = Group.objects.create(name="B", faculty=other)
+        cls.students = [
+            Student.objects.create(user=User.objects.create(username=f"student-{i}"), faculty=cls.faculty)
+            for i in range(30)
+        ]
+        cls.other_student = Student.objects.create(user=User.objects.create(username="outsider"), faculty=other)
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client.login(username="faculty", password="pass")
+
+    def assign(self, student_ids, group_id):
+        return self.client.post(
+            "/faculty/students/assign/batch/",
+            {"student_ids": student_ids, "group_id": group_id},
+            content_type="application/json"
+        )
+
+    def test_moves_all_students_with_one_update(self):
+        ids = [student.id for student in self.students]
+        # session, user, faculty, ownership check, previous groups, UPDATE, then
+        # the moved rollups (delete + aggregate) and four savepoint statements;
+        # the same count for 30 students as for one
+        with self.assertNumQueries(12):
+            response = self.assign(ids, self.group.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 30)
+        self.assertEqual(Student.objects.filter(group=self.group).count(), 30)
+
+        response = self.assign(ids[:10], None)
+        self.assertEqual(response.json()["updated"], 10)
+        self.assertEqual(Student.objects.filter(group=self.group).count(), 20)
+
+    def test_roster_cache_is_invalidated(self):
+        before = self.client.get("/faculty/students/").json()["students"]
+        self.assertTrue(all(student["group_id"] is None for student in before))
+
+        self.assign([student.id for student in self.students], self.group.id)
+        after = self.client.get("/faculty/students/").json()["students"]
+        self.assertTrue(all(student["group_id"] == self.group.id for student in after))
+
+    def test_rejects_other_faculty_students_and_groups(self):
+        ids = [self.students[0].id, self.other_student.id]
+        self.assertEqual(self.assign(ids, self.group.id).status_code, 403)
+        self.assertEqual(self.assign([self.students[0].id], self.other_group.id).status_code, 403)
+        self.assertFalse(Student.objects.filter(group__isnull=False).exclude(id=self.other_student.id).exists())
+
+    def test_rejects_bad_payloads(self):
+        self.assertEqual(self.assign([], self.group.id).status_code, 400)
+        self.assertEqual(self.assign(["1"], self.group.id).status_code, 400)
+        self.assertEqual(self.assign([self.students[0].id], "x").status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class StatsRollupTests(TestCase):
+    """Incremental rollups stay equal to a full rebuild through group moves and deletes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("faculty", password="pass")
+        cls.faculty = Faculty.objects.create(user=user, department="CS")
+        cls.group_a = Group.objects.create(name="A", faculty=cls.faculty)
+        cls.group_b = Group.objects.create(name="B", faculty=cls.faculty)
+        cls.question = Question.objects.create(faculty=cls.faculty, title="Q", description="D")
+        cls.students = [
+            Student.objects.create(user=User.objects.create(username=f"student-{i}"), faculty=cls.faculty, group=cls.group_a)
+            for i in range(3)
+        ]
+
+    def submit(self, student, score, passed):
+        Submission.objects.create(
+            student=student, question=self.question, code=f"print({score})", language="python",
+            score=score, passed_count=passed, total_count=2
+        )
+
+    def rollups(self):
+        fields = ('attempts', 'students_attempted', 'students_solved', 'score_total', 'best_score', 'first_solved_at')
+        return (
+            list(QuestionStats.objects.values_list('question_id', *fields)),
+            sorted(GroupQuestionStats.objects.values_list('group_id', 'question_id', *fields))
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_all()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_rollups_follow_submissions(self):
+        self.submit(self.students[0], 100, 2)
+        self.submit(self.students[0], 50, 1)
+        self.submit(self.students[1], 40, 1)
+        self.submit(self.students[2], 0, 0)
+        self.assertMatchesRebuild()
+
+        stats = QuestionStats.objects.get(question=self.question)
+        self.assertEqual((stats.attempts, stats.students_attempted, stats.students_solved), (4, 3, 1))
+        self.assertEqual((stats.score_total, stats.best_score), (190, 100))
+        student_stats = StudentQuestionStats.objects.get(student=self.students[0], question=self.question)
+        self.assertEqual((student_stats.attempts, student_stats.best_score), (2, 100))
+        self.assertIsNotNone(student_stats.first_solved_at)
+        self.assertEqual(GroupQuestionStats.objects.get(group=self.group_a).attempts, 4)
+
+    def test_single_group_move(self):
+        self.submit(self.students[0], 100, 2)
+        self.submit(self.students[0], 50, 1)
+        self.submit(self.students[1], 40, 1)
+
+        student = self.students[0]
+        student.group = self.group_b
+        student.save()
+        self.submit(student, 80, 1)  # counted in the new group only
+        self.assertMatchesRebuild()
+        self.assertEqual(GroupQuestionStats.objects.get(group=self.group_b).attempts, 3)
+        self.assertEqual(GroupQuestionStats.objects.get(group=self.group_a).students_attempted, 1)
+
+        student.group = None
+        student.save()
+        self.assertMatchesRebuild()
+        self.assertFalse(GroupQuestionStats.objects.filter(group=self.group_b).exists())
+
+    def test_batch_assign(self):
+        for student in self.students:
+            self.submit(student, 100, 2)
+        self.client.login(username="faculty", password="pass")
+        response = self.client.post(
+            "/faculty/students/assign/batch/",
+            {"student_ids": [s.id for s in self.students[:2]], "group_id": self.group_b.id},
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+        self.assertEqual(GroupQuestionStats.objects.get(group=self.group_b).students_attempted, 2)
+
+    def test_student_deleted(self):
+        self.submit(self.students[0], 100, 2)
+        self.submit(self.students[1], 30, 0)
+        self.students[0].user.delete()  # cascades to the student
+        self.assertMatchesRebuild()
+        self.assertEqual(QuestionStats.objects.get(question=self.question).students_solved, 0)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class QuestionImportTests(TestCase):
+    """Importing question banks from JSONL and zip bundles"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+
+    def question(self, n, **extra):
+        return {
+            "title": f"Question {n}",
+            "description": "Add two numbers",
+            "test_cases": [{"input": f"{n} {i}", "output": str(n + i)} for i in range(3)],
+            **extra
+        }
+
+    def jsonl(self, records):
+        return io.BytesIO("\n".join(json.dumps(record) for record in records).encode())
+
+    def test_jsonl_import_batches_inserts(self):
+        bundle = self.jsonl(self.question(n) for n in range(250))
+        with CaptureQueriesContext(connection) as queries:
+            report = import_questions(bundle, self.faculty)
+        # One multi-row Question insert per batch
+        question_inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "core_question"')]
+        self.assertEqual(len(question_inserts), 3)
+        self.assertEqual((report["created"], report["test_cases"], report["errors"]), (250, 750, []))
+        self.assertEqual(Question.objects.filter(faculty=self.faculty).count(), 250)
+        self.assertEqual(Question.objects.get(title="Question 7").test_cases.count(), 3)
+
+    def test_zip_bundle_with_test_data_files(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+            zf.writestr("big/1.in", "1 " * 100000)
+            zf.writestr("big/1.out", "100000")
+            zf.writestr("questions.jsonl", json.dumps(self.question(1, test_cases=[
+                {"input_file": "big/1.in", "output_file": "big/1.out"},
+                {"input": "1 1", "output": "2"},
+            ])) + "\n" + json.dumps(self.question(2, test_cases=[{"input_file": "missing.in", "output": ""}])))
+
+        report = import_questions(archive, self.faculty)
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["errors"][0]["line"], 2)
+        case = Question.objects.get(title="Question 1").test_cases.order_by("id").first()
+        self.assertEqual(len(case.input_data), 200000)
+
+    def test_dry_run_and_validation_errors(self):
+        bundle = self.jsonl([
+            self.question(1),
+            {"title": "No tests", "description": "x"},
+            self.question(3, difficulty="Impossible"),
+            # Repeated titles are accepted, as in the single-question upload
+            self.question(1),
+        ])
+        report = import_questions(bundle, self.faculty, dry_run=True)
+        self.assertEqual(report["created"], 2)
+        self.assertEqual([error["line"] for error in report["errors"]], [2, 3])
+        self.assertFalse(Question.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SubmissionFacultyTests(TestCase):
+    """Submission.faculty mirrors the question's faculty for the faculty-wide indexes"""
+
+    def test_faculty_follows_question(self):
+        first = Faculty.objects.create(user=User.objects.create(username="first"), department="CS")
+        second = Faculty.objects.create(user=User.objects.create(username="second"), department="CS")
+        question = Question.objects.create(faculty=first, title="Q", description="d")
+        student = Student.objects.create(user=User.objects.create(username="student"), faculty=first)
+
+        submission = Submission.objects.create(student=student, question=question, code="print(1)", language="python")
+        self.assertEqual(submission.faculty_id, first.id)
+
+        question.faculty = second
+        question.save()
+        submission.refresh_from_db()
+        self.assertEqual(submission.faculty_id, second.id)
+
+        # A copy that went stale behind the signal's back is corrected on the next save
+        Question.objects.filter(id=question.id).update(faculty=first)
+        submission = Submission.objects.get(id=submission.id)
+        submission.save()
+        submission.refresh_from_db()
+        self.assertEqual(submission.faculty_id, first.id)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class SearchTests(TestCase):
+    """Full-text search over questions and submitted code"""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("faculty", password="pass")
+        cls.faculty = Faculty.objects.create(user=user, department="CS")
+        other = Faculty.objects.create(user=User.objects.create(username="other"), department="CS")
+        cls.question = Question.objects.create(
+            faculty=cls.faculty, title="Binary search", description="Find the target in a sorted array"
+        )
+        Question.objects.create(faculty=cls.faculty, title="Sum", description="Add two numbers")
+        Question.objects.create(faculty=other, title="Binary trees", description="Sorted binary search tree")
+        student = Student.objects.create(user=User.objects.create(username="student"), faculty=cls.faculty)
+        for i in range(30):
+            code = f"def solve():\n    max_sum = {i}\n    return max_sum\n" if i % 5 else "print(input())\n"
+            Submission.objects.create(student=student, question=cls.question, code=code, language="python")
+
+    def setUp(self):
+        self.client.login(username="faculty", password="pass")
+
+    def search(self, **params):
+        return self.client.get("/faculty/search/", params)
+
+    def test_questions_are_stemmed_and_scoped_to_the_faculty(self):
+        results = self.search(q="sorting").json()["results"]
+        self.assertEqual([r["id"] for r in results], [self.question.id])
+
+        self.question.description = "Walk a linked list"
+        self.question.save()
+        self.assertEqual(self.search(q="sorting").json()["results"], [])
+
+    def test_code_search_pages_and_snippets(self):
+        first = self.search(q="max_sum", scope="submissions").json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertEqual(first["next_page"], 2)
+        # Equal matches come newest first
+        self.assertEqual(first["results"][0]["line"], "max_sum = 29")
+        self.assertEqual(first["results"][0]["line_number"], 2)
+
+        second = self.search(q="max_sum", scope="submissions", page=2).json()
+        self.assertEqual(len(second["results"]), 4)
+        self.assertIsNone(second["next_page"])
+        ids = [r["id"] for r in first["results"] + second["results"]]
+        self.assertEqual(len(set(ids)), 24)
+
+    def test_query_syntax_is_treated_as_text(self):
+        self.assertEqual(self.search(q='max_sum OR "NEAR(').status_code, 200)
+        self.assertEqual(self.search(q="  ").status_code, 400)
+        self.assertEqual(self.search(q="x", scope="everything").status_code, 400)
+
+
+ORIGINAL = """
+def longest_run(values):
+    best = current = 1
+    for i in range(1, len(values)):
+        if values[i] == values[i - 1] + 1:
+            current += 1
+            best = max(best, current)
+        else:
+            current = 1
+    return best
+
+print(longest_run(list(map(int, input().split()))))
+"""
+# Same program with renamed variables, new constants and a comment
+DISGUISED = """
+# my own solution
+def streak(nums):
+    top = now = 1
+    for k in range(1, len(nums)):
+        if nums[k] == nums[k - 1] + 1:
+            now += 1
+            top = max(top, now)
+        else:
+            now = 1
+    return top
+
+print(streak(list(map(int, input().split()))))
+"""
+DIFFERENT = """
+import sys
+data = sorted(set(int(x) for x in sys.stdin.read().split()))
+answer = 0
+seen = {}
+for x in data:
+    seen[x] = seen.get(x - 1, 0) + 1
+    answer = max(answer, seen[x])
+print(answer)
+"""
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SimilarityTests(TestCase):
+    """Near-duplicate clusters from the MinHash/LSH index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=cls.faculty, title="Runs", description="Longest run")
+        cls.students = [
+            Student.objects.create(user=User.objects.create(username=f"s{i}"), faculty=cls.faculty)
+            for i in range(4)
+        ]
+
+    def submit(self, student, code):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Submission.objects.create(student=student, question=self.question, code=code, language="python")
+
+    def test_identifiers_are_normalized(self):
+        self.assertEqual(tokenize("total = a + 1  # sum", "python"), ["V", "=", "V", "+", "N"])
+        self.assertEqual(tokenize("int n; // count\nprintf(\"%d\", n);", "c"),
+                         ["int", "V", ";", "printf", "(", "S", ",", "V", ")", ";"])
+
+    def test_renamed_and_copied_code_is_clustered(self):
+        original = self.submit(self.students[0], ORIGINAL)
+        disguised = self.submit(self.students[1], DISGUISED)
+        copied = self.submit(self.students[2], ORIGINAL)
+        self.submit(self.students[3], DIFFERENT)
+        # A student's own resubmission isn't a match with anyone
+        self.submit(self.students[3], DIFFERENT + "\n")
+
+        clusters = find_clusters(self.question.id)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["similarity"], 100)
+        self.assertEqual({m["id"] for m in clusters[0]["submissions"]}, {original.id, disguised.id, copied.id})
+
+        self.client.force_login(self.faculty.user)
+        page = self.client.get("/faculty/review-submissions/")
+        self.assertContains(page, "100% similar")
+
+
+    def test_every_pair_in_a_bucket_is_compared(self):
+        # The bucket's lowest fingerprint matches neither of the others, which match each other
+        submissions = [self.submit(student, code) for student, code in zip(self.students, [DIFFERENT, ORIGINAL, DISGUISED])]
+        SimilarityBucket.objects.all().delete()
+        SimilarityBucket.objects.bulk_create([
+            SimilarityBucket(question=self.question, bucket=1, fingerprint=fingerprint)
+            for fingerprint in CodeFingerprint.objects.all()
+        ])
+
+        clusters = find_clusters(self.question.id)
+        self.assertEqual([{m["id"] for m in cluster["submissions"]} for cluster in clusters],
+                         [{submissions[1].id, submissions[2].id}])
+
+    def test_migration_indexes_existing_submissions(self):
+        self.submit(self.students[0], ORIGINAL)
+        self.submit(self.students[1], DISGUISED)
+        expected = set(SimilarityBucket.objects.values_list("question_id", "bucket", "fingerprint__code_blob_id"))
+        SimilarityBucket.objects.all().delete()
+        CodeFingerprint.objects.all().delete()
+
+        backfill = importlib.import_module("core.migrations.0020_backfill_similarity_index")
+        backfill.backfill_similarity_index(django_apps, None)
+        self.assertEqual(
+            set(SimilarityBucket.objects.values_list("question_id", "bucket", "fingerprint__code_blob_id")), expected
+        )
+        self.assertEqual(len(find_clusters(self.question.id)), 1)
+
+FACTORIAL_TESTS = [{"input": "5", "expected": "120"}, {"input": "3", "expected": "6"}, {"input": "0", "expected": "1"}]
+
+
+class CodeAnalysisTests(SimpleTestCase):
+    """Structural logic analysis"""
+
+    def test_python_structure(self):
+        code = "def fact(n):\n    return 1 if n == 0 else n * fact(n - 1)\n\nprint(fact(int(input())))\n"
+        metrics = code_analysis.analyze(code, "python", FACTORIAL_TESTS)["metrics"]
+        self.assertEqual(metrics["recursion"], ["fact"])
+        self.assertTrue(metrics["reads_input"])
+
+        code = "n = int(input())\nfor i in range(n):\n    print(sum(i * j for j in range(n)))\n"
+        self.assertEqual(code_analysis.analyze(code, "python", FACTORIAL_TESTS)["metrics"]["loop_depth"], 2)
+
+    def test_c_family_structure(self):
+        code = """
+        long fact(int n) { if (n == 0) return 1; return n * fact(n - 1); }
+        int main() {
+            int n; scanf("%d", &n);
+            for (int i = 0; i < n; i++)
+                for (int j = 0; j < n; j++) { /* while (x) */ }
+            do { n--; } while (n > 0);
+            printf("%ld", fact(n));
+        }"""
+        metrics = code_analysis.analyze(code, "c", FACTORIAL_TESTS)["metrics"]
+        self.assertEqual((metrics["loops"], metrics["loop_depth"]), (3, 2))
+        self.assertEqual(metrics["recursion"], ["fact"])
+        self.assertEqual(metrics["functions"], 2)
+
+    def test_printed_answers_without_reading_input(self):
+        code = "print(120)\n"
+        analysis = code_analysis.analyze(code, "python", FACTORIAL_TESTS)
+        self.assertEqual(analysis["concerns"], ["hard_coded"])
+        self.assertLessEqual(analysis["logic_score"], 3)
+        self.assertGreaterEqual(analysis["confidence"], code_analysis.CONFIDENT)
+
+        code = 'public class Main { public static void main(String[] a) { System.out.println("120"); } }'
+        self.assertEqual(code_analysis.analyze(code, "java", FACTORIAL_TESTS)["concerns"], ["hard_coded"])
+
+    def test_printed_answers_alone_leave_the_verdict_to_the_model(self):
+        tests = [{"input": "5", "expected": "120"}, {"input": "6", "expected": "720"}]
+        code = "n = int(input())\nprint(120)\nprint(720)\n"
+        analysis = code_analysis.analyze(code, "python", tests)
+        self.assertEqual(analysis["concerns"], ["hard_coded"])
+        self.assertLess(analysis["confidence"], code_analysis.CONFIDENT)
+
+        # A lookup table of answers looks like base cases, so it isn't flagged on literals alone
+        code = "n = input()\nif n == '5':\n    print(120)\nelif n == '3':\n    print(6)\nelse:\n    print(1)\n"
+        self.assertEqual(code_analysis.analyze(code, "python", FACTORIAL_TESTS)["concerns"], [])
+
+    def test_correct_programs_are_not_hard_coded(self):
+        fib_tests = [{"input": "0", "expected": "0"}, {"input": "1", "expected": "1"}, {"input": "10", "expected": "55"}]
+        parity_tests = [{"input": "4", "expected": "Even"}, {"input": "7", "expected": "Odd"}]
+        programs = [
+            ("python", "def fib(n):\n    if n == 0:\n        return 0\n    if n == 1:\n        return 1\n"
+                       "    return fib(n - 1) + fib(n - 2)\n\nprint(fib(int(input())))\n", fib_tests),
+            ("c", """
+            #include <stdio.h>
+            int main() {
+                int n; scanf("%d", &n);
+                if (n == 0) { printf("0"); return 0; }
+                if (n == 1) printf("1");
+                else {
+                    long a = 0, b = 1;
+                    for (int i = 2; i <= n; i++) { long t = a + b; a = b; b = t; }
+                    printf("%ld", b);
+                }
+                return 0;
+            }""", fib_tests),
+            ("python", 'n = int(input())\nprint("Even" if n % 2 == 0 else "Odd")\n', parity_tests),
+            ("cpp", '#include <iostream>\nint main() { int n; std::cin >> n; std::cout << (n % 2 ? "Odd" : "Even"); }',
+             parity_tests),
+        ]
+        for language, code, tests in programs:
+            # All the tests (submission) and each one on its own (the Run button)
+            for cases in [tests] + [[case] for case in tests]:
+                with self.subTest(code=code[:30], cases=cases):
+                    self.assertEqual(code_analysis.analyze(code, language, cases)["concerns"], [])
+
+    @mock.patch.object(local_ai_evaluator, "HUGGINGFACE_API_KEY", "key")
+    @mock.patch.object(local_ai_evaluator.requests, "post")
+    def test_remote_call_skipped_only_when_confident(self, post):
+        post.return_value.status_code = 503
+        local_ai_evaluator.analyze_code_approach("print(120)", "Python", "", FACTORIAL_TESTS)
+        post.assert_not_called()
+
+        code = "n = int(input())\nresult = 1\nfor i in range(2, n + 1):\n    result *= i\nprint(result)\n"
+        analysis = local_ai_evaluator.analyze_code_approach(code, "Python", "", FACTORIAL_TESTS)
+        post.assert_called_once()
+        self.assertEqual(analysis["status"], "local_heuristic")  # fallback after the 503
+
+
+class LanguageDetectionTests(SimpleTestCase):
+    """Single-pass language detection against the labeled corpus"""
+
+    def test_corpus(self):
+        path = os.path.join(os.path.dirname(__file__), "testdata", "language_corpus.jsonl")
+        with open(path) as f:
+            corpus = [json.loads(line) for line in f]
+        for sample in corpus:
+            with self.subTest(code=sample["code"][:40]):
+                detection = language_detection.detect(sample["code"])
+                self.assertEqual(detection.language, sample["language"])
+                if "class_name" in sample:
+                    self.assertEqual(detection.class_name, sample["class_name"])
+
+    def test_signals_inside_words_are_ignored(self):
+        self.assertIsNone(language_detection.detect("x = reprint(y)\n").language)
+
+    def test_java_layout_uses_the_detected_class(self):
+        code = "class Helper {}\npublic class Solver { public static void main(String[] a) {} }"
+        layout = runners.RUNNERS["java"].layout(code, "/tmp/build")
+        self.assertEqual(layout["run_cmd"], ["java", "-cp", "/tmp/build", "Solver"])
+
+
+class StreamingAnalysisTests(SimpleTestCase):
+    """Streamed analysis against the local stand-in server"""
+
+    def setUp(self):
+        self.server = StandinServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(local_ai_evaluator, "HUGGINGFACE_API_URL", self.server.url)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_run_mode_cancels_after_the_score(self):
+        analysis = local_ai_evaluator.stream_analysis(
+            "print(120)", "python", FACTORIAL_TESTS, local_ai_evaluator.STOP_AFTER_SCORE
+        )
+        self.assertEqual(analysis["logic_score"], 8)
+        self.assertNotIn("feedback_id", analysis)
+
+        stream, = self.server.wait_for_streams(1)
+        self.assertTrue(stream["disconnected"])
+        self.assertLess(stream["sent"], stream["total"])
+
+    def test_submit_mode_finishes_the_feedback_in_background(self):
+        analysis = local_ai_evaluator.stream_analysis("print(120)", "python", FACTORIAL_TESTS)
+        self.assertEqual(analysis["logic_score"], 8)
+        self.assertLess(len(analysis["feedback"]), len(FEEDBACK))
+
+        finished = threading.Event()
+        completed = {}
+        local_ai_evaluator.on_feedback_ready(
+            analysis["feedback_id"], lambda full: (completed.update(full), finished.set())
+        )
+        self.assertTrue(finished.wait(5))
+        self.assertEqual(completed["feedback"], FEEDBACK)
+        self.assertEqual(completed["logic_score"], 8)
+        self.assertFalse(self.server.wait_for_streams(1)[0]["disconnected"])
+
+
+    def test_async_clients_are_closed(self):
+        clients = []
+
+        def http_client():
+            clients.append(httpx.AsyncClient(timeout=30))
+            return clients[-1]
+
+        async def scenario():
+            stopped = await async_evaluator.stream_analysis(
+                "print(120)", "python", FACTORIAL_TESTS, local_ai_evaluator.STOP_AFTER_SCORE
+            )
+            finished = await async_evaluator.stream_analysis("print(120)", "python", FACTORIAL_TESTS)
+            await asyncio.gather(*async_evaluator._feedback_tasks)
+            return stopped, finished
+
+        with mock.patch.object(async_evaluator, "http_client", http_client):
+            stopped, finished = asyncio.run(scenario())
+        self.assertEqual((stopped["logic_score"], finished["logic_score"]), (8, 8))
+        # Closed once the score was read, and once the background feedback finished
+        self.assertEqual([client.is_closed for client in clients], [True, True])
+
+
+class RunnerRegistryTests(SimpleTestCase):
+    """Language runners and toolchain probing"""
+
+    def test_language_names(self):
+        self.assertEqual(runners.normalize("C++"), "cpp")
+        self.assertEqual(runners.normalize("JavaScript"), "javascript")
+        self.assertEqual(runners.normalize("golang"), "go")
+        self.assertIsNone(runners.normalize("Brainfuck"))
+
+    @mock.patch.object(local_ai_evaluator.tempfile, "TemporaryDirectory")
+    def test_unavailable_languages_skip_the_filesystem(self, temporary_directory):
+        result = local_ai_evaluator.run_code("+[]", "Brainfuck", "")
+        self.assertTrue(result["error"].startswith("Unsupported language: Brainfuck"))
+
+        versions = dict(runners.toolchain_versions(), go=None)
+        with mock.patch.object(runners, "_versions", versions):
+            report = local_ai_evaluator.evaluate_submission("package main\nfunc main() {}\n", "Go", FACTORIAL_TESTS)
+        self.assertEqual(report["results"][0]["error"], "Go compiler not installed on this system. "
+                                                         "Please contact your administrator or use Python for now.")
+        temporary_directory.assert_not_called()
+
+    @skipUnless(shutil.which("node"), "node is not installed")
+    def test_async_runs_wait_for_the_probe_off_the_event_loop(self):
+        probe = runners.toolchain_versions
+
+        def slow_probe():
+            time.sleep(0.2)
+            return probe()
+
+        async def scenario():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticker = asyncio.ensure_future(tick())
+            result = await async_evaluator.run_code("print(1)", "python", "")
+            ticker.cancel()
+            return result, ticks
+
+        with mock.patch.object(runners, "toolchain_versions", slow_probe):
+            result, ticks = asyncio.run(scenario())
+        self.assertEqual(result["output"], "1")
+        self.assertGreater(ticks, 10)
+
+    def test_javascript_runner(self):
+        code = "const n = Number(require('fs').readFileSync(0, 'utf8'));\nconsole.log(n * 2);\n"
+        self.assertEqual(local_ai_evaluator.run_code(code, "JavaScript", "21")["output"], "42")
+
+
+# Accepts floats within 1e-6; otherwise the share of correct values as partial credit
+TOLERANCE_CHECKER = """
+import sys
+_, expected, output = (open(path).read().split() for path in sys.argv[1:4])
+close = sum(1 for a, b in zip(expected, output) if abs(float(a) - float(b)) < 1e-6)
+if close == len(expected) == len(output):
+    sys.exit(0)
+print(close / len(expected), "values differ")
+sys.exit(1)
+"""
+
+
+class CheckerTests(SimpleTestCase):
+    """Custom checkers judging outputs instead of an exact match"""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, True)
+        for patcher in (
+            mock.patch.object(checkers, "CHECKER_CACHE_DIR", cache_dir),
+            mock.patch.object(checkers, "_builds", {}),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.checker = checkers.Checker("Python", TOLERANCE_CHECKER)
+        self.tests = [{"input": "3", "expected": "0.333333333 0.5"}]
+
+    def evaluate(self, output):
+        code = f"input()\nprint({output!r})\n"
+        return local_ai_evaluator.evaluate_submission(code, "Python", self.tests, checker=self.checker)
+
+    def test_verdict_and_partial_score(self):
+        result = self.evaluate("0.3333333334 0.5")["results"][0]
+        self.assertEqual((result["verdict"], result["is_correct"], result["score"]), ("passed", True, 1.0))
+
+        report = self.evaluate("0.3333333334 0.7")
+        result = report["results"][0]
+        self.assertEqual((result["verdict"], result["is_correct"], result["score"]), ("partial", False, 0.5))
+        self.assertEqual(result["checker_message"], "values differ")
+        self.assertEqual(report["test_case_score"], 50.0)
+
+        row = test_result_row(None, 0, self.tests[0], result)
+        self.assertEqual((row.status, row.score), (TestResult.PARTIAL, 0.5))
+
+    def test_compiled_once(self):
+        with mock.patch.object(checkers, "prepare_program", wraps=checkers.prepare_program) as prepare:
+            self.evaluate("0.3333333334 0.5")
+            self.evaluate("1 2")
+            checkers._builds.clear()  # a new worker process finds the build on disk
+            self.evaluate("0.3333333334 0.5")
+        self.assertEqual(prepare.call_count, 1)
+
+    def test_transient_build_failures_are_retried(self):
+        timed_out = local_ai_evaluator.compile_timeout("Python")
+        # Neither kept in this process nor written to disk: each build compiles again
+        with mock.patch.object(checkers, "prepare_program", side_effect=[timed_out, timed_out]):
+            with self.assertRaises(checkers.CheckerError):
+                self.checker.build()
+            with self.assertRaises(checkers.CheckerError):
+                self.checker.build()
+        result = self.evaluate("0.3333333334 0.5")["results"][0]
+        self.assertEqual(result["verdict"], "passed")
+
+    def test_runs_through_the_launcher(self):
+        tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tempdir, True)
+
+        def launched(argv, stdin=None, timeout=None):
+            texts = []
+            for path in argv[-3:]:
+                self.assertEqual(os.path.dirname(path), tempdir)
+                with open(path) as f:
+                    texts.append(f.read())
+            self.assertEqual(texts, ["3", "1 2", "1 2.0"])
+            return 1, "0.5 close\n", ""
+
+        with mock.patch.object(launcher, "LAUNCHER_SOCKET", "/tmp/launcher.sock"), \
+                mock.patch.object(launcher, "run", side_effect=launched) as run:
+            self.assertEqual(checkers.run_checker(["check"], "3", "1 2", "1 2.0", tempdir), (1, "0.5 close\n"))
+        self.assertEqual(run.call_args.kwargs["timeout"], checkers.CHECKER_TIMEOUT)
+
+    def test_broken_checker(self):
+        self.checker = checkers.Checker("Python", "import sys\nsys.exit(3)\n")
+        result = self.evaluate("0.3333333334 0.5")["results"][0]
+        self.assertEqual((result["verdict"], result["is_correct"]), ("checker_error", False))
+        row = test_result_row(None, 0, self.tests[0], result)
+        self.assertEqual((row.status, row.score), (TestResult.CHECKER_ERROR, 0.0))
+
+
+class SchedulerTests(SimpleTestCase):
+    """Evaluation slots handed out by priority class, then round-robin per owner"""
+
+    def setUp(self):
+        self.scheduler = scheduler.EvaluationScheduler(workers=1)
+
+    async def run_in_order(self, jobs):
+        """Names of `jobs` ((priority, owner, name)) in the order they got the only slot"""
+        holder = await self.scheduler.async_acquire(scheduler.SUBMIT, "holder")
+        order = []
+
+        async def job(priority, owner, name):
+            async with self.scheduler.async_slot(priority, owner):
+                order.append(name)
+
+        tasks = [asyncio.ensure_future(job(*args)) for args in jobs]
+        await asyncio.sleep(0)  # every job is queued behind the holder
+        self.scheduler.release(holder)
+        await asyncio.gather(*tasks)
+        return order
+
+    def test_priority_then_round_robin(self):
+        order = asyncio.run(self.run_in_order([
+            (scheduler.BATCH, "faculty", "batch"),
+            (scheduler.SUBMIT, "a", "a1"),
+            (scheduler.SUBMIT, "a", "a2"),
+            (scheduler.SUBMIT, "a", "a3"),
+            (scheduler.SUBMIT, "b", "b1"),
+            (scheduler.INTERACTIVE, "c", "run"),
+        ]))
+        self.assertEqual(order, ["run", "a1", "b1", "a2", "a3", "batch"])
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["running"], 0)
+        self.assertEqual(stats["classes"]["submit"]["completed"], 5)
+
+    def test_cancelled_waiters_leave_the_queue(self):
+        async def scenario():
+            holder = await self.scheduler.async_acquire(scheduler.SUBMIT, "holder")
+            waiting = asyncio.ensure_future(self.scheduler.async_acquire(scheduler.SUBMIT, "a"))
+            await asyncio.sleep(0)
+            self.assertEqual(self.scheduler.stats()["classes"]["submit"]["queued"], 1)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+            self.assertEqual(self.scheduler.stats()["classes"]["submit"]["queued"], 0)
+
+            # Granted, but cancelled before it woke up: the slot is handed back
+            granted = asyncio.ensure_future(self.scheduler.async_acquire(scheduler.SUBMIT, "b"))
+            await asyncio.sleep(0)
+            self.scheduler.release(holder)
+            granted.cancel()
+            await asyncio.gather(granted, return_exceptions=True)
+
+        asyncio.run(scenario())
+        self.assertEqual(self.scheduler.stats()["running"], 0)
+
+    def test_default_workers_split_the_cpus(self):
+        with mock.patch("os.cpu_count", return_value=8):
+            with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "3"}):
+                self.assertEqual(scheduler.default_workers(), 2)
+            with mock.patch.dict(os.environ, {"WEB_CONCURRENCY": "16"}):
+                self.assertEqual(scheduler.default_workers(), 1)
+
+
+DOUBLING_TESTS = [("1\n", "2"), ("2\n", "4"), ("3\n", "6")]
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class QuickCheckTests(TestCase):
+    """The Run button's fail-fast check, likeliest failures first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=faculty, title="Double", description="Print 2n")
+        cls.cases = [cls.question.test_cases.create(input_data=i, expected_output=o) for i, o in DOUBLING_TESTS]
+        Student.objects.create(user=User.objects.create_user("student", password="pass"), faculty=faculty)
+
+    def setUp(self):
+        self.client.login(username="student", password="pass")
+
+    def quick_check(self, code):
+        return self.client.post(
+            f"/student/quick-check/{self.question.id}/", {"code": code, "language": "python"}
+        ).json()
+
+    def test_stops_at_the_likeliest_failure(self):
+        self.cases[2].run_count = self.cases[2].failure_count = 5
+        self.cases[2].save()
+        report = self.quick_check("n = int(input())\nprint(n * 2 if n < 2 else 0)\n")
+        # Tests 2 and 3 fail; 3 has failed most often so it runs first
+        self.assertEqual((report["status"], report["tests_run"]), ("failed", 1))
+        self.assertEqual(report["failed_case"]["number"], 3)
+        self.assertEqual(report["failed_case"]["output"], "0")
+
+        report = self.quick_check("print(int(input()) * 2)\n")
+        self.assertEqual((report["status"], report["passed"], report["tests_run"]), ("passed", True, 3))
+
+    @skipUnless(shutil.which("gcc"), "gcc is not installed")
+    def test_compile_errors_are_reported_without_test_cases(self):
+        empty = Question.objects.create(faculty=self.question.faculty, title="Empty", description="No tests yet")
+        code = "#include <stdio.h>\nint main() { printf(\"%d\", 1) return 0; }\n"
+        for question in (empty, self.question):
+            report = self.client.post(
+                f"/student/quick-check/{question.id}/", {"code": code, "language": "c"}
+            ).json()
+            self.assertEqual((report["status"], report["passed"], report["tests_run"]), ("compile_error", False, 0))
+            self.assertIn("Compilation Error", report["error"])
+        self.assertEqual(
+            local_ai_evaluator.quick_check(code, "c", [])["status"], "compile_error"
+        )
+
+    def test_graded_submissions_update_the_failure_history(self):
+        self.client.post(
+            f"/student/submit/{self.question.id}/",
+            {"code": "n = int(input())\nprint(n * 2 if n < 3 else 0)\n", "language": "python"},
+            content_type="application/json"
+        )
+        history = [(tc.run_count, tc.failure_count) for tc in self.question.test_cases.order_by("id")]
+        self.assertEqual(history, [(1, 0), (1, 0), (1, 1)])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class AsyncEvaluationViewTests(TestCase):
+    """Run and submit on the async evaluator"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=faculty, title="Double", description="Print 2n")
+        for test_input, expected in DOUBLING_TESTS:
+            cls.question.test_cases.create(input_data=test_input, expected_output=expected)
+        cls.user = User.objects.create(username="student")
+        Student.objects.create(user=cls.user, faculty=faculty)
+
+    async def test_submit_async(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            f"/student/submit/{self.question.id}/async/",
+            {"code": "n = int(input())\nprint(n * 2 if n < 3 else 0)\n", "language": "python"},
+            content_type="application/json"
+        )
+        results = response.json()["result"]["results"]
+        self.assertEqual([result["verdict"] for result in results], ["passed", "passed", "wrong_answer"])
+
+        submission = await Submission.objects.aget(question=self.question)
+        self.assertEqual((submission.passed_count, submission.total_count), (2, 3))
+        self.assertEqual(await submission.test_results.filter(status=TestResult.PASSED).acount(), 2)
+
+    async def test_submit_stream_events(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            f"/student/submit/{self.question.id}/stream/",
+            {"code": "print(int(input()) * 2)\n", "language": "python"},
+            content_type="application/json"
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        events = [json.loads(block.split("\ndata: ", 1)[1]) for block in body.strip().split("\n\n")]
+
+        self.assertEqual(
+            [event["event"] for event in events], ["compile", "test", "test", "test", "analysis", "done"]
+        )
+        self.assertEqual([event["index"] for event in events if event["event"] == "test"], [0, 1, 2])
+        self.assertEqual(events[-1]["report"]["test_case_score"], 100.0)
+        self.assertEqual((await Submission.objects.aget(question=self.question)).passed_count, 3)
+
+    async def test_submission_saved_when_the_client_disconnects(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            f"/student/submit/{self.question.id}/stream/",
+            {"code": "print(int(input()) * 2)\n", "language": "python"},
+            content_type="application/json"
+        )
+        stream = aiter(response.streaming_content)
+        self.assertIn(b"event: compile", await anext(stream))
+        await stream.aclose()  # the tab was closed
+
+        await asyncio.gather(*views._grading_tasks)
+        self.assertEqual((await Submission.objects.aget(question=self.question)).passed_count, 3)
+
+    async def test_run_async(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.post(
+            "/student/run_code/async/",
+            {"code": "print(int(input()) * 2)\n", "language": "python", "input": "21\n", "expected": "42"}
+        )
+        self.assertEqual((response.json()["output"], response.json()["is_correct"]), ("42", True))
+        self.assertFalse(await Submission.objects.aexists())
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class KeysetPaginationTests(TestCase):
+    """Submission pages seek past a (submitted_at, id) cursor"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        question = Question.objects.create(faculty=faculty, title="Q", description="d")
+        student = Student.objects.create(user=User.objects.create_user("student", password="pass"), faculty=faculty)
+        for i in range(11):
+            Submission.objects.create(student=student, question=question, code=f"print({i})", language="python")
+        # Several submissions in the same instant: the id breaks the tie
+        same_time = Submission.objects.order_by("id").first().submitted_at
+        Submission.objects.filter(id__in=Submission.objects.order_by("id").values("id")[:5]).update(submitted_at=same_time)
+
+    def test_pages_cover_every_submission_once(self):
+        expected = list(Submission.objects.order_by("-submitted_at", "-id").values_list("id", flat=True))
+        seen, cursor = [], None
+        while True:
+            rows, cursor = keyset_page(Submission.objects.all(), cursor, page_size=4)
+            seen += [row.id for row in rows]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_cursor_round_trip(self):
+        submission = Submission.objects.order_by("id").first()
+        self.assertEqual(decode_cursor(encode_cursor(submission)), (submission.submitted_at, submission.id))
+        self.assertIsNone(decode_cursor("not a cursor"))
+        # A malformed cursor starts from the first page
+        self.assertEqual(keyset_page(Submission.objects.all(), "bogus", page_size=4)[0],
+                         keyset_page(Submission.objects.all(), None, page_size=4)[0])
+
+    def test_student_history_pages(self):
+        self.client.login(username="student", password="pass")
+        with mock.patch("core.views.HISTORY_PAGE_SIZE", 8):
+            first = self.client.get("/student/submissions/").json()
+            second = self.client.get("/student/submissions/", {"cursor": first["next_cursor"]}).json()
+        self.assertEqual((len(first["submissions"]), len(second["submissions"])), (8, 3))
+        self.assertIsNone(second["next_cursor"])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class PerformanceCsvTests(TestCase):
+    """The streamed CSV export is scoped to the faculty and takes the report filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create_user("faculty", password="pass"), department="CS")
+        other = Faculty.objects.create(user=User.objects.create(username="other"), department="CS")
+        group = Group.objects.create(name="A", faculty=faculty)
+        cls.first = Question.objects.create(faculty=faculty, title="First", description="d")
+        second = Question.objects.create(faculty=faculty, title="Second", description="d")
+        elsewhere = Question.objects.create(faculty=other, title="Elsewhere", description="d")
+        student = Student.objects.create(user=User.objects.create(username="student"), faculty=faculty, group=group)
+        for question, score in ((cls.first, 50), (cls.first, 100), (second, 80), (elsewhere, 10)):
+            Submission.objects.create(student=student, question=question, code="print(1)", language="python", score=score)
+
+    def export(self, **filters):
+        self.client.login(username="faculty", password="pass")
+        response = self.client.get("/faculty/performance-reports/csv/", filters)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    def test_export(self):
+        rows = self.export()
+        self.assertEqual(rows[0][:3], ["Student", "Group", "Question"])
+        # Newest first, without the other faculty's submission
+        self.assertEqual([(row[2], row[4]) for row in rows[1:]], [("Second", "80.0"), ("First", "100.0"), ("First", "50.0")])
+        self.assertEqual(rows[1][1], "A")
+
+    def test_filters(self):
+        rows = self.export(question=self.first.id)
+        self.assertEqual([row[2] for row in rows[1:]], ["First", "First"])
+        self.assertEqual(len(self.export(date_from="2000-01-01", date_to="2000-01-02")), 1)  # header only
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class TestResultStorageTests(TestCase):
+    """A graded submission keeps a summary row plus one TestResult per test case"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(user=User.objects.create_user("faculty", password="pass"), department="CS")
+        cls.question = Question.objects.create(faculty=cls.faculty, title="Double", description="Print 2n")
+        cls.cases = [
+            {"id": cls.question.test_cases.create(input_data=i, expected_output=o).id, "input": i, "expected": o}
+            for i, o in DOUBLING_TESTS
+        ]
+        cls.student = Student.objects.create(user=User.objects.create(username="student"), faculty=cls.faculty)
+
+    def test_results_and_details(self):
+        long_output = "x" * (TestResult.TEXT_LIMIT + 10)
+        report = {
+            "score": 40, "test_case_score": 33.3, "logic_score": 6,
+            "results": [
+                {"is_correct": True, "verdict": "passed", "output": "2", "error": "", "time_ms": 3,
+                 "ai_feedback": "Looks right"},
+                {"is_correct": False, "verdict": "wrong_answer", "output": long_output, "error": "", "time_ms": 4},
+                {"is_correct": False, "verdict": "timeout", "output": "", "error": "Timeout Error"},
+            ]
+        }
+        submission = store_submission(self.student, self.question, "print(1)", "python", self.cases, report)
+        self.assertEqual((submission.passed_count, submission.total_count, submission.feedback), (1, 3, "Looks right"))
+        rows = list(submission.test_results.all())
+        self.assertEqual([row.status for row in rows], [TestResult.PASSED, TestResult.WRONG_ANSWER, TestResult.TIMEOUT])
+        self.assertEqual((len(rows[1].output), rows[1].truncated), (TestResult.TEXT_LIMIT, True))
+        self.assertTrue(rows[1].output.endswith(TestResult.TRUNCATION_MARKER))
+        self.assertEqual(rows[0].output, "2")
+
+        self.client.login(username="faculty", password="pass")
+        details = self.client.get(f"/faculty/submissions/{submission.id}/details/").json()
+        self.assertEqual(details["code"], "print(1)")
+        first, second, third = details["results"]
+        self.assertEqual((first["input"], first["expected"], first["ai_feedback"]), ("1\n", "2", "Looks right"))
+        self.assertEqual((second["status"], second["truncated"], second["ai_feedback"]), ("Wrong answer", True, ""))
+        self.assertEqual(third["status"], "Timeout")
+        self.assertFalse(any(result["case_changed"] for result in details["results"]))
+
+        # Results keep the digest of the case they were graded against
+        self.question.test_cases.filter(id=self.cases[0]["id"]).update(expected_output="3")
+        self.question.test_cases.filter(id=self.cases[2]["id"]).delete()
+        details = self.client.get(f"/faculty/submissions/{submission.id}/details/").json()
+        self.assertEqual([result["case_changed"] for result in details["results"]], [True, False, True])
+
+        Faculty.objects.create(user=User.objects.create_user("other", password="pass"), department="CS")
+        self.client.login(username="other", password="pass")
+        self.assertEqual(self.client.get(f"/faculty/submissions/{submission.id}/details/").status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CodeBlobTests(TestCase):
+    """Submission code is stored compressed, once per distinct source"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=faculty, title="Q", description="d")
+        cls.student = Student.objects.create(user=User.objects.create(username="student"), faculty=faculty)
+
+    def submit(self, code):
+        return Submission.objects.create(student=self.student, question=self.question, code=code, language="python")
+
+    def test_compressed_and_deduplicated(self):
+        code = "for i in range(10):\n    print(i * i)\n" * 50
+        first, second = self.submit(code), self.submit(code)
+        other = self.submit("print('something else')\n")
+
+        self.assertEqual(first.code_blob_id, second.code_blob_id)
+        self.assertNotEqual(first.code_blob_id, other.code_blob_id)
+        self.assertEqual(CodeBlob.objects.count(), 2)
+
+        blob = CodeBlob.objects.get(id=first.code_blob_id)
+        self.assertEqual((blob.digest, blob.size), (CodeBlob.digest_for(code), len(code)))
+        self.assertLess(len(blob.data), len(code) / 10)
+        self.assertEqual(Submission.objects.get(id=second.id).code, code)
+
+    def test_changing_code_stores_a_new_blob(self):
+        submission = self.submit("print(1)")
+        submission.code = "print(2)"
+        submission.save(update_fields=["language"])  # code_blob is saved as well
+        self.assertEqual(Submission.objects.get(id=submission.id).code, "print(2)")
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class BestLatestSubmissionTests(TestCase):
+    """The student dashboard shows each question's best and latest attempt from one stats row"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=faculty, title="Q", description="d")
+        cls.student = Student.objects.create(user=User.objects.create_user("student", password="pass"), faculty=faculty)
+
+    def submit(self, score):
+        return Submission.objects.create(
+            student=self.student, question=self.question, code=f"print({score})", language="python", score=score
+        )
+
+    def row(self):
+        return StudentQuestionStats.objects.get(student=self.student, question=self.question)
+
+    def test_best_and_latest(self):
+        self.submit(60)
+        best = self.submit(90)
+        tied = self.submit(90)
+        latest = self.submit(30)
+        row = self.row()
+        # Ties go to the earliest of the top scores
+        self.assertEqual((row.best_submission_id, row.latest_submission_id, row.attempts), (best.id, latest.id, 4))
+
+        best.delete()
+        self.assertEqual(self.row().best_submission_id, tied.id)
+
+        latest.score = 100  # rejudged
+        latest.save()
+        self.assertEqual(self.row().best_submission_id, latest.id)
+
+    def test_dashboard(self):
+        self.submit(90)
+        self.submit(60)
+        self.client.login(username="student", password="pass")
+        response = self.client.get("/student/dashboard/")
+        [row] = response.context["progress"]
+        self.assertEqual((row.best_submission.score, row.latest_submission.score), (90, 60))
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class QuestionCacheTests(TestCase):
+    """Versioned cache namespaces and the ETag-validated question details"""
+
+    @classmethod
+    def setUpTestData(cls):
+        faculty = Faculty.objects.create(user=User.objects.create(username="faculty"), department="CS")
+        cls.question = Question.objects.create(faculty=faculty, title="Double", description="Print 2n")
+        Student.objects.create(user=User.objects.create_user("student", password="pass"), faculty=faculty)
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.client.login(username="student", password="pass")
+
+    def test_invalidating_bumps_the_version(self):
+        build = mock.Mock(side_effect=["first", "second"])
+        value, version = cached("test:namespace", build)
+        self.assertEqual(cached("test:namespace", build), (value, version))
+        invalidate("test:namespace")
+        value, new_version = cached("test:namespace", build)
+        self.assertEqual(value, "second")
+        self.assertGreater(new_version, version)
+        self.assertEqual(build.call_count, 2)
+
+    def test_etag_and_invalidation(self):
+        url = f"/student/question/{self.question.id}/"
+        response = self.client.get(url)
+        etag = response["ETag"]
+        self.assertEqual(response.json()["example_input"], "")
+
+        # Served from the cache: session, user and the student check only
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.question.test_cases.create(input_data="2\n", expected_output="4")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()["example_input"]), (200, "2\n"))
+        etag = response["ETag"]
+
+        self.question.title = "Triple"
+        self.question.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()["title"]), (200, "Triple"))
+
+
+ENROLLMENT_CSV = """username,password,email,group
+alice,Correct-Horse-1,alice@example.com,A
+bob,Correct-Horse-2,,
+alice,Correct-Horse-3,,
+bad name!,Correct-Horse-4,,
+carol,123,,
+dave,Correct-Horse-5,not-an-email,
+erin,Correct-Horse-6,,Nowhere
+taken,Correct-Horse-7,,
+"""
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PASSWORD_HASHERS=FAST_HASHERS)
+class EnrollmentTests(TestCase):
+    """Bulk enrollment from CSV: row validation, then one bulk insert"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.faculty = Faculty.objects.create(user=User.objects.create_user("faculty", password="pass"), department="CS")
+        cls.group = Group.objects.create(name="A", faculty=cls.faculty)
+        cls.default_group = Group.objects.create(name="B", faculty=cls.faculty)
+        User.objects.create(username="taken")
+
+    def upload(self, text, **data):
+        self.client.login(username="faculty", password="pass")
+        upload = io.BytesIO(text.encode())
+        upload.name = "students.csv"
+        return self.client.post("/faculty/students/import/", {"csv": upload, **data}).json()
+
+    def test_validation_and_bulk_create(self):
+        report = self.upload(ENROLLMENT_CSV, group_id=self.default_group.id)
+        self.assertEqual(report["created"], 2)
+        problems = {error["row"]: " ".join(error["errors"]) for error in report["errors"]}
+        self.assertEqual(sorted(problems), [4, 5, 6, 7, 8, 9])
+        self.assertIn("duplicate username", problems[4])
+        self.assertIn("Enter a valid username", problems[5])
+        self.assertIn("too short", problems[6])
+        self.assertIn("invalid email", problems[7])
+        self.assertIn("unknown group", problems[8])
+        self.assertIn("already exists", problems[9])
+
+        alice = Student.objects.select_related("user").get(user__username="alice")
+        self.assertEqual((alice.group, alice.faculty, alice.user.email), (self.group, self.faculty, "alice@example.com"))
+        self.assertTrue(alice.user.check_password("Correct-Horse-1"))
+        self.assertEqual(Student.objects.get(user__username="bob").group, self.default_group)
+
+    def test_dry_run_and_missing_columns(self):
+        report = self.upload(ENROLLMENT_CSV, dry_run="1")
+        self.assertEqual((report["created"], report["dry_run"]), (2, True))
+        self.assertFalse(User.objects.filter(username="alice").exists())
+        self.assertEqual(self.upload("username,email\nalice,a@example.com\n")["error"], "Missing required column(s): password")
+
+    def test_usernames_taken_while_hashing(self):
+        hash_passwords = enrollment.hash_passwords
+
+        def register_bob_first(passwords):
+            User.objects.create(username="bob")
+            return hash_passwords(passwords)
+
+        with mock.patch.object(enrollment, "hash_passwords", side_effect=register_bob_first):
+            report = self.upload("username,password\nalice,Correct-Horse-1\nbob,Correct-Horse-2\n")
+        self.assertEqual(report["created"], 1)
+        self.assertEqual(report["errors"], [{"row": 3, "username": "bob", "errors": ["username already exists"]}])
+        self.assertTrue(Student.objects.filter(user__username="alice").exists())
+        self.assertFalse(Student.objects.filter(user__username="bob").exists())
+
+        with mock.patch.object(enrollment, "create_students", side_effect=IntegrityError):
+            self.client.login(username="faculty", password="pass")
+            upload = io.BytesIO(b"username,password\nerin,Correct-Horse-6\n")
+            upload.name = "students.csv"
+            response = self.client.post("/faculty/students/import/", {"csv": upload})
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(User.objects.filter(username="erin").exists())
+
+    def test_parallel_hashing(self):
+        # The pool's workers read the hashers from the settings module, not this test's overrides
+        with mock.patch.object(enrollment, "PARALLEL_HASH_THRESHOLD", 2):
+            hashes = enrollment.hash_passwords(["first-secret", "second-secret"], workers=2)
+        self.assertIs(enrollment.hash_pool(), enrollment.hash_pool())
+        hasher = PBKDF2PasswordHasher()
+        self.assertTrue(all(map(hasher.verify, ["first-secret", "second-secret"], hashes)))
+
+
+class RetryOnLockTests(SimpleTestCase):
+    """Writes retried with exponential backoff while SQLite reports the database locked"""
+
+    def setUp(self):
+        for patcher in (mock.patch("time.sleep"), mock.patch("random.uniform", return_value=1.0)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_backoff_until_it_succeeds(self):
+        write = mock.Mock(side_effect=[OperationalError("database is locked")] * 3 + ["saved"])
+        self.assertEqual(db.retry_on_lock(write)(), "saved")
+        self.assertEqual(write.call_count, 4)
+        self.assertEqual([c.args[0] for c in time.sleep.call_args_list], [0.05, 0.1, 0.2])
+
+    def test_gives_up_and_ignores_other_errors(self):
+        locked = mock.Mock(side_effect=OperationalError("database is locked"))
+        with self.assertRaises(OperationalError):
+            db.retry_on_lock(locked)()
+        self.assertEqual(locked.call_count, db.LOCK_RETRIES)
+
+        broken = mock.Mock(side_effect=OperationalError("no such table: core_submission"))
+        with self.assertRaises(OperationalError):
+            db.retry_on_lock(broken)()
+        self.assertEqual(broken.call_count, 1)
+
+    def test_not_retried_inside_a_transaction(self):
+        locked = mock.Mock(side_effect=OperationalError("database is locked"))
+        with mock.patch.object(db.connection, "in_atomic_block", True), self.assertRaises(OperationalError):
+            db.retry_on_lock(locked)()
+        self.assertEqual(locked.call_count, 1)
+
+
+class LauncherTests(SimpleTestCase):
+    """The process launcher: socket permissions and cleanup of timed-out runs"""
+
+    def test_spawn_feeds_stdin_and_times_out(self):
+        result = launcher.spawn(["sh", "-c", "read n; echo $((n * 2)); echo oops >&2; exit 3"], "21\n", timeout=5)
+        self.assertEqual((result["returncode"], result["stdout"], result["stderr"]), (3, "42\n", "oops\n"))
+        self.assertFalse(result["timed_out"])
+        self.assertTrue(launcher.spawn(["sleep", "30"], timeout=0.2)["timed_out"])
+
+    def test_timeout_kills_the_whole_process_group(self):
+        # The background sleep keeps stdout open, so only the timeout ends the run
+        result = launcher.spawn(["sh", "-c", "sleep 30 & echo $!; wait"], timeout=0.5)
+        self.assertTrue(result["timed_out"])
+        sleeper = int(result["stdout"].split()[0])
+        for _ in range(50):
+            try:
+                with open(f"/proc/{sleeper}/stat") as f:
+                    if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                        break  # killed, waiting to be reaped by init
+            except FileNotFoundError:
+                break
+            time.sleep(0.05)
+        else:
+            self.fail("the grandchild survived the timeout")
+
+    def test_socket_is_owner_only(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        socket_path = os.path.join(directory, "launcher.sock")
+        server = subprocess.Popen([sys.executable, "-m", "core.launcher", "--socket", socket_path])
+        self.addCleanup(server.wait)
+        self.addCleanup(server.terminate)
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+
+        self.assertEqual(stat.S_IMODE(os.stat(socket_path).st_mode), 0o600)
+        self.assertEqual(launcher.run(["echo", "hi"], socket_path=socket_path), (0, "hi\n", ""))
+        with self.assertRaises(FileNotFoundError):
+            launcher.run(["no-such-program"], socket_path=socket_path)
+        with self.assertRaises(subprocess.TimeoutExpired):
+            launcher.run(["sleep", "30"], timeout=0.2, socket_path=socket_path)
@@ -16,21 +16,35 @@ urlpatterns = [
     # ---------- Student Routes ----------
     path('student/login/', views.student_login, name='student_login'),
     path('student/dashboard/', views.student_dashboard, name='student_dashboard'),
+    path('student/submissions/', views.student_submission_history, name='student_submission_history'),
     path('student/question/<int:question_id>/', views.get_question_details, name='get_question'),
     path('student/submit/<int:question_id>/', views.submit_code, name='submit_code'),
+    path('student/submit/<int:question_id>/stream/', views.submit_code_stream, name='submit_code_stream'),
     path('student/run_code/', views.run_student_code, name='run_code'),
+    path('student/run_code/async/', views.run_student_code_async, name='run_code_async'),
+    path('student/submit/<int:question_id>/async/', views.submit_code_async, name='submit_code_async'),
+    path('student/quick-check/<int:question_id>/', views.quick_check_code, name='quick_check'),
 
     # ---------- Faculty Routes ----------
     path('faculty/login/', views.faculty_login, name='faculty_login'),
     path('faculty/dashboard/', views.faculty_dashboard, name='faculty_dashboard'),
     path('faculty/upload-questions/', views.upload_questions, name='upload_question'),
+    path('faculty/questions/import/', views.import_questions, name='import_questions'),
     path('faculty/review-submissions/', views.review_submissions, name='review_submissions'),
     path('faculty/performance-reports/', views.performance_reports, name='performance_reports'),
+    path('faculty/performance-reports/csv/', views.download_performance_csv, name='download_performance_csv'),
+    path('faculty/submissions/<int:submission_id>/details/', views.submission_details, name='submission_details'),
     path('faculty/announcements/', views.announcements, name='faculty_announcements'),
     path('faculty/groups/create/', views.create_group, name='create_group'),
     path('faculty/groups/', views.get_groups, name='get_groups'),
     path('faculty/students/', views.get_students, name='get_students'),
     path('faculty/students/assign/', views.assign_student_to_group, name='assign_student'),
+    path('faculty/students/assign/batch/', views.assign_students_to_group, name='assign_students'),
+    path('faculty/students/import/', views.import_students, name='import_students'),
+    path('faculty/evaluation-queue/', views.evaluation_queue_stats, name='evaluation_queue_stats'),
+    path('faculty/stats/', views.faculty_stats, name='faculty_stats'),
+    path('faculty/search/', views.faculty_search, name='faculty_search'),
+    path('faculty/stats/questions/<int:question_id>/students/', views.question_student_stats, name='question_student_stats'),
 
     # ---------- Shared ----------
     path('announcements/', views.announcements, name='announcements'),
@@ -1,17 +1,40 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q, Subquery
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+import asyncio
+import base64
+import binascii
 import csv
 import json
-
-from .models import Student, Faculty, Question, Submission, Announcement, Group
-from .local_ai_evaluator import evaluate_submission  # Your AI evaluator script
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+
+from .models import (
+    Student, Faculty, Question, Submission, TestResult, Announcement, Group, TestCase,
+    StudentQuestionStats, QuestionStats, GroupQuestionStats
+)
+from .local_ai_evaluator import evaluate_submission, on_feedback_ready  # Your AI evaluator script
+from . import async_evaluator
+from . import checkers, runners, search, similarity
+from .scheduler import BATCH, INTERACTIVE, SUBMIT, queue_stats
+from .stats import regroup_students, rollup_json, student_stats_json
+from .enrollment import enroll_students, EnrollmentConflict, EnrollmentError
+from .question_import import import_questions as import_question_bundle, BundleError
+from .db import retry_on_lock
+from .cache import (
+    cached, cached_json_response, invalidate,
+    question_namespace, faculty_questions_namespace, faculty_announcements_namespace, faculty_roster_namespace
+)
 
 
 # ---------- Home ----------
@@ -193,36 +216,75 @@ def faculty_register(request):
 @login_required
 def student_dashboard(request):
     try:
-        student = Student.objects.get(user=request.user)
+        student = Student.objects.select_related('faculty__user').get(user=request.user)
     except Student.DoesNotExist:
         messages.error(request, "Student profile not found.")
         return redirect('logout')
 
     faculty = student.faculty
-    questions = Question.objects.filter(faculty=faculty) if faculty else []
-    submissions = Submission.objects.filter(student=student)
-
-    # Language icons
-    languages = {
-        "Python": "🐍",
-        "C++": "💻",
-        "Java": "☕",
-        "C": "⚙️",
-    }
+    questions = Question.objects.filter(faculty=faculty).only(
+        'id', 'title', 'description', 'difficulty', 'marks'
+    ) if faculty else []
+    # One precomputed row per attempted question (see core/stats.py); the full
+    # history is loaded on demand from student_submission_history
+    progress = StudentQuestionStats.objects.filter(student=student).select_related(
+        'question', 'best_submission', 'latest_submission'
+    ).only(
+        'attempts', 'first_solved_at', 'question__title',
+        'best_submission__score', 'best_submission__language', 'best_submission__submitted_at',
+        'latest_submission__score', 'latest_submission__language', 'latest_submission__submitted_at'
+    ).order_by('-last_submitted_at')
+
+    # Language icons, for the languages with a toolchain installed here
+    languages = {runner.label: runner.icon for runner in runners.available()}
 
     context = {
         "student": student,
         "faculty": faculty,
         "questions": questions,
-        "submissions": submissions,
+        "progress": progress,
         "languages": languages,
     }
 
     return render(request, 'core/student_dashboard.html', context)
 
 
+HISTORY_PAGE_SIZE = 20
+
+
+@login_required
+def student_submission_history(request):
+    """The student's own submissions, newest first, one keyset page at a time (?cursor=)"""
+    try:
+        student = Student.objects.get(user=request.user)
+    except Student.DoesNotExist:
+        return JsonResponse({"error": "Student profile not found"}, status=400)
+
+    submissions = Submission.objects.filter(student=student).select_related('question').only(
+        'id', 'language', 'score', 'passed_count', 'total_count', 'submitted_at', 'question__title'
+    )
+    rows, next_cursor = keyset_page(submissions, request.GET.get("cursor"), page_size=HISTORY_PAGE_SIZE)
+
+    return JsonResponse({
+        "submissions": [
+            {
+                "id": sub.id,
+                "question": sub.question.title,
+                "language": sub.language,
+                "score": sub.score,
+                "passed": sub.passed_count,
+                "total": sub.total_count,
+                "submitted_at": sub.submitted_at.isoformat()
+            }
+            for sub in rows
+        ],
+        "next_cursor": next_cursor
+    })
+
+
 @login_required
 def run_student_code(request):
+    """WSGI fallback for run_student_code_async (see saravi_project/asgi.py)"""
     if request.method == "POST":
         data = request.POST
         code = data.get("code")
@@ -232,34 +294,55 @@ def run_student_code(request):
         
         test_cases = [{"input": test_input, "expected": expected_output}]
 
-        report = evaluate_submission(code, lang, test_cases)
-        
-        # Format response for the run button
-        result = report.get('results', [{}])[0] if report.get('results') else {}
-        
-        return JsonResponse({
-            "score": report.get('score', 0),
-            "test_case_score": report.get('test_case_score', 0),
-            "logic_score": report.get('logic_score'),
-            "is_correct": result.get('is_correct', False),
-            "output": result.get('output', ''),
-            "error": result.get('error', ''),
-            "ai_feedback": result.get('ai_feedback', 'No AI feedback available')
-        })
+        report = evaluate_submission(code, lang, test_cases, priority=INTERACTIVE, owner=request.user.id)
+        return run_response(report)
     return JsonResponse({"error": "Invalid request"}, status=400)
 
 
+@login_required
+async def run_student_code_async(request):
+    """run_student_code on the async evaluator (asyncio subprocesses, async AI call)"""
+    if request.method == "POST":
+        user = await request.auser()
+        data = request.POST
+        code = data.get("code")
+        lang = data.get("language")
+        test_input = data.get("input", "")
+        expected_output = data.get("expected", "")
+
+        test_cases = [{"input": test_input, "expected": expected_output}]
+
+        report = await async_evaluator.evaluate_submission(code, lang, test_cases, priority=INTERACTIVE, owner=user.id)
+        return run_response(report)
+    return JsonResponse({"error": "Invalid request"}, status=400)
+
+
+def run_response(report):
+    """Format an evaluation report for the run button"""
+    result = report.get('results', [{}])[0] if report.get('results') else {}
+
+    return JsonResponse({
+        "score": report.get('score', 0),
+        "test_case_score": report.get('test_case_score', 0),
+        "logic_score": report.get('logic_score'),
+        "is_correct": result.get('is_correct', False),
+        "output": result.get('output', ''),
+        "error": result.get('error', ''),
+        "ai_feedback": result.get('ai_feedback', 'No AI feedback available')
+    })
+
+
 @login_required
 def get_question_details(request, question_id):
-    """Return question details as JSON for the code editor"""
-    try:
-        student = request.user.student
+    """Return question details as JSON for the code editor (cached; see core/cache.py)"""
+    if not Student.objects.filter(user=request.user).exists():
+        return JsonResponse({"error": "Student profile not found"}, status=400)
+
+    def build():
         question = get_object_or_404(Question, id=question_id)
-        
         # Get first test case as example
-        test_case = question.test_cases.first()
-        
-        data = {
+        test_case = question.test_cases.order_by('id').first()
+        return {
             "id": question.id,
             "title": question.title,
             "description": question.description,
@@ -269,13 +352,13 @@ def get_question_details(request, question_id):
             "example_input": test_case.input_data if test_case else "",
             "example_output": test_case.expected_output if test_case else ""
         }
-        return JsonResponse(data)
-    except Student.DoesNotExist:
-        return JsonResponse({"error": "Student profile not found"}, status=400)
+
+    return cached_json_response(request, question_namespace(question_id), build)
 
 
 @login_required
 def submit_code(request, question_id):
+    """WSGI fallback for submit_code_async and submit_code_stream (see saravi_project/asgi.py)"""
     if request.method == "POST":
         try:
             student = request.user.student
@@ -288,25 +371,230 @@ def submit_code(request, question_id):
         lang = data.get("language")
 
         test_cases_list = [
-            {"input": tc.input_data, "expected": tc.expected_output}
+            {"id": tc.id, "input": tc.input_data, "expected": tc.expected_output}
             for tc in question.test_cases.all()
         ]
 
-        report = evaluate_submission(code, lang, test_cases_list)
+        report = evaluate_submission(
+            code, lang, test_cases_list, priority=SUBMIT, owner=request.user.id, checker=checkers.for_question(question)
+        )
+        store_submission(student, question, code, lang, test_cases_list, report)
+
+        return JsonResponse({
+            "message": "Submission evaluated!",
+            "result": report
+        }, safe=False)
 
-        Submission.objects.create(
+
+@login_required
+async def submit_code_async(request, question_id):
+    """submit_code on the async evaluator; the sync view stays as the WSGI fallback"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    user = await request.auser()
+    student = await Student.objects.filter(user=user).afirst()
+    if student is None:
+        return JsonResponse({"error": "Student profile not found"}, status=400)
+
+    question = await aget_object_or_404(Question, id=question_id)
+    data = json.loads(request.body)
+    code = data.get("code")
+    lang = data.get("language")
+
+    test_cases_list = [
+        {"id": tc.id, "input": tc.input_data, "expected": tc.expected_output}
+        async for tc in question.test_cases.all()
+    ]
+
+    report = await async_evaluator.evaluate_submission(
+        code, lang, test_cases_list, priority=SUBMIT, owner=user.id, checker=checkers.for_question(question)
+    )
+    await sync_to_async(store_submission)(student, question, code, lang, test_cases_list, report)
+
+    return JsonResponse({
+        "message": "Submission evaluated!",
+        "result": report
+    }, safe=False)
+
+
+# Streamed submissions still being graded (the event loop only keeps weak references to tasks)
+_grading_tasks = set()
+
+
+@login_required
+async def submit_code_stream(request, question_id):
+    """
+    Same evaluation as submit_code, streamed as server-sent events:
+    compile status, then each test result as it finishes, then the AI
+    analysis and the final report. Serve through saravi_project.asgi so an
+    open stream doesn't hold a sync worker.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    user = await request.auser()
+    student = await Student.objects.filter(user=user).afirst()
+    if student is None:
+        return JsonResponse({"error": "Student profile not found"}, status=400)
+
+    question = await aget_object_or_404(Question, id=question_id)
+    data = json.loads(request.body)
+    code = data.get("code")
+    lang = data.get("language")
+
+    test_cases_list = [
+        {"id": tc.id, "input": tc.input_data, "expected": tc.expected_output}
+        async for tc in question.test_cases.all()
+    ]
+
+    checker = checkers.for_question(question)
+    events = asyncio.Queue()
+
+    async def evaluate():
+        # Runs as its own task, so the submission is graded and saved even if the client goes away
+        async for event in async_evaluator.iter_evaluation(
+            code, lang, test_cases_list, priority=SUBMIT, owner=user.id, checker=checker
+        ):
+            if event["event"] == "done":
+                await asyncio.shield(
+                    sync_to_async(store_submission)(student, question, code, lang, test_cases_list, event["report"])
+                )
+            events.put_nowait(event)
+        events.put_nowait(None)
+
+    task = asyncio.ensure_future(evaluate())
+    _grading_tasks.add(task)
+    task.add_done_callback(_grading_tasks.discard)
+
+    async def event_stream():
+        # Only relays the task's events; a disconnect cancels this generator, not the grading
+        while (event := await events.get()) is not None:
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        await task  # re-raise a failed evaluation
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@retry_on_lock
+def store_submission(student, question, code, lang, test_cases_list, report):
+    """Save an evaluated submission (summary + one TestResult per test) and update per-test history"""
+    results = report.get('results', [])
+    first = results[0] if results else {}
+
+    # One transaction, so a retry after a lock error can't count test outcomes twice
+    with transaction.atomic():
+        record_test_outcomes(test_cases_list, report)
+        submission = Submission.objects.create(
             student=student,
             question=question,
             code=code,
             language=lang,
-            result=report,
-            score=report.get('score', 0)
+            score=report.get('score', 0),
+            test_case_score=report.get('test_case_score', 0),
+            logic_score=report.get('logic_score'),
+            hard_coded_detected=report.get('hard_coded_detected', False),
+            passed_count=sum(1 for result in results if result.get('is_correct')),
+            total_count=len(results),
+            feedback=first.get('ai_feedback') or '',
+            concerns=first.get('concerns') or []
         )
+        TestResult.objects.bulk_create([
+            test_result_row(submission, position, case, result)
+            for position, (case, result) in enumerate(zip(test_cases_list, results))
+        ])
+
+    if report.get('feedback_id'):
+        # Streamed analysis: the score is in, the rest of the feedback is still being generated
+        def save_feedback(analysis):
+            Submission.objects.filter(pk=submission.pk).update(
+                feedback=analysis.get('feedback') or '',
+                concerns=analysis.get('concerns') or [],
+                hard_coded_detected=submission.hard_coded_detected or "hard_coded" in analysis.get('concerns', [])
+            )
+        on_feedback_ready(report['feedback_id'], save_feedback)
+    return submission
+
+
+VERDICT_STATUS = {
+    "passed": TestResult.PASSED,
+    "wrong_answer": TestResult.WRONG_ANSWER,
+    "runtime_error": TestResult.RUNTIME_ERROR,
+    "timeout": TestResult.TIMEOUT,
+    "compile_error": TestResult.COMPILE_ERROR,
+    "language_mismatch": TestResult.LANGUAGE_MISMATCH,
+    "partial": TestResult.PARTIAL,
+    "checker_error": TestResult.CHECKER_ERROR,
+}
+
+
+def test_result_row(submission, position, case, result):
+    output = result.get('output') or ''
+    error = result.get('error') or ''
+    limit = TestResult.TEXT_LIMIT
+    return TestResult(
+        submission=submission,
+        test_case_id=case.get('id'),
+        case_digest=TestCase.digest_for(case.get('input') or '', case.get('expected') or ''),
+        position=position,
+        status=VERDICT_STATUS.get(result.get('verdict'), TestResult.PASSED if result.get('is_correct') else TestResult.WRONG_ANSWER),
+        time_ms=result.get('time_ms'),
+        score=result.get('score', float(bool(result.get('is_correct')))),
+        output=TestResult.clip(output),
+        error=TestResult.clip(error),
+        truncated=len(output) > limit or len(error) > limit
+    )
 
-        return JsonResponse({
-            "message": "Submission evaluated!",
-            "result": report
-        }, safe=False)
+
+@login_required
+async def quick_check_code(request, question_id):
+    """Fail-fast check: run the test cases most likely to fail first, stop at the first failure"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request"}, status=400)
+
+    user = await request.auser()
+    question = await aget_object_or_404(Question, id=question_id)
+    code = request.POST.get("code")
+    lang = request.POST.get("language")
+
+    test_cases = [tc async for tc in question.test_cases.all()]
+    # 1-based position in the question's normal test case order, for reporting
+    positions = {tc.id: index for index, tc in enumerate(test_cases, 1)}
+
+    test_cases_list = [
+        {"id": tc.id, "input": tc.input_data, "expected": tc.expected_output}
+        for tc in sorted(test_cases, key=lambda tc: tc.failure_rate, reverse=True)
+    ]
+
+    report = await async_evaluator.quick_check(
+        code, lang, test_cases_list, priority=INTERACTIVE, owner=user.id, checker=checkers.for_question(question)
+    )
+
+    if report.get("failed_case"):
+        report["failed_case"]["number"] = positions[report["failed_case"]["id"]]
+
+    return JsonResponse(report)
+
+
+def record_test_outcomes(test_cases_list, report):
+    """Update per-TestCase failure history after a graded submission"""
+    results = report.get("results", [])
+    if not results or results[0].get("status") == "language_mismatch":
+        return
+
+    failed_ids = [case["id"] for case, result in zip(test_cases_list, results) if not result.get("is_correct")]
+    passed_ids = [case["id"] for case, result in zip(test_cases_list, results) if result.get("is_correct")]
+
+    if failed_ids:
+        TestCase.objects.filter(id__in=failed_ids).update(
+            run_count=F('run_count') + 1,
+            failure_count=F('failure_count') + 1
+        )
+    if passed_ids:
+        TestCase.objects.filter(id__in=passed_ids).update(run_count=F('run_count') + 1)
 
 
 # ---------- Faculty Dashboard ----------
@@ -318,16 +606,72 @@ def faculty_dashboard(request):
         messages.error(request, "Faculty profile not found.")
         return redirect('logout')
 
-    questions = Question.objects.filter(faculty=faculty)
-    announcements = Announcement.objects.filter(faculty=faculty)
+    questions, _ = cached(faculty_questions_namespace(faculty.id), lambda: list(
+        Question.objects.filter(faculty=faculty).values('id', 'title', 'created_at')
+    ))
+    announcements = faculty_announcement_list(faculty)
+    # Rollup rows only, so this doesn't grow with the submission history
+    question_stats = QuestionStats.objects.filter(question__faculty=faculty).select_related('question')
 
     return render(request, 'core/faculty_dashboard.html', {
         "faculty": faculty,
         "questions": questions,
-        "announcements": announcements
+        "announcements": announcements,
+        "question_stats": question_stats
+    })
+
+
+@login_required
+def faculty_stats(request):
+    """Per-question and per-group (per question) rollups for the faculty's questions"""
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+
+    question_stats = QuestionStats.objects.filter(question__faculty=faculty).select_related('question')
+    group_stats = GroupQuestionStats.objects.filter(question__faculty=faculty).select_related('group', 'question')
+
+    return JsonResponse({
+        "questions": [
+            {"question_id": row.question_id, "title": row.question.title, **rollup_json(row)}
+            for row in question_stats
+        ],
+        "groups": [
+            {"group_id": row.group_id, "group": row.group.name, "question_id": row.question_id, **rollup_json(row)}
+            for row in group_stats
+        ]
+    })
+
+
+@login_required
+def question_student_stats(request, question_id):
+    """Per-student rollups for one of the faculty's questions"""
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+
+    question = get_object_or_404(Question, id=question_id, faculty=faculty)
+    rows = question.student_stats.select_related('student__user').order_by('-best_score', 'first_solved_at')
+
+    return JsonResponse({
+        "question_id": question.id,
+        "students": [
+            {"student_id": row.student_id, "username": row.student.user.username, **student_stats_json(row)}
+            for row in rows
+        ]
     })
 
 
+@login_required
+def evaluation_queue_stats(request):
+    """Queue depth and wait times for each evaluation priority class"""
+    if not hasattr(request.user, 'faculty'):
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+    return JsonResponse(queue_stats())
+
+
 @login_required
 def announcements(request):
     try:
@@ -348,37 +692,308 @@ def announcements(request):
             )
             return redirect("announcements")
 
-    all_announcements = Announcement.objects.filter(faculty=faculty).order_by("-created_at")
-    return render(request, "core/announcements.html", {"announcements": all_announcements})
+    return render(request, "core/announcements.html", {
+        "faculty": faculty,
+        "announcements": faculty_announcement_list(faculty)
+    })
+
+
+def faculty_announcement_list(faculty):
+    """The faculty's announcements, newest first, from the shared cache"""
+    announcements, _ = cached(faculty_announcements_namespace(faculty.id), lambda: list(
+        Announcement.objects.filter(faculty=faculty).order_by("-created_at").values(
+            'id', 'title', 'description', 'created_at'
+        )
+    ))
+    return announcements
+
+
+# ---------- Submission Lists (keyset pagination) ----------
+SUBMISSIONS_PAGE_SIZE = 50
+
+
+def filter_submissions(request, submissions):
+    """Apply the ?question=, ?group=, ?date_from= and ?date_to= (YYYY-MM-DD) filters"""
+    question_id = request.GET.get("question")
+    group_id = request.GET.get("group")
+    date_from = parse_date(request.GET.get("date_from") or "")
+    date_to = parse_date(request.GET.get("date_to") or "")
+
+    if question_id and question_id.isdigit():
+        submissions = submissions.filter(question_id=question_id)
+    if group_id and group_id.isdigit():
+        submissions = submissions.filter(student__group_id=group_id)
+    # Plain datetime ranges (not __date) so the submitted_at ordering can use an index
+    if date_from:
+        submissions = submissions.filter(
+            submitted_at__gte=timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
+        )
+    if date_to:
+        submissions = submissions.filter(
+            submitted_at__lt=timezone.make_aware(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+        )
+    return submissions
+
+
+def encode_cursor(submission):
+    raw = f"{submission.submitted_at.isoformat()}|{submission.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Returns (submitted_at, id), or None for a missing or malformed cursor"""
+    try:
+        submitted_at, submission_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(submitted_at), int(submission_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+def keyset_page(submissions, cursor, page_size=SUBMISSIONS_PAGE_SIZE):
+    """
+    One page of submissions, newest first, continuing after `cursor`.
+    Uses a (submitted_at, id) seek instead of OFFSET, so deep pages cost the
+    same as the first one. Returns (rows, next_cursor).
+    """
+    submissions = submissions.order_by('-submitted_at', '-id')
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        submitted_at, submission_id = position
+        submissions = submissions.filter(
+            Q(submitted_at__lt=submitted_at) | Q(submitted_at=submitted_at, id__lt=submission_id)
+        )
+
+    rows = list(submissions[:page_size + 1])
+    next_cursor = encode_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
+
+
+def submission_summaries(faculty):
+    """Faculty's submissions without the code column, plus the student and question fields lists need"""
+    return Submission.objects.filter(
+        faculty=faculty
+    ).select_related('student__user', 'question').only(
+        'id', 'language', 'score', 'submitted_at', 'logic_score', 'hard_coded_detected',
+        'student__id', 'student__user__username', 'student__user__first_name', 'student__user__last_name',
+        'question__id', 'question__title'
+    )
+
+
+def submission_list_context(request, faculty):
+    submissions = filter_submissions(request, submission_summaries(faculty))
+    rows, next_cursor = keyset_page(submissions, request.GET.get("cursor"))
+
+    filters = request.GET.copy()
+    filters.pop("cursor", None)
+    next_query = None
+    if next_cursor:
+        filters["cursor"] = next_cursor
+        next_query = filters.urlencode()
+
+    return {
+        "submissions": rows,
+        "next_query": next_query,
+        "is_first_page": not request.GET.get("cursor"),
+        "filter_questions": Question.objects.filter(faculty=faculty).only('id', 'title'),
+        "filter_groups": Group.objects.filter(faculty=faculty).only('id', 'name'),
+        "selected": {
+            "question": request.GET.get("question", ""),
+            "group": request.GET.get("group", ""),
+            "date_from": request.GET.get("date_from", ""),
+            "date_to": request.GET.get("date_to", ""),
+        },
+    }
 
 
 @login_required
 def performance_reports(request):
-    submissions = Submission.objects.select_related('student__user', 'question').order_by('-submitted_at')
-    return render(request, 'core/performance_reports.html', {"submissions": submissions})
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        messages.error(request, "Faculty profile not found.")
+        return redirect('logout')
+
+    return render(request, 'core/performance_reports.html', submission_list_context(request, faculty))
+
+
+@login_required
+def submission_details(request, submission_id):
+    """Per-test details for one submission, loaded when "View Details" is expanded"""
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+
+    submission = get_object_or_404(
+        Submission.objects.select_related('code_blob').only('id', 'feedback', 'code_blob__data'),
+        id=submission_id,
+        faculty=faculty
+    )
+    test_results = submission.test_results.select_related('test_case').only(
+        'test_case', 'case_digest', 'position', 'status', 'time_ms', 'score', 'output', 'error', 'truncated',
+        'test_case__input_data', 'test_case__expected_output'
+    )
+
+    return JsonResponse({
+        "id": submission.id,
+        "code": submission.code,
+        "results": [
+            {
+                "input": test.test_case.input_data if test.test_case else "",
+                "expected": test.test_case.expected_output if test.test_case else "",
+                "output": test.output,
+                "error": test.error,
+                "is_correct": test.is_correct,
+                "status": test.get_status_display(),
+                "time_ms": test.time_ms,
+                "score": test.score,
+                "truncated": test.truncated,
+                "case_changed": test.case_changed,
+                # Feedback is shown on the first test only, as in the evaluation report
+                "ai_feedback": submission.feedback if index == 0 else "",
+            }
+            for index, test in enumerate(test_results)
+        ]
+    })
+
+
+# ---------- Performance CSV Export ----------
+CSV_CHUNK_SIZE = 2000
+
+PERFORMANCE_CSV_HEADER = [
+    'Student', 'Group', 'Question', 'Language', 'Score',
+    'Test Score', 'Logic Score', 'Hard-coded', 'Submitted At'
+]
+
+
+class _Echo:
+    """File-like object for csv.writer that hands back each formatted row"""
+
+    def write(self, value):
+        return value
+
+
+def performance_csv_rows(faculty, request):
+    """Filtered export rows as plain tuples, newest first, without loading the code"""
+    submissions = filter_submissions(request, Submission.objects.filter(faculty=faculty))
+    return submissions.order_by('-submitted_at', '-id').values_list(
+        'student__user__username', 'student__group__name', 'question__title', 'language', 'score',
+        'test_case_score', 'logic_score', 'hard_coded_detected', 'submitted_at'
+    )
+
+
+def format_performance_row(row):
+    username, group, question, language, score, test_score, logic_score, hard_coded, submitted_at = row
+    return [
+        username, group or '', question, language, score,
+        '' if test_score is None else test_score,
+        '' if logic_score is None else logic_score,
+        'Yes' if hard_coded else 'No',
+        submitted_at.isoformat()
+    ]
+
+
+def iter_performance_csv(rows):
+    """CSV text in chunks of CSV_CHUNK_SIZE rows, read from the database cursor in the same chunks"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(PERFORMANCE_CSV_HEADER)
+    chunk = []
+    for row in rows.iterator(chunk_size=CSV_CHUNK_SIZE):
+        chunk.append(writer.writerow(format_performance_row(row)))
+        if len(chunk) >= CSV_CHUNK_SIZE:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+async def aiter_performance_csv(rows):
+    """Async wrapper around iter_performance_csv, so ASGI servers can stream it without buffering it all"""
+    chunks = iter_performance_csv(rows)
+    # Each step fetches and formats a whole chunk in a worker thread
+    next_chunk = sync_to_async(next)
+    while (chunk := await next_chunk(chunks, None)) is not None:
+        yield chunk
 
 
 @login_required
 def download_performance_csv(request):
-    submissions = Submission.objects.select_related('student__user', 'question').all()
-    response = HttpResponse(content_type='text/csv')
+    """Stream the faculty's submissions as CSV; takes the same filters as Performance Reports"""
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        messages.error(request, "Faculty profile not found.")
+        return redirect('logout')
+
+    rows = performance_csv_rows(faculty, request)
+    # Under ASGI a sync iterator would be read into memory before sending, so hand it an async one
+    content = aiter_performance_csv(rows) if isinstance(request, ASGIRequest) else iter_performance_csv(rows)
+    response = StreamingHttpResponse(content, content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="performance_reports.csv"'
+    return response
 
-    writer = csv.writer(response)
-    writer.writerow(['Student', 'Question', 'Score', 'Result', 'Submitted At'])
-    for sub in submissions:
-        writer.writerow([sub.student.user.username, sub.question.title, sub.score, sub.result, sub.submitted_at])
 
-    return response
+# ---------- Search ----------
+@login_required
+def faculty_search(request):
+    """
+    Full-text search over the faculty's questions (?scope=questions, title
+    and description) or submitted code (?scope=submissions), ranked, ?page=
+    """
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+
+    if not search.available():
+        return JsonResponse({"error": "Search requires the SQLite database"}, status=501)
+
+    text = request.GET.get("q", "").strip()
+    scope = request.GET.get("scope", "questions")
+    page = request.GET.get("page", "1")
+    if not search.fts_query(text):
+        return JsonResponse({"error": "Search text is required"}, status=400)
+    if scope not in ("questions", "submissions"):
+        return JsonResponse({"error": "scope must be 'questions' or 'submissions'"}, status=400)
+    page = int(page) if page.isdigit() and int(page) > 0 else 1
+    if page > search.MAX_SEARCH_PAGE:
+        return JsonResponse({"error": f"Only the first {search.MAX_SEARCH_PAGE} pages are available"}, status=400)
+
+    find = search.search_questions if scope == "questions" else search.search_submissions
+    results, has_next = find(faculty, text, page)
+    return JsonResponse({
+        "scope": scope,
+        "results": results,
+        "page": page,
+        "next_page": page + 1 if has_next and page < search.MAX_SEARCH_PAGE else None
+    })
 
 
 @login_required
 def review_submissions(request):
-    submissions = Submission.objects.filter(
-        question__faculty=request.user.faculty
-    ).select_related('student', 'question').order_by('-submitted_at')
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        messages.error(request, "Faculty profile not found.")
+        return redirect('logout')
+
+    context = submission_list_context(request, faculty)
+    context["similarity_report"] = similarity_report(faculty, request.GET.get("question"))
+    return render(request, 'core/review_submissions.html', context)
 
-    return render(request, 'core/review_submissions.html', {'submissions': submissions})
+
+def similarity_report(faculty, question_id=None):
+    """Near-duplicate clusters per question (just the filtered question, if any)"""
+    questions = Question.objects.filter(faculty=faculty).only('id', 'title').order_by('title')
+    if question_id and question_id.isdigit():
+        questions = questions.filter(id=question_id)
+
+    report = []
+    for question in questions:
+        clusters = similarity.question_clusters(question.id)
+        if clusters:
+            report.append({"question": question, "clusters": clusters})
+    return report
 
 
 @login_required
@@ -394,18 +1009,72 @@ def upload_questions(request):
         description = request.POST.get("description")
         difficulty = request.POST.get("difficulty")
 
-        if title and description and difficulty:
-            Question.objects.create(
+        checker_code = request.POST.get("checker_code", "")
+        checker_language = request.POST.get("checker_language", "")
+
+        if not (title and description and difficulty):
+            messages.error(request, "All fields are required.")
+        elif checker_code.strip() and runners.normalize(checker_language) is None:
+            messages.error(request, "Choose the language of the checker program.")
+        else:
+            question = Question.objects.create(
                 title=title,
                 description=description,
                 difficulty=difficulty,
-                faculty=faculty
+                faculty=faculty,
+                checker_code=checker_code,
+                checker_language=runners.normalize(checker_language) or ""
             )
+            checker = checkers.for_question(question)
+            if checker:
+                # Compiled now so it's ready for the first submission, and so a broken checker shows up here
+                try:
+                    checker.build(priority=BATCH, owner=request.user.id)
+                except checkers.CheckerError as e:
+                    messages.warning(request, f"Question saved, but its checker doesn't work yet: {e}")
             return redirect('faculty_dashboard')
-        else:
-            messages.error(request, "All fields are required.")
 
-    return render(request, 'core/upload_questions.html')
+    return render(request, 'core/upload_questions.html', {"checker_languages": runners.available()})
+
+
+@login_required
+def import_questions(request):
+    """Bulk-import questions and test cases from a JSONL or zip bundle (see core/question_import.py)"""
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        messages.error(request, "Faculty profile not found.")
+        return redirect('logout')
+
+    if request.method != "POST":
+        return redirect('upload_question')
+
+    bundle = request.FILES.get("bundle")
+    if not bundle:
+        messages.error(request, "Please choose a JSONL or zip file to import.")
+        return redirect('upload_question')
+
+    try:
+        report = import_question_bundle(bundle, faculty, dry_run=request.POST.get("dry_run") == "1")
+    except BundleError as e:
+        messages.error(request, str(e))
+        return redirect('upload_question')
+
+    verb = "Would import" if report["dry_run"] else "Imported"
+    messages.success(
+        request,
+        f"{verb} {report['created']} question(s) with {report['test_cases']} test case(s); "
+        f"{len(report['errors'])} skipped."
+    )
+    # Built now, as for a single upload, so a broken checker shows up here
+    for title, checker in report["checkers"]:
+        try:
+            checker.build(priority=BATCH, owner=request.user.id)
+        except checkers.CheckerError as e:
+            messages.warning(request, f"{title}: its checker doesn't work yet: {e}")
+    return render(request, 'core/upload_questions.html', {
+        'import_report': report, 'checker_languages': runners.available()
+    })
 
 
 @login_required
@@ -434,7 +1103,7 @@ def create_group(request):
                     "group": {
                         "id": group.id,
                         "name": group.name,
-                        "student_count": group.students.count()
+                        "student_count": 0
                     }
                 })
             else:
@@ -450,28 +1119,61 @@ def create_group(request):
     return JsonResponse({"error": "Invalid request method"}, status=400)
 
 
+ROSTER_PAGE_SIZE = 200
+
+
+def roster_page_params(request):
+    """(cursor, limit) from ?cursor=<last id>&limit=, for the group and student lists"""
+    cursor = request.GET.get("cursor", "")
+    limit = request.GET.get("limit", "")
+    cursor = int(cursor) if cursor.isdigit() else None
+    limit = min(int(limit), ROSTER_PAGE_SIZE) if limit.isdigit() and int(limit) > 0 else ROSTER_PAGE_SIZE
+    return cursor, limit
+
+
+def id_page(queryset, cursor, limit, newest_first=False):
+    """Rows after id `cursor` in id order, and the cursor for the next page (or None)"""
+    if cursor is not None:
+        queryset = queryset.filter(id__lt=cursor) if newest_first else queryset.filter(id__gt=cursor)
+    rows = list(queryset.order_by('-id' if newest_first else 'id')[:limit + 1])
+    return rows[:limit], (rows[limit - 1].id if len(rows) > limit else None)
+
+
 @login_required
 def get_groups(request):
+    """
+    The faculty's groups with their students, in three queries whatever the
+    number of groups (annotated count + one prefetch). Cached per page with an ETag.
+    """
     try:
         faculty = Faculty.objects.get(user=request.user)
-        groups = Group.objects.filter(faculty=faculty).order_by('-created_at')
-        
-        groups_data = []
-        for group in groups:
-            students = group.students.all()
-            groups_data.append({
-                "id": group.id,
-                "name": group.name,
-                "student_count": students.count(),
-                "students": [{"id": s.id, "username": s.user.username} for s in students]
-            })
-        
-        return JsonResponse({"groups": groups_data})
-    
     except Faculty.DoesNotExist:
         return JsonResponse({"error": "Faculty profile not found"}, status=400)
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+
+    cursor, limit = roster_page_params(request)
+
+    def build():
+        groups = Group.objects.filter(faculty=faculty).annotate(
+            student_count=Count('students')
+        ).prefetch_related(Prefetch(
+            'students',
+            queryset=Student.objects.select_related('user').only('id', 'group_id', 'user__username').order_by('id')
+        ))
+        groups, next_cursor = id_page(groups, cursor, limit, newest_first=True)
+        return {
+            "groups": [
+                {
+                    "id": group.id,
+                    "name": group.name,
+                    "student_count": group.student_count,
+                    "students": [{"id": s.id, "username": s.user.username} for s in group.students.all()]
+                }
+                for group in groups
+            ],
+            "next_cursor": next_cursor
+        }
+
+    return cached_json_response(request, faculty_roster_namespace(faculty.id), build, part=f"groups:{cursor}:{limit}")
 
 
 @login_required
@@ -520,22 +1222,118 @@ def assign_student_to_group(request):
     return JsonResponse({"error": "Invalid request method"}, status=400)
 
 
+# Upper bound on student IDs per batch request (keeps the IN (...) list within SQLite's variable limit)
+MAX_BATCH_ASSIGN = 5000
+
+
+@login_required
+def assign_students_to_group(request):
+    """Move many students into one group (or out of any group) with a single UPDATE"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=400)
+
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+        data = json.loads(request.body)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON data"}, status=400)
+
+    student_ids = data.get("student_ids")
+    group_id = data.get("group_id") or None
+    if not isinstance(student_ids, list) or not student_ids:
+        return JsonResponse({"error": "student_ids must be a non-empty list"}, status=400)
+    if not all(isinstance(i, int) and not isinstance(i, bool) for i in student_ids):
+        return JsonResponse({"error": "student_ids must be integers"}, status=400)
+    if group_id is not None and not str(group_id).isdigit():
+        return JsonResponse({"error": "Invalid group ID"}, status=400)
+    student_ids = set(student_ids)
+    if len(student_ids) > MAX_BATCH_ASSIGN:
+        return JsonResponse({"error": f"At most {MAX_BATCH_ASSIGN} students per request"}, status=400)
+
+    # One query checks both: every student is this faculty's, and so is the target group
+    owned = list(Student.objects.filter(id__in=student_ids, faculty=faculty).annotate(
+        target_group=Subquery(Group.objects.filter(id=group_id, faculty=faculty).values('name')[:1])
+    ).values_list('target_group', flat=True))
+
+    if len(owned) != len(student_ids):
+        return JsonResponse({"error": "You can only assign your own students"}, status=403)
+    group_name = owned[0]
+    if group_id and group_name is None:
+        return JsonResponse({"error": "You can only assign to your own groups"}, status=403)
+
+    # QuerySet.update() sends no post_save, so move the students' rollups and clear the cached roster here
+    students = Student.objects.filter(id__in=student_ids, faculty=faculty)
+    with transaction.atomic():
+        previous_groups = set(students.values_list('group_id', flat=True))
+        updated = students.update(group_id=group_id)
+        regroup_students(student_ids, previous_groups | {int(group_id) if group_id else None})
+    invalidate(faculty_roster_namespace(faculty.id))
+
+    noun = "student" if updated == 1 else "students"
+    return JsonResponse({
+        "success": True,
+        "updated": updated,
+        "message": f"{updated} {noun} assigned to group '{group_name}'" if group_id else f"{updated} {noun} removed from their group"
+    })
+
+
+@login_required
+def import_students(request):
+    """Bulk-enroll students from an uploaded CSV (see core/enrollment.py); optional default group_id"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=400)
+
+    try:
+        faculty = Faculty.objects.get(user=request.user)
+    except Faculty.DoesNotExist:
+        return JsonResponse({"error": "Faculty profile not found"}, status=400)
+
+    csv_file = request.FILES.get("csv")
+    if not csv_file:
+        return JsonResponse({"error": "CSV file is required"}, status=400)
+
+    group = None
+    group_id = request.POST.get("group_id")
+    if group_id:
+        group = Group.objects.filter(id=group_id, faculty=faculty).first()
+        if group is None:
+            return JsonResponse({"error": "You can only assign to your own groups"}, status=403)
+
+    try:
+        report = enroll_students(csv_file, faculty, default_group=group, dry_run=request.POST.get("dry_run") == "1")
+    except EnrollmentConflict as e:
+        return JsonResponse({"error": str(e)}, status=409)
+    except EnrollmentError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"success": True, **report})
+
+
 @login_required
 def get_students(request):
+    """The faculty's students with their group, one cursor page at a time; cached with an ETag"""
     try:
         faculty = Faculty.objects.get(user=request.user)
-        students = Student.objects.filter(faculty=faculty).select_related('user', 'group')
-        
-        students_data = [{
-            "id": s.id,
-            "username": s.user.username,
-            "group_id": s.group.id if s.group else None,
-            "group_name": s.group.name if s.group else None
-        } for s in students]
-        
-        return JsonResponse({"students": students_data})
-    
     except Faculty.DoesNotExist:
         return JsonResponse({"error": "Faculty profile not found"}, status=400)
-    except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+
+    cursor, limit = roster_page_params(request)
+
+    def build():
+        students = Student.objects.filter(faculty=faculty).select_related('user', 'group').only(
+            'id', 'user__username', 'group__id', 'group__name'
+        )
+        students, next_cursor = id_page(students, cursor, limit)
+        return {
+            "students": [{
+                "id": s.id,
+                "username": s.user.username,
+                "group_id": s.group.id if s.group else None,
+                "group_name": s.group.name if s.group else None
+            } for s in students],
+            "next_cursor": next_cursor
+        }
+
+    return cached_json_response(request, faculty_roster_namespace(faculty.id), build, part=f"students:{cursor}:{limit}")
@@ -0,0 +1,28 @@
+"""
+Gunicorn settings picked up automatically from the project root.
+
+Starts the process launcher (core/launcher.py) from the gunicorn master
+before any workers are forked, so workers spawn compilers and student
+programs through it instead of forking the whole Django process.
+Set EVALUATION_LAUNCHER_SOCKET="" to disable it.
+"""
+import os
+import subprocess
+import sys
+
+_launcher = None
+
+
+def on_starting(server):
+    global _launcher
+    socket_path = os.environ.setdefault("EVALUATION_LAUNCHER_SOCKET", "/tmp/saravi-launcher.sock")
+    if not socket_path:
+        return
+    _launcher = subprocess.Popen([sys.executable, "-m", "core.launcher", "--socket", socket_path])
+    server.log.info("Started evaluation launcher (pid %s) on %s", _launcher.pid, socket_path)
+
+
+def on_exit(server):
+    if _launcher is not None:
+        _launcher.terminate()
+        _launcher.wait(timeout=5)
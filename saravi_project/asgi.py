@@ -3,6 +3,18 @@ ASGI config for saravi_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Production runs this entry point under gunicorn with uvicorn workers, so
+long-lived responses (the streamed submission results) are served by the
+event loop instead of holding a sync worker for the whole evaluation:
+
+    gunicorn -k uvicorn.workers.UvicornWorker saravi_project.asgi:application
+
+Every evaluation endpoint the student dashboard calls (run, quick check,
+streamed submit) is an async view. The sync run_student_code and
+submit_code views are kept for WSGI deployments (wsgi.py) only: under ASGI
+Django runs sync views in one shared thread, so an evaluation there would
+hold up every other sync request.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
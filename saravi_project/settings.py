@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -84,6 +85,61 @@ DATABASES = {
     }
 }
 
+# SQLITE_MODE=production for several gunicorn workers writing at once:
+# WAL lets readers run alongside the single writer, write transactions take
+# the write lock up front (BEGIN IMMEDIATE) instead of failing on upgrade,
+# and a busy writer is waited for instead of raising "database is locked".
+# Connections are kept open so the pragmas run once per connection.
+if os.environ.get('SQLITE_MODE') == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA cache_size=-20000;'
+                'PRAGMA temp_store=MEMORY;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA wal_autocheckpoint=1000;'
+            ),
+        },
+    })
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Shared by all worker processes, so invalidating a key in one worker is seen
+# by the others: Redis when REDIS_URL is set (needs the redis package, listed
+# in requirements.txt), otherwise files on local disk.
+
+def _redis_installed():
+    try:
+        import redis  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+if os.environ.get('REDIS_URL') and _redis_installed():
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    if os.environ.get('REDIS_URL'):
+        print("⚠ REDIS_URL is set but the redis package is not installed; using the file cache.")
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_DIR', BASE_DIR / '.cache'),
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators